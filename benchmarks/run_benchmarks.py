@@ -0,0 +1,474 @@
+"""
+Benchmark suite for the module1 tools and the root financial scripts.
+
+Tools are called through their plain functions (no agno wrapper, no LLM, no
+result cache); batch kernels are measured at every requested size. Results
+are written as JSON with latency percentiles and, when a baseline file
+exists, the change of each case's median against it.
+
+Usage:
+    python benchmarks/run_benchmarks.py                      # full run
+    python benchmarks/run_benchmarks.py --sizes 1 100 --filter portfolio
+    python benchmarks/run_benchmarks.py --save-baseline      # store as baseline
+    python benchmarks/run_benchmarks.py --filter import. --fail-on-regression   # import budget gate
+"""
+import argparse
+import functools
+import json
+import platform
+import runpy
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+MODULE_DIR = ROOT / "modules" / "module1"
+sys.path.append(str(MODULE_DIR))
+
+DEFAULT_SIZES = [1, 100, 10_000, 100_000]
+DEFAULT_OUTPUT = Path(__file__).parent / "results.json"
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+PERCENTILES = (50, 90, 99)
+
+# Cold import budgets (p50, ms). module1 builds its agents lazily, so importing
+# it (as main.py does at every Streamlit process start) must stay cheap
+IMPORT_BUDGETS_MS = {"import.module1": 100.0}
+
+# Largest size per case where the full result would not fit in memory; a
+# 100k x 30-year projection matrix is ~2.3 GB (the portfolio case covers
+# 100k properties through the chunked kernel). Neighborhood profiling is
+# linear in the locations, so 10k already shows its per-location cost. The
+# document search and refresh corpora are written to disk at setup, 10k
+# reports at most.
+MAX_SIZES = {
+    "batch.project_monthly_cash_flows": 10_000,
+    "batch.profile_neighborhoods": 10_000,
+    "batch.search_documents": 10_000,
+    "batch.refresh_documents": 10_000,
+}
+
+
+# Parent of the corpora and stores written by case setups, removed after each run
+_scratch_root: Optional[Path] = None
+
+
+def _scratch_dir(prefix: str) -> Path:
+    """New empty directory under the run's scratch directory."""
+    return Path(tempfile.mkdtemp(prefix=prefix, dir=_scratch_root))
+
+
+def _plain(function: Any) -> Callable:
+    """Underlying Python function of an agno tool, without the result cache."""
+    function = getattr(function, "entrypoint", function)
+    return getattr(function, "__wrapped__", function)
+
+
+def _import_seconds(module: str) -> Callable[[], float]:
+    """Time a cold import of ``module`` in a fresh interpreter."""
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - start)"
+    )
+
+    def run() -> float:
+        completed = subprocess.run([sys.executable, "-c", code], cwd=MODULE_DIR, capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise RuntimeError(f"import {module} failed: {completed.stderr.strip().splitlines()[-1]}")
+        return float(completed.stdout.strip().splitlines()[-1])
+
+    return run
+
+
+# ---------------------------------------------------------------------------
+# Cases: each setup takes a size and returns a zero-argument callable
+# ---------------------------------------------------------------------------
+
+@functools.lru_cache(maxsize=None)
+def _poi_index_dir() -> str:
+    """Synthetic 200k-point POI index around one city centre, built once per run."""
+    import pandas as pd
+    from poi_index import POI_TYPES, build_poi_index
+    directory = _scratch_dir("poi_benchmark_")
+    rng = np.random.default_rng(0)
+    size = 200_000
+    pd.DataFrame({
+        "lat": 33.57 + rng.normal(0, 0.08, size),
+        "lon": -7.59 + rng.normal(0, 0.08, size),
+        "poi_type": rng.choice(POI_TYPES, size),
+    }).to_csv(directory / "poi.csv", index=False)
+    build_poi_index(directory / "poi.csv", directory / "index")
+    return str(directory / "index")
+
+
+def _tool_cases() -> Dict[str, Callable[[int], Callable[[], Any]]]:
+    def tool(name: str, **kwargs: Any) -> Callable[[int], Callable[[], Any]]:
+        def setup(size: int) -> Callable[[], Any]:
+            import tools
+            function = _plain(getattr(tools, name))
+            return lambda: function(**kwargs)
+        return setup
+
+    return {
+        "tool.legal_document_analyzer": tool(
+            "legal_document_analyzer",
+            document_path=str(MODULE_DIR / "documents" / "rapport_conformite_legale_maarif_casablanca.md"),
+        ),
+        "tool.legal_document_analyzer.directory": tool(
+            "legal_document_analyzer", document_path=str(MODULE_DIR / "documents")
+        ),
+        "tool.financial_calculator.mortgage": tool("financial_calculator", calculation_type="mortgage", principal=300_000),
+        "tool.financial_calculator.roi": tool("financial_calculator", calculation_type="roi", principal=300_000),
+        "tool.financial_calculator.cash_flow": tool("financial_calculator", calculation_type="cash_flow", principal=300_000),
+        "tool.financial_calculator.npv": tool("financial_calculator", calculation_type="npv", principal=300_000),
+        "tool.financial_calculator.irr": tool("financial_calculator", calculation_type="irr", principal=300_000),
+        "tool.financial_calculator.sensitivity": tool(
+            "financial_calculator", calculation_type="roi", principal=300_000, additional_params={"sensitivity": {}}
+        ),
+        "tool.risk_assessment_engine": tool("risk_assessment_engine", property_address="Casablanca", property_value=500_000),
+        "tool.demographic_analyzer": tool("demographic_analyzer", location="Casablanca"),
+        "tool.regulatory_compliance_checker": tool(
+            "regulatory_compliance_checker", property_address="Casablanca", property_type="residential"
+        ),
+        "tool.investment_analyzer": tool("investment_analyzer", property_value=500_000),
+        "tool.investment_analyzer.simulation": tool(
+            "investment_analyzer", property_value=500_000, simulation={"n_paths": 10_000, "seed": 1}
+        ),
+        "tool.neighborhood_profiler": tool("neighborhood_profiler", location="Casablanca"),
+        "tool.economic_indicator_tracker": tool("economic_indicator_tracker", location="Casablanca"),
+    }
+
+
+def _script_cases() -> Dict[str, Callable[[int], Callable[[], Any]]]:
+    def script(filename: str) -> Callable[[int], Callable[[], Any]]:
+        return lambda size: lambda: runpy.run_path(str(ROOT / filename))
+
+    return {
+        "script.irr_calculation": script("irr_calculation.py"),
+        "script.npv_calculation": script("npv_calculation.py"),
+        "script.npv_irr_calculator": script("npv_irr_calculator.py"),
+        "script.investment_analysis": script("investment_analysis.py"),
+    }
+
+
+def _batch_cases() -> Dict[str, Callable[[int], Callable[[], Any]]]:
+    def portfolio(size: int) -> Callable[[], Any]:
+        from additional_tools import analyze_investment_portfolio
+        rng = np.random.default_rng(0)
+        columns = {
+            "property_value": rng.uniform(100_000, 2_000_000, size),
+            "interest_rate": rng.uniform(0.03, 0.08, size),
+            "analysis_period": rng.integers(5, 21, size),
+        }
+        return lambda: analyze_investment_portfolio(**columns)
+
+    def simulation(size: int) -> Callable[[], Any]:
+        from additional_tools import simulate_investment
+        distributions = {"annual_appreciation": {"distribution": "normal", "mean": 0.035, "std": 0.02}}
+        return lambda: simulate_investment(500_000, distributions, n_paths=size, seed=1)
+
+    def risk_screen(size: int) -> Callable[[], Any]:
+        from additional_tools import assess_risk_portfolio
+        values = np.random.default_rng(0).uniform(100_000, 2_000_000, size)
+        return lambda: assess_risk_portfolio(property_value=values, seed=1, top_n=3)
+
+    def cash_flow_series(size: int) -> np.ndarray:
+        # The irr_calculation.py series, with the yearly amount varied per property
+        rng = np.random.default_rng(0)
+        flows = np.repeat(rng.uniform(2_500, 4_000, (size, 1)), 13, axis=1)
+        flows[:, 0] = -110_000
+        return flows
+
+    def irr_batch(size: int) -> Callable[[], Any]:
+        from financial_math import irr
+        flows = cash_flow_series(size)
+        return lambda: irr(flows)
+
+    def npv_batch(size: int) -> Callable[[], Any]:
+        from financial_math import npv
+        flows = cash_flow_series(size)
+        return lambda: npv([0.05, 0.08, 0.10], flows)
+
+    def amortization(size: int) -> Callable[[], Any]:
+        from financial_math import amortization_schedule
+        principal = np.random.default_rng(0).uniform(100_000, 1_000_000, size)
+        return lambda: amortization_schedule(principal, 0.05, 30)
+
+    def projection(size: int) -> Callable[[], Any]:
+        from cash_flow_projection import project_monthly_cash_flows
+        value = np.random.default_rng(0).uniform(100_000, 1_000_000, size)
+        return lambda: project_monthly_cash_flows(
+            value, value * 0.08 / 12, 360, rent_growth=0.03, vacancy_rate=0.05, expense_ratio=0.35,
+            loan_amount=value * 0.8, interest_rate=0.065, initial_investment=value * 0.23,
+            annual_appreciation=0.035,
+        )
+
+    def neighborhoods(size: int) -> Callable[[], Any]:
+        from additional_tools import profile_neighborhoods
+        index_dir = _poi_index_dir()
+        rng = np.random.default_rng(1)
+        latitude, longitude = 33.57 + rng.normal(0, 0.05, size), -7.59 + rng.normal(0, 0.05, size)
+        return lambda: profile_neighborhoods(latitude=latitude, longitude=longitude, index_dir=index_dir)
+
+    def compliance(size: int) -> Callable[[], Any]:
+        from additional_tools import check_compliance_portfolio
+        rng = np.random.default_rng(0)
+        columns = {
+            "property_type": rng.choice(["residential", "commercial", "industrial"], size),
+            "zoning_code": rng.choice(["R1", "R2", "C1", "M1"], size),
+            "height_ft": rng.uniform(20, 70, size),
+            "lot_coverage": rng.uniform(0.2, 0.9, size),
+            "year_built": rng.integers(1900, 2020, size),
+            "smoke_detectors": rng.random(size) < 0.9,
+            "electrical_panel_age_years": rng.integers(0, 60, size),
+        }
+        return lambda: check_compliance_portfolio(**columns)
+
+    def report_corpus(size: int, prefix: str) -> Path:
+        # Reports of 300 words drawn from a Zipf-distributed 5,000-word vocabulary
+        directory = _scratch_dir(prefix)
+        rng = np.random.default_rng(0)
+        vocabulary = np.array([f"terme{rank}" for rank in range(5_000)] + ["résiliation", "bail", "zonage"])
+        for number in range(size):
+            words = vocabulary[np.minimum(rng.zipf(1.3, 300), len(vocabulary)) - 1]
+            (directory / f"report_{number}.txt").write_text(" ".join(words), encoding="utf-8")
+        return directory
+
+    def document_search(size: int) -> Callable[[], Any]:
+        from content_store import ContentStore
+        from document_index import DocumentIndex
+        index = DocumentIndex(ContentStore(report_corpus(size, "search_benchmark_")), refresh_interval=3600)
+        index.refresh(force=True)
+        return lambda: index.search("clause de résiliation du bail terme7", limit=10)
+
+    def document_refresh(size: int) -> Callable[[], Any]:
+        from content_store import ContentStore
+        from document_index import DocumentIndex
+        directory = report_corpus(size, "refresh_benchmark_")
+        DocumentIndex(ContentStore(directory)).refresh(force=True)
+
+        def refresh() -> Dict[str, int]:
+            # A new process: fresh store and index over an unchanged, already indexed directory
+            store = ContentStore(directory)
+            changes = DocumentIndex(store).refresh(force=True)
+            store.connection.close()
+            return changes
+        return refresh
+
+    def knowledge_search(size: int) -> Callable[[], Any]:
+        from knowledge_index import KnowledgeIndex
+        from knowledge_search import load_section_search
+        directory = _scratch_dir("knowledge_benchmark_")
+        index = KnowledgeIndex(directory / "index.db")
+        index.sync(sorted((MODULE_DIR / "knowledge").glob("*.md")))
+        search = load_section_search(index, directory / "search")
+        questions = ["cost approach depreciation", "cap rate income approach", "market risk indicators", "AVM accuracy"]
+        queries = [questions[number % len(questions)] for number in range(size)]
+        return lambda: search.search_batch(queries, limit=5)
+
+    return {
+        "batch.analyze_investment_portfolio": portfolio,
+        "batch.simulate_investment": simulation,
+        "batch.assess_risk_portfolio": risk_screen,
+        "batch.irr": irr_batch,
+        "batch.npv": npv_batch,
+        "batch.amortization_schedule": amortization,
+        "batch.project_monthly_cash_flows": projection,
+        "batch.profile_neighborhoods": neighborhoods,
+        "batch.check_compliance_portfolio": compliance,
+        "batch.search_documents": document_search,
+        "batch.refresh_documents": document_refresh,
+        "batch.knowledge_search": knowledge_search,
+    }
+
+
+def _cache_cases() -> Dict[str, Callable[[int], Callable[[], Any]]]:
+    def response_hit(size: int) -> Callable[[], Any]:
+        sys.path.append(str(ROOT))
+        from response_cache import ResponseCache
+        cache = ResponseCache(_scratch_dir("response_cache_benchmark_") / "cache.db")
+        prompt = "Conduct a comprehensive property valuation of 12 Rue Ibnou Mounir, Maarif"
+        cache.put("module1", prompt, "### Final valuation report\n" + "Details. " * 2_000, {"mode": "team"})
+        return lambda: cache.get("module1", prompt.upper() + " ?", {"mode": "team"})
+
+    return {"cache.response_cache.hit": response_hit}
+
+
+def _import_cases() -> Dict[str, Callable[[int], Callable[[], Any]]]:
+    return {
+        "import.module1": lambda size: _import_seconds("module1"),
+        "import.tools": lambda size: _import_seconds("tools"),
+    }
+
+
+def benchmark_cases() -> Dict[str, Dict[str, Any]]:
+    """All cases with the flag telling whether they scale with the input size."""
+    cases = {}
+    groups = (
+        (_tool_cases, False), (_script_cases, False), (_batch_cases, True), (_cache_cases, False), (_import_cases, False)
+    )
+    for group, scales in groups:
+        cases.update({name: {"setup": setup, "scales": scales} for name, setup in group().items()})
+    return cases
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def measure(
+    setup: Callable[[int], Callable[[], Any]],
+    size: int,
+    repeat: int,
+    max_seconds: float,
+) -> Dict[str, Any]:
+    """
+    Time one case at one size.
+
+    One warm-up call is made first; then up to ``repeat`` calls are timed,
+    stopping early (after at least 3) once ``max_seconds`` have elapsed.
+    Callables that return a float are treated as self-timed (import cases).
+    """
+    function = setup(size)
+    warmup = function()
+    self_timed = isinstance(warmup, float)
+
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < repeat and (len(samples) < 3 or time.perf_counter() - started < max_seconds):
+        start = time.perf_counter()
+        value = function()
+        samples.append(value if self_timed else time.perf_counter() - start)
+
+    samples_ms = np.array(samples) * 1000
+    return {
+        "samples": len(samples),
+        "mean_ms": round(float(samples_ms.mean()), 4),
+        "min_ms": round(float(samples_ms.min()), 4),
+        **{
+            f"p{percentile}_ms": round(float(value), 4)
+            for percentile, value in zip(PERCENTILES, np.percentile(samples_ms, PERCENTILES))
+        },
+    }
+
+
+def check_budgets(results: List[Dict[str, Any]], budgets: Dict[str, float] = IMPORT_BUDGETS_MS) -> None:
+    """Flag the cases whose median exceeds their budget."""
+    for entry in results:
+        budget = budgets.get(entry["name"])
+        if budget is None or entry.get("status") == "error":
+            continue
+        entry["budget_ms"] = budget
+        if entry["p50_ms"] > budget:
+            entry["status"] = "over_budget"
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], threshold: float) -> None:
+    """Annotate results with the relative change of the median against the baseline."""
+    reference = {(entry["name"], entry["size"]): entry for entry in baseline.get("results", [])}
+    for entry in results:
+        if entry.get("status") == "error":
+            continue
+        previous = reference.get((entry["name"], entry["size"]))
+        if previous is None or "p50_ms" not in previous:
+            # Not in the baseline, or failed there: nothing to compare against
+            entry["status"] = "new"
+            continue
+        change = entry["p50_ms"] / previous["p50_ms"] - 1 if previous["p50_ms"] else 0.0
+        entry["baseline_p50_ms"] = previous["p50_ms"]
+        entry["change_pct"] = round(change * 100, 2)
+        entry["status"] = "regression" if change > threshold else "improved" if change < -threshold else "unchanged"
+
+
+def _metadata() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+    }
+
+
+def run(
+    sizes: List[int],
+    repeat: int = 30,
+    max_seconds: float = 5.0,
+    name_filter: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Run every (matching) case; failing cases are recorded with their error."""
+    global _scratch_root
+    results = []
+    _scratch_root = Path(tempfile.mkdtemp(prefix="benchmarks_"))
+    try:
+        for name, case in benchmark_cases().items():
+            if name_filter and name_filter not in name:
+                continue
+            case_sizes = [size for size in sizes if size <= MAX_SIZES.get(name, size)] if case["scales"] else [1]
+            for size in case_sizes:
+                entry = {"name": name, "size": size}
+                try:
+                    entry.update(measure(case["setup"], size, repeat, max_seconds))
+                    entry["status"] = "ok"
+                    print(f"{name:45s} {size:>8d}  p50 {entry['p50_ms']:10.3f} ms  p90 {entry['p90_ms']:10.3f} ms")
+                except Exception as error:  # missing optional dependencies, script failures
+                    entry.update({"status": "error", "error": f"{type(error).__name__}: {error}"})
+                    print(f"{name:45s} {size:>8d}  ERROR {entry['error']}")
+                results.append(entry)
+    finally:
+        # Stores still open in this process are unlinked too (ignored where the OS refuses)
+        shutil.rmtree(_scratch_root, ignore_errors=True)
+        _scratch_root = None
+        _poi_index_dir.cache_clear()
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Batch sizes for scaling cases")
+    parser.add_argument("--repeat", type=int, default=30, help="Maximum timed calls per case and size")
+    parser.add_argument("--max-seconds", type=float, default=5.0, help="Time budget per case and size")
+    parser.add_argument("--filter", dest="name_filter", help="Only run cases whose name contains this text")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="Results file (JSON)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative p50 change flagged as a regression")
+    parser.add_argument("--save-baseline", action="store_true", help="Also write the results as the new baseline")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 on any regression")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.repeat, args.max_seconds, args.name_filter)
+    if args.baseline.exists():
+        compare(results, json.loads(args.baseline.read_text()), args.threshold)
+    check_budgets(results)
+
+    report = {"metadata": _metadata(), "threshold": args.threshold, "results": results}
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {args.output}")
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2))
+        print(f"Baseline written to {args.baseline}")
+
+    regressions = [entry for entry in results if entry.get("status") in ("regression", "over_budget")]
+    for entry in regressions:
+        if entry["status"] == "over_budget":
+            print(f"Over budget: {entry['name']} p50 {entry['p50_ms']:.1f} ms > {entry['budget_ms']:.0f} ms")
+        else:
+            print(f"Regression: {entry['name']} (size {entry['size']}) {entry['change_pct']:+.1f}%")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
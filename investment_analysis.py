@@ -1,7 +1,19 @@
 # Investment Analysis for Casablanca Property
 
+import sys
+from pathlib import Path
+
 import numpy as np
 
+sys.path.append(str(Path(__file__).parent / "modules" / "module1"))
+from cash_flow_projection import (
+    NET_CASH_FLOW,
+    SALE_PROCEEDS,
+    annual_totals,
+    project_monthly_cash_flows,
+)
+from financial_math import horizon_metrics
+
 # Property details
 property_value = 4500000  # MAD
 monthly_rent = 35000     # MAD
@@ -44,65 +56,36 @@ annual_mortgage = monthly_mortgage * 12
 # Annual cash flow
 annual_cash_flow = annual_rent - annual_expenses - annual_mortgage
 
-# Investment analysis for different periods
+# Monthly projection over the longest horizon: rent net of vacancy, fixed costs and the
+# amortizing loan's interest/principal split
+max_horizon = 20
+projection = project_monthly_cash_flows(
+    property_value,
+    monthly_rent,
+    max_horizon * 12,
+    vacancy_rate=vacancy_rate,
+    monthly_expenses=(property_value * property_tax_rate + maintenance_cost + insurance_cost + management_fee) / 12,
+    loan_amount=loan_amount,
+    interest_rate=interest_rate,
+    loan_term_years=loan_term,
+)
+annual_cash_flows = (annual_totals(projection, NET_CASH_FLOW) - annual_totals(projection, SALE_PROCEEDS))[0]
+
+# Investment analysis for every exit horizon up to 20 years, computed in one pass
+horizons = horizon_metrics(down_payment, annual_cash_flows, rates=[0.05, 0.08, 0.10])
+
 def calculate_metrics(period):
-    # Cash flows array (simplified - assuming constant cash flow)
-    cash_flows = [-(down_payment)] + [annual_cash_flow] * period
-    
-    # Calculate NPV at different discount rates
-    def npv(rate, cash_flows):
-        total = -cash_flows[0]  # Initial investment
-        for i in range(1, len(cash_flows)):
-            total += cash_flows[i] / (1 + rate)**i
-        return total
-    
-    npv_5 = npv(0.05, cash_flows)
-    npv_8 = npv(0.08, cash_flows)
-    npv_10 = npv(0.10, cash_flows)
-    
-    # Calculate IRR using Newton-Raphson method
-    def irr(cash_flows, max_iterations=1000, precision=1e-07):
-        def npv_irr(rate):
-            total = -cash_flows[0]
-            for i in range(1, len(cash_flows)):
-                total += cash_flows[i] / (1 + rate)**i
-            return total
-        
-        guess = 0.1  # Initial guess of 10%
-        for _ in range(max_iterations):
-            npv_guess = npv_irr(guess)
-            derivative = (npv_irr(guess + precision) - npv_guess) / precision
-            if abs(derivative) < precision:
-                break  # Avoid division by zero
-            new_guess = guess - npv_guess / derivative
-            if abs(new_guess - guess) < precision:
-                return new_guess
-            guess = new_guess
-        return guess
-    
-    irr_value = irr(cash_flows)
-    
-    # Calculate ROI
-    total_cash_in = down_payment
-    total_cash_out = sum([cf for cf in cash_flows[1:] if cf > 0])
-    roi = ((total_cash_out - total_cash_in) / total_cash_in) * 100
-    
-    # Calculate cumulative cash flow
-    cumulative_cash_flow = np.cumsum(cash_flows)
-    
-    # Calculate payback period
-    payback_period = None
-    for i, cash_flow in enumerate(cumulative_cash_flow):
-        if cash_flow > 0:
-            payback_period = i
-            break
+    # Read one horizon off the precomputed curve
+    index = period - 1
+    npv_5, npv_8, npv_10 = horizons['npv'][index].tolist()
+    payback_period = horizons['payback_period'][index]
     
     return {
         'npv': {'5%': npv_5, '8%': npv_8, '10%': npv_10},
-        'irr': irr_value * 100,  # Convert to percentage
-        'roi': roi,
-        'cumulative_cash_flow': cumulative_cash_flow.tolist(),
-        'payback_period': payback_period
+        'irr': float(horizons['irr'][index]) * 100,  # Convert to percentage
+        'roi': float(horizons['roi'][index]),
+        'cumulative_cash_flow': horizons['cumulative_cash_flow'][:period + 1].tolist(),
+        'payback_period': None if np.isnan(payback_period) else int(payback_period)
     }
 
 # Calculate for 5, 10, and 20 years
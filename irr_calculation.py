@@ -1,28 +1,13 @@
 # irr_calculation.py
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent / "modules" / "module1"))
+from financial_math import irr as solve_irr
 
 def calculate_irr(cash_flows, max_iterations=1000, tolerance=1e-6):
-    """Calculate Internal Rate of Return (IRR) using the Newton-Raphson method."""
-    
-    def npv(rate):
-        return sum(cf / ((1 + rate) ** i) for i, cf in enumerate(cash_flows))
-    
-    def npv_derivative(rate):
-        return sum(-i * cf / ((1 + rate) ** (i + 1)) for i, cf in enumerate(cash_flows))
-    
-    # Initial guess
-    rate = 0.1
-    
-    for _ in range(max_iterations):
-        npv_val = npv(rate)
-        npv_deriv = npv_derivative(rate)
-        new_rate = rate - npv_val / npv_deriv
-        
-        if abs(new_rate - rate) < tolerance:
-            return new_rate
-        
-        rate = new_rate
-    
-    return rate
+    """Calculate Internal Rate of Return (IRR) with the bracketed Newton/bisection solver."""
+    return float(solve_irr(cash_flows, tol=tolerance, max_iter=max_iterations))
 
 # Given data
 cash_flows = [-110000, 3200, 3200, 3200, 3200, 3200, 3200, 3200, 3200, 3200, 3200, 3200, 3200]
@@ -1,8 +1,11 @@
 import streamlit as st
 import sys
+import time
 from pathlib import Path
 import markdown
 
+from response_cache import ResponseCache
+
 # ------------------------------
 # Ajouter le dossier modules au PYTHONPATH
 # ------------------------------
@@ -47,21 +50,27 @@ def get_module_team(module_name):
         if module_name not in modules:
             return None
         module = modules[module_name]
-        if hasattr(module, "PropertyValuationTeam"):
-            return getattr(module, "PropertyValuationTeam")
+        # Built on the first question, then shared by every rerun and session
+        if hasattr(module, "get_team"):
+            return module.get_team()
         return None
     except Exception as e:
         st.error(f"Erreur lors du chargement de {module_name}: {e}")
         return None
 
-def display_chat_message(message, is_user=True):
-    """Affiche un message style chat"""
+@st.cache_resource
+def get_response_cache():
+    """Cache des réponses (SQLite sur disque), partagé par toutes les sessions du processus"""
+    return ResponseCache()
+
+def display_chat_message(message, is_user=True, container=None):
+    """Affiche un message style chat (dans ``container``, par ex. un st.empty(), si fourni)"""
     html_message = markdown.markdown(message, extensions=['nl2br'])
     bubble_color = "#0ea5e9" if is_user else "#f3f4f6"
     text_color = "white" if is_user else "black"
     align = "right" if is_user else "left"
 
-    st.markdown(
+    (container or st).markdown(
         f"""
         <div style="margin:8px 0; text-align:{align}">
             <div style="
@@ -82,6 +91,54 @@ def display_chat_message(message, is_user=True):
         unsafe_allow_html=True,
     )
 
+def _progress_message(event):
+    """Texte de progression pour un événement intermédiaire du run, None s'il n'y a rien à afficher"""
+    name = getattr(event, "event", "") or ""
+    tool = getattr(event, "tool", None)
+    tool_name = getattr(tool, "tool_name", None) or "outil"
+    tool_args = getattr(tool, "tool_args", None) or {}
+    member = getattr(event, "agent_name", None) or getattr(event, "agent_id", None)
+    if name.endswith("ToolCallStarted"):
+        if "member" in tool_name:
+            # Délégation du leader à un membre (transfer/forward_task_to_member)
+            return f"👥 Délégation à **{tool_args.get('member_id', 'un membre')}**"
+        return f"🔧 {member or 'Team'} → `{tool_name}`"
+    if name.endswith("ToolCallCompleted"):
+        return f"✅ `{tool_name}` terminé"
+    if name in ("RunStarted", "ReasoningStarted") and member:
+        return f"🧑‍💼 {member} au travail..."
+    if name == "RunCompleted" and member:
+        return f"📝 Rapport de {member} reçu"
+    return None
+
+
+def stream_team_response(team, prompt, placeholder, status, refresh_seconds=0.05):
+    """
+    Exécute la team en streaming et affiche la réponse au fur et à mesure.
+
+    Le contenu du leader est rendu dans ``placeholder`` (au plus toutes les
+    ``refresh_seconds``), les événements des membres et des outils dans
+    ``status``. Retourne le texte complet.
+    """
+    text = ""
+    shown_at = 0.0
+    for event in team.run(prompt, stream=True, stream_intermediate_steps=True):
+        name = getattr(event, "event", "") or ""
+        content = getattr(event, "content", None)
+        # Seul le contenu de la team forme la réponse; celui des membres n'est qu'une progression
+        if name == "TeamRunResponseContent" and isinstance(content, str):
+            text += content
+            if time.monotonic() - shown_at >= refresh_seconds:
+                display_chat_message(text, is_user=False, container=placeholder)
+                shown_at = time.monotonic()
+            continue
+        progress = _progress_message(event)
+        if progress:
+            status.write(progress)
+    display_chat_message(text, is_user=False, container=placeholder)
+    return text
+
+
 def chat_interface(module_name):
     """Interface de chat avec la team"""
     module_info = MODULES[module_name]
@@ -110,18 +167,48 @@ def chat_interface(module_name):
         st.session_state[chat_key].append({"content": prompt, "is_user": True})
         display_chat_message(prompt, is_user=True)
 
-        team = get_module_team(module_name)
-        if team:
-            with st.spinner("Analyse en cours..."):
+        placeholder = None
+        module = modules.get(module_name)
+        parallel = bool(st.session_state.get("parallel_mode")) and hasattr(module, "run_parallel_valuation")
+        # Le mode d'exécution change la forme de la réponse : il fait partie de la clé
+        context = {"mode": "parallel" if parallel else "team"}
+        cache = get_response_cache()
+        response = cache.get(module_name, prompt, context)
+        if response is not None:
+            # Même question déjà traitée : réponse immédiate, sans appel aux LLM
+            st.caption("⚡ Réponse en cache")
+        elif parallel:
+            # Les experts travaillent en parallèle, le leader fusionne leurs rapports
+            with st.spinner("Analyse parallèle en cours..."):
                 try:
-                    response = team.run(prompt).content
+                    result = module.run_parallel_valuation(prompt)
+                    response = result["report"]
+                    missing = [agent for agent, member in result["members"].items() if member["status"] != "ok"]
+                    if missing:
+                        response += f"\n\n⚠️ Analyses incomplètes : {', '.join(missing)}"
+                    else:
+                        cache.put(module_name, prompt, response, context)
                 except Exception as e:
                     response = f"Erreur lors de l'appel à la team: {str(e)}"
         else:
-            response = "⚠️ Team non disponible."
+            team = get_module_team(module_name)
+            if team:
+                # Réponse en streaming : progression des membres et outils, puis texte au fil de l'eau
+                status = st.status("Analyse en cours...", expanded=False)
+                placeholder = st.empty()
+                try:
+                    response = stream_team_response(team, prompt, placeholder, status)
+                    status.update(label="Analyse terminée", state="complete")
+                    if response.strip():
+                        cache.put(module_name, prompt, response, context)
+                except Exception as e:
+                    response = f"Erreur lors de l'appel à la team: {str(e)}"
+                    status.update(label="Analyse interrompue", state="error")
+            else:
+                response = "⚠️ Team non disponible."
 
         st.session_state[chat_key].append({"content": response, "is_user": False})
-        display_chat_message(response, is_user=False)
+        display_chat_message(response, is_user=False, container=placeholder)
 
 def main():
     with st.sidebar:
@@ -130,6 +217,11 @@ def main():
         if st.button("Property Valuation", use_container_width=True):
             st.session_state.current_module = "module1"
             st.rerun()
+        st.toggle("⚡ Analyse parallèle des experts", key="parallel_mode",
+                  help="Les quatre experts travaillent en même temps, puis le leader fusionne leurs rapports")
+        if st.button("🗑️ Vider le cache des réponses", use_container_width=True):
+            removed = get_response_cache().invalidate()
+            st.success(f"{removed} réponse(s) supprimée(s) du cache")
 
     if "current_module" not in st.session_state:
         st.session_state.current_module = "module1"
@@ -1,7 +1,190 @@
 from agno.tools import tool
+import re
 from typing import Dict, Any, List, Optional
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
+
+import compliance_rules
+from cash_flow_projection import (
+    LOAN_BALANCE,
+    NET_CASH_FLOW,
+    SALE_PROCEEDS,
+    annual_totals,
+    project_monthly_cash_flows,
+    summarize_projection,
+)
+import demographic_store
+import economic_store
+from financial_math import horizon_metrics, irr, loan_balance, monthly_payment
+import poi_index
+from risk_simulation import (
+    DEFAULT_CATEGORY_CORRELATION,
+    DEFAULT_WITHIN_CATEGORY_CORRELATION,
+    simulate_risk_losses,
+)
+from tool_cache import cached_tool
+
+
+# Risk catalog: (category, risk, probability range, impact range, description, mitigation)
+RISK_CATALOG = [
+    ("market", "price_volatility", (0.3, 0.7), (0.1, 0.3),
+     "Property value fluctuations due to market conditions",
+     "Diversify portfolio, monitor market trends"),
+    ("market", "liquidity_risk", (0.2, 0.5), (0.15, 0.4),
+     "Difficulty selling property quickly at fair market value",
+     "Maintain cash reserves, price competitively"),
+    ("market", "interest_rate_risk", (0.4, 0.8), (0.1, 0.25),
+     "Impact of changing interest rates on property values",
+     "Fixed-rate financing, rate hedging strategies"),
+    ("environmental", "flood_risk", (0.1, 0.4), (0.2, 0.8),
+     "Property damage from flooding events",
+     "Flood insurance, elevation certificates, drainage improvements"),
+    ("environmental", "climate_change", (0.6, 0.9), (0.1, 0.4),
+     "Long-term climate impacts on property value",
+     "Energy efficiency upgrades, sustainable features"),
+    ("financial", "cash_flow_risk", (0.3, 0.6), (0.2, 0.5),
+     "Rental income shortfalls or vacancy periods",
+     "Tenant screening, lease guarantees, reserve funds"),
+    ("financial", "credit_risk", (0.2, 0.4), (0.3, 0.7),
+     "Financing difficulties or rate increases",
+     "Strong credit profile, multiple lender relationships"),
+    ("legal", "regulatory_changes", (0.4, 0.7), (0.1, 0.4),
+     "New regulations affecting property use or value",
+     "Stay informed on regulations, legal compliance"),
+    ("legal", "title_issues", (0.1, 0.3), (0.5, 0.9),
+     "Title defects or ownership disputes",
+     "Title insurance, thorough title search"),
+]
+RISK_CATEGORIES = ["market", "environmental", "financial", "legal"]
+
+# Share of the value lost when a risk of impact 1 materialises
+RISK_LOSS_SEVERITY = 0.2
+
+# Loss simulation settings used by risk_assessment_engine unless overridden
+DEFAULT_LOSS_SIMULATION = {
+    "n_draws": 200_000,
+    "confidence_levels": [0.95, 0.99],
+    "copula": "gaussian",
+    "degrees_of_freedom": 4,
+    "correlation": DEFAULT_CATEGORY_CORRELATION,
+    "within_category_correlation": DEFAULT_WITHIN_CATEGORY_CORRELATION
+}
+
+
+def _risk_levels(scores: np.ndarray) -> np.ndarray:
+    """Low / Medium / High labels for overall risk scores."""
+    return np.where(scores < 0.3, "Low", np.where(scores < 0.6, "Medium", "High"))
+
+
+def risk_scores(
+    property_values: np.ndarray,
+    risk_categories: List[str],
+    rng: np.random.Generator,
+) -> Dict[str, Any]:
+    """
+    Vectorized risk kernel shared by the scalar and batch assessments.
+    
+    Draws the whole (properties x risks x {probability, impact}) tensor in one
+    Generator call and reduces it to category and overall scores. The expected
+    loss adds up each risk's probability times its severity (impact scaled by
+    RISK_LOSS_SEVERITY), capped at the full value.
+    """
+    categories = [category for category in risk_categories if category in RISK_CATEGORIES]
+    if not categories:
+        raise ValueError(f"No known risk categories in {risk_categories}; expected {RISK_CATEGORIES}")
+    rows = [index for index, entry in enumerate(RISK_CATALOG) if entry[0] in categories]
+    low = np.array([[RISK_CATALOG[row][2][0], RISK_CATALOG[row][3][0]] for row in rows])
+    high = np.array([[RISK_CATALOG[row][2][1], RISK_CATALOG[row][3][1]] for row in rows])
+    
+    draws = rng.uniform(low, high, size=(len(property_values), len(rows), 2))
+    probability, impact = draws[..., 0], draws[..., 1]
+    risk_score = probability * impact
+    
+    # Category averages and the overall score (mean of the category averages)
+    row_categories = np.array([RISK_CATALOG[row][0] for row in rows])
+    category_scores = {
+        category: risk_score[:, row_categories == category].mean(axis=1)
+        for category in categories
+    }
+    overall_risk_score = np.mean(list(category_scores.values()), axis=0)
+    severity = impact * RISK_LOSS_SEVERITY
+    expected_loss = np.minimum((probability * severity).sum(axis=1), 1.0) * property_values
+    
+    return {
+        "rows": rows,
+        "probability": probability,
+        "impact": impact,
+        "severity": severity,
+        "risk_score": risk_score,
+        # Highest score first; stable so ties keep catalog order
+        "ranking": np.argsort(-risk_score, axis=1, kind="stable"),
+        "category_scores": category_scores,
+        "overall_risk_score": overall_risk_score,
+        "risk_level": _risk_levels(overall_risk_score),
+        "expected_loss": expected_loss,
+        "risk_adjusted_value": property_values - expected_loss
+    }
+
+
+def assess_risk_portfolio(
+    data: Optional[Any] = None,
+    risk_categories: List[str] = RISK_CATEGORIES,
+    seed: Optional[int] = None,
+    top_n: int = 1,
+    decimals: Optional[int] = 3,
+    **columns: Any,
+) -> Any:
+    """
+    Screen many properties in one vectorized call (batch mode of risk_assessment_engine).
+    
+    Args:
+        data: DataFrame or mapping with ``property_address`` and ``property_value`` columns
+        risk_categories: Categories to assess (market, environmental, financial, legal)
+        seed: Seed for reproducible draws (None draws fresh entropy)
+        top_n: Number of top risk names reported per property
+        decimals: Rounding applied to the scores (None to skip); values use 2 decimals
+        **columns: Columns passed as keyword arrays, overriding ``data``
+        
+    Returns:
+        Columnar results (address, overall score and level, one score per category,
+        expected loss, risk-adjusted value, top risks) as a DataFrame when ``data``
+        is a DataFrame and a dict of arrays otherwise
+    """
+    inputs = {}
+    if data is not None:
+        available = data.columns if hasattr(data, "columns") else data.keys()
+        inputs.update({key: np.asarray(data[key]) for key in available if key in ("property_address", "property_value")})
+    inputs.update({key: np.asarray(value) for key, value in columns.items()})
+    if "property_value" not in inputs:
+        raise ValueError("assess_risk_portfolio requires a property_value column")
+    property_values = np.atleast_1d(inputs["property_value"].astype(float))
+    addresses = inputs.get("property_address", np.arange(len(property_values)).astype(str))
+    
+    scores = risk_scores(property_values, risk_categories, np.random.default_rng(seed))
+    
+    def rounded(values: np.ndarray, digits: Optional[int]) -> np.ndarray:
+        return np.round(values, digits) if digits is not None else values
+    
+    risk_names = np.array([RISK_CATALOG[row][1] for row in scores["rows"]])
+    results = {
+        "property_address": np.broadcast_to(addresses, property_values.shape),
+        "property_value": property_values,
+        "overall_risk_score": rounded(scores["overall_risk_score"], decimals),
+        "risk_level": scores["risk_level"],
+        **{
+            f"{category}_score": rounded(values, decimals)
+            for category, values in scores["category_scores"].items()
+        },
+        "expected_loss": rounded(scores["expected_loss"], 2 if decimals is not None else None),
+        "risk_adjusted_value": rounded(scores["risk_adjusted_value"], 2 if decimals is not None else None),
+    }
+    for rank in range(min(top_n, len(risk_names))):
+        results[f"top_risk_{rank + 1}"] = risk_names[scores["ranking"][:, rank]]
+    
+    if hasattr(data, "columns"):
+        import pandas as pd
+        return pd.DataFrame(results, index=data.index)
+    return results
 
 
 @tool(
@@ -14,6 +197,8 @@ def risk_assessment_engine(
     property_value: float,
     risk_categories: List[str] = ["market", "environmental", "financial", "legal"],
     assessment_horizon: int = 10,
+    seed: Optional[int] = None,
+    loss_simulation: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """
     Comprehensive risk assessment for real estate investments.
@@ -23,122 +208,70 @@ def risk_assessment_engine(
         property_value: Current property value
         risk_categories: Categories to assess (market, environmental, financial, legal)
         assessment_horizon: Assessment period in years
+        seed: Seed for reproducible risk draws (None draws fresh entropy)
+        loss_simulation: Overrides for the correlated loss simulation ("n_draws",
+            "confidence_levels", "copula" gaussian/t, "degrees_of_freedom", "correlation"
+            over RISK_CATEGORIES, "within_category_correlation"); see simulate_risk_losses
         
     Returns:
         Dictionary containing comprehensive risk assessment
     """
     current_date = datetime.now()
     
+    rng = np.random.default_rng(seed)
+    scores = risk_scores(np.array([float(property_value)]), risk_categories, rng)
+    
     # Risk assessment framework
     risk_assessments = {}
-    
-    if "market" in risk_categories:
-        market_risks = {
-            "price_volatility": {
-                "probability": np.random.uniform(0.3, 0.7),
-                "impact": np.random.uniform(0.1, 0.3),
-                "description": "Property value fluctuations due to market conditions",
-                "mitigation": "Diversify portfolio, monitor market trends"
-            },
-            "liquidity_risk": {
-                "probability": np.random.uniform(0.2, 0.5),
-                "impact": np.random.uniform(0.15, 0.4),
-                "description": "Difficulty selling property quickly at fair market value",
-                "mitigation": "Maintain cash reserves, price competitively"
-            },
-            "interest_rate_risk": {
-                "probability": np.random.uniform(0.4, 0.8),
-                "impact": np.random.uniform(0.1, 0.25),
-                "description": "Impact of changing interest rates on property values",
-                "mitigation": "Fixed-rate financing, rate hedging strategies"
-            }
-        }
-        risk_assessments["market"] = market_risks
-    
-    if "environmental" in risk_categories:
-        environmental_risks = {
-            "flood_risk": {
-                "probability": np.random.uniform(0.1, 0.4),
-                "impact": np.random.uniform(0.2, 0.8),
-                "description": "Property damage from flooding events",
-                "mitigation": "Flood insurance, elevation certificates, drainage improvements"
-            },
-            "climate_change": {
-                "probability": np.random.uniform(0.6, 0.9),
-                "impact": np.random.uniform(0.1, 0.4),
-                "description": "Long-term climate impacts on property value",
-                "mitigation": "Energy efficiency upgrades, sustainable features"
-            }
-        }
-        risk_assessments["environmental"] = environmental_risks
-    
-    if "financial" in risk_categories:
-        financial_risks = {
-            "cash_flow_risk": {
-                "probability": np.random.uniform(0.3, 0.6),
-                "impact": np.random.uniform(0.2, 0.5),
-                "description": "Rental income shortfalls or vacancy periods",
-                "mitigation": "Tenant screening, lease guarantees, reserve funds"
-            },
-            "credit_risk": {
-                "probability": np.random.uniform(0.2, 0.4),
-                "impact": np.random.uniform(0.3, 0.7),
-                "description": "Financing difficulties or rate increases",
-                "mitigation": "Strong credit profile, multiple lender relationships"
-            }
-        }
-        risk_assessments["financial"] = financial_risks
-    
-    if "legal" in risk_categories:
-        legal_risks = {
-            "regulatory_changes": {
-                "probability": np.random.uniform(0.4, 0.7),
-                "impact": np.random.uniform(0.1, 0.4),
-                "description": "New regulations affecting property use or value",
-                "mitigation": "Stay informed on regulations, legal compliance"
-            },
-            "title_issues": {
-                "probability": np.random.uniform(0.1, 0.3),
-                "impact": np.random.uniform(0.5, 0.9),
-                "description": "Title defects or ownership disputes",
-                "mitigation": "Title insurance, thorough title search"
-            }
-        }
-        risk_assessments["legal"] = legal_risks
-    
-    # Calculate overall risk metrics
     all_risks = []
-    for category, risks in risk_assessments.items():
-        for risk_name, risk_data in risks.items():
-            risk_score = risk_data["probability"] * risk_data["impact"]
-            all_risks.append({
-                "category": category,
-                "risk_name": risk_name,
-                "probability": risk_data["probability"],
-                "impact": risk_data["impact"],
-                "risk_score": risk_score,
-                "description": risk_data["description"],
-                "mitigation": risk_data["mitigation"]
-            })
+    for column, row in enumerate(scores["rows"]):
+        category, risk_name, _, _, description, mitigation = RISK_CATALOG[row]
+        probability = float(scores["probability"][0, column])
+        impact = float(scores["impact"][0, column])
+        risk_assessments.setdefault(category, {})[risk_name] = {
+            "probability": probability,
+            "impact": impact,
+            "description": description,
+            "mitigation": mitigation
+        }
+        all_risks.append({
+            "category": category,
+            "risk_name": risk_name,
+            "probability": probability,
+            "impact": impact,
+            "risk_score": float(scores["risk_score"][0, column]),
+            "description": description,
+            "mitigation": mitigation
+        })
     
     # Sort risks by score
-    all_risks.sort(key=lambda x: x["risk_score"], reverse=True)
-    
-    # Calculate category risk scores
-    category_scores = {}
-    for category in risk_categories:
-        if category in risk_assessments:
-            category_risks = [risk for risk in all_risks if risk["category"] == category]
-            avg_score = sum(risk["risk_score"] for risk in category_risks) / len(category_risks)
-            category_scores[category] = round(avg_score, 3)
-    
-    # Overall risk assessment
-    overall_risk_score = sum(category_scores.values()) / len(category_scores)
-    risk_level = "Low" if overall_risk_score < 0.3 else "Medium" if overall_risk_score < 0.6 else "High"
+    all_risks = [all_risks[column] for column in scores["ranking"][0]]
     
-    # Risk-adjusted value calculation
-    risk_discount = overall_risk_score * 0.2  # Max 20% discount for high risk
-    risk_adjusted_value = property_value * (1 - risk_discount)
+    category_scores = {
+        category: round(float(values[0]), 3) for category, values in scores["category_scores"].items()
+    }
+    overall_risk_score = float(scores["overall_risk_score"][0])
+    risk_level = str(scores["risk_level"][0])
+    
+    # Correlated loss distribution over the assessed categories
+    settings = {**DEFAULT_LOSS_SIMULATION, **(loss_simulation or {})}
+    categories = [category for category in RISK_CATEGORIES if category in risk_assessments]
+    drivers = [RISK_CATEGORIES.index(category) for category in categories]
+    losses = simulate_risk_losses(
+        scores["probability"][0],
+        scores["severity"][0],
+        [categories.index(RISK_CATALOG[row][0]) for row in scores["rows"]],
+        correlation=np.asarray(settings["correlation"], dtype=float)[np.ix_(drivers, drivers)],
+        within_category_correlation=settings["within_category_correlation"],
+        copula=settings["copula"],
+        degrees_of_freedom=settings["degrees_of_freedom"],
+        n_draws=int(settings["n_draws"]),
+        confidence_levels=settings["confidence_levels"],
+        rng=rng,
+    )
+    expected_loss = losses["expected_loss"] * property_value
+    risk_adjusted_value = property_value - expected_loss
+    first_level = next(iter(losses["value_at_risk"]))
     
     return {
         "property_info": {
@@ -152,8 +285,21 @@ def risk_assessment_engine(
             "risk_level": risk_level,
             "category_scores": category_scores,
             "top_risks": all_risks[:5],  # Top 5 risks
+            "expected_loss": round(expected_loss, 2),
             "risk_adjusted_value": round(risk_adjusted_value, 2),
-            "value_at_risk": round(property_value - risk_adjusted_value, 2)
+            "value_at_risk": round(losses["value_at_risk"][first_level] * property_value, 2)
+        },
+        "loss_distribution": {
+            "copula": losses["copula"],
+            "n_draws": losses["n_draws"],
+            "probability_of_loss": round(losses["probability_of_loss"], 4),
+            "value_at_risk": {
+                level: round(share * property_value, 2) for level, share in losses["value_at_risk"].items()
+            },
+            "conditional_value_at_risk": {
+                level: round(share * property_value, 2)
+                for level, share in losses["conditional_value_at_risk"].items()
+            }
         },
         "detailed_risks": risk_assessments,
         "mitigation_strategy": {
@@ -177,6 +323,7 @@ def risk_assessment_engine(
     description="Analyze demographic trends and population characteristics",
     show_result=True,
 )
+@cached_tool(maxsize=1024, ttl=3600, timestamps=[("location_info", "analysis_date")])
 def demographic_analyzer(
     location: str,
     analysis_radius: float = 1.0,
@@ -197,80 +344,45 @@ def demographic_analyzer(
     """
     current_date = datetime.now()
     
-    # Simulated demographic data
-    demographic_data = {}
-    
-    if "population" in demographic_categories:
-        population_data = {
-            "total_population": np.random.randint(15000, 100000),
-            "population_density": np.random.randint(1000, 8000),
-            "age_distribution": {
-                "under_18": np.random.uniform(15, 25),
-                "18_34": np.random.uniform(20, 35),
-                "35_54": np.random.uniform(25, 35),
-                "55_plus": np.random.uniform(15, 30)
-            },
-            "household_size": round(np.random.uniform(2.1, 2.8), 1),
-            "growth_rate": round(np.random.uniform(-0.5, 3.5), 2),
-            "migration_pattern": np.random.choice(["Inbound", "Outbound", "Stable"])
-        }
-        demographic_data["population"] = population_data
-    
-    if "income" in demographic_categories:
-        income_data = {
-            "median_household_income": np.random.randint(45000, 120000),
-            "per_capita_income": np.random.randint(25000, 65000),
-            "income_distribution": {
-                "under_25k": np.random.uniform(10, 25),
-                "25k_50k": np.random.uniform(15, 30),
-                "50k_75k": np.random.uniform(20, 30),
-                "75k_100k": np.random.uniform(15, 25),
-                "over_100k": np.random.uniform(10, 30)
-            },
-            "income_growth_rate": round(np.random.uniform(1.0, 4.0), 2),
-            "poverty_rate": round(np.random.uniform(5, 20), 1)
-        }
-        demographic_data["income"] = income_data
-    
-    if "education" in demographic_categories:
-        education_data = {
-            "high_school_graduation": round(np.random.uniform(80, 95), 1),
-            "bachelor_degree": round(np.random.uniform(20, 60), 1),
-            "advanced_degree": round(np.random.uniform(8, 25), 1),
-            "school_quality_rating": np.random.randint(6, 10)
-        }
-        demographic_data["education"] = education_data
-    
-    if "employment" in demographic_categories:
-        employment_data = {
-            "unemployment_rate": round(np.random.uniform(2.5, 8.0), 1),
-            "labor_force_participation": round(np.random.uniform(60, 75), 1),
-            "job_growth_rate": round(np.random.uniform(0.5, 3.5), 2),
-            "average_commute_time": np.random.randint(20, 45)
-        }
-        demographic_data["employment"] = employment_data
-    
-    # Calculate demographic score
-    score_factors = []
-    if "population" in demographic_data:
-        score_factors.append(min(demographic_data["population"]["growth_rate"] / 3, 1))
-    if "income" in demographic_data:
-        score_factors.append(min(demographic_data["income"]["median_household_income"] / 100000, 1))
-    if "education" in demographic_data:
-        score_factors.append(demographic_data["education"]["bachelor_degree"] / 100)
-    if "employment" in demographic_data:
-        score_factors.append(1 - demographic_data["employment"]["unemployment_rate"] / 10)
+    # Stored area (closest radius), or a stable synthetic estimate when the area is unknown
+    record = demographic_store.lookup(location, analysis_radius)
+    data_source = "demographic_store" if record is not None else "synthetic_estimate"
+    if record is None:
+        record = demographic_store.synthetic_record(location, analysis_radius)
     
-    demographic_score = sum(score_factors) / len(score_factors) if score_factors else 0.5
+    demographic_data = {}
+    for column, category, path, _ in demographic_store.DEMOGRAPHIC_FIELDS:
+        if category in demographic_categories:
+            section = demographic_data.setdefault(category, {})
+            for key in path[:-1]:
+                section = section.setdefault(key, {})
+            section[path[-1]] = record[column]
+    
+    # Calculate demographic score (precomputed in the store for the full category set)
+    selected = [category for category in demographic_store.DEMOGRAPHIC_CATEGORIES if category in demographic_categories]
+    if selected == demographic_store.DEMOGRAPHIC_CATEGORIES and record.get("demographic_score") is not None:
+        demographic_score = record["demographic_score"]
+    else:
+        demographic_score = demographic_store.demographic_score(record, selected) if selected else 0.5
     
     return {
         "location_info": {
             "location": location,
             "analysis_radius": analysis_radius,
+            "data_radius": record.get("radius_miles", analysis_radius),
+            "data_source": data_source,
             "analysis_date": current_date.isoformat(),
             "trend_period": trend_period
         },
         "demographic_data": demographic_data,
+        "trends": {
+            "population_trend": record["population_trend"],
+            "income_trend": record["income_trend"],
+            "projected_population": int(round(record["total_population"] * (1 + record["growth_rate"] / 100) ** trend_period)),
+            "projected_median_household_income": int(round(
+                record["median_household_income"] * (1 + record["income_growth_rate"] / 100) ** trend_period
+            ))
+        },
         "demographic_score": {
             "overall_score": round(demographic_score, 2),
             "rating": "Excellent" if demographic_score > 0.8 else "Good" if demographic_score > 0.6 else "Fair" if demographic_score > 0.4 else "Poor",
@@ -284,6 +396,72 @@ def demographic_analyzer(
     }
 
 
+def _compliance_rating(scores: np.ndarray) -> np.ndarray:
+    return np.select(
+        [scores > 0.9, scores > 0.7, scores > 0.5], ["Excellent", "Good", "Fair"], "Poor"
+    ).astype(object)
+
+
+def check_compliance_portfolio(
+    data: Optional[Any] = None,
+    compliance_areas: List[str] = compliance_rules.COMPLIANCE_AREAS,
+    property_type: str = "residential",
+    jurisdiction: str = "local",
+    rules_dir: Any = compliance_rules.DEFAULT_RULES_DIR,
+    **columns: Any,
+) -> Any:
+    """
+    Check many properties against the compiled rules in one call (batch mode of regulatory_compliance_checker).
+    
+    Args:
+        data: DataFrame or mapping with ``property_address``, optional ``property_type``
+            and ``jurisdiction`` columns and the property facts used by the rules
+        compliance_areas: Areas to check for compliance
+        property_type: Property type of rows without a ``property_type`` column
+        jurisdiction: Jurisdiction of rows without a ``jurisdiction`` column
+        rules_dir: Directory of the JSON rule files
+        **columns: Columns passed as keyword arrays, overriding ``data``
+        
+    Returns:
+        Columnar results (address, jurisdiction whose rules were applied, status
+        and violation count per covered area, overall score and rating) as a
+        DataFrame when ``data`` is a DataFrame and a dict of arrays otherwise
+    """
+    inputs = {}
+    if data is not None:
+        available = data.columns if hasattr(data, "columns") else data.keys()
+        inputs.update({key: np.asarray(data[key]) for key in available})
+    inputs.update({key: np.asarray(value) for key, value in columns.items()})
+    property_types = inputs.pop("property_type", property_type)
+    jurisdictions = inputs.pop("jurisdiction", jurisdiction)
+    addresses = inputs.pop("property_address", None)
+    
+    evaluation = compliance_rules.evaluate_compliance(
+        inputs, property_types, jurisdictions, compliance_areas, compliance_rules.load_rules(rules_dir)
+    )
+    scores = evaluation["overall_compliance_score"]
+    size = len(scores)
+    results = {
+        "property_address": np.broadcast_to(addresses if addresses is not None else np.arange(size).astype(str), (size,)),
+        "property_type": np.broadcast_to(np.asarray(property_types, dtype=object), (size,)),
+        "jurisdiction": np.broadcast_to(np.asarray(jurisdictions, dtype=object), (size,)),
+        "rules_jurisdiction": evaluation["jurisdictions"],
+    }
+    for area, outcome in evaluation["areas"].items():
+        violations = np.zeros(size, dtype=int)
+        for group in outcome["groups"]:
+            violations[group["members"]] = group["failed"].sum(axis=1)
+        results[f"{area}_status"] = outcome["status"]
+        results[f"{area}_violations"] = violations
+    results["overall_compliance_score"] = np.round(scores, 2)
+    results["compliance_rating"] = _compliance_rating(scores)
+    
+    if hasattr(data, "columns"):
+        import pandas as pd
+        return pd.DataFrame(results, index=data.index)
+    return results
+
+
 @tool(
     name="regulatory_compliance_checker",
     description="Check regulatory compliance and identify compliance requirements",
@@ -294,6 +472,7 @@ def regulatory_compliance_checker(
     property_type: str = "residential",
     compliance_areas: List[str] = ["zoning", "building_codes", "environmental", "safety"],
     jurisdiction: str = "local",
+    property_facts: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """
     Check regulatory compliance and identify compliance requirements.
@@ -301,118 +480,85 @@ def regulatory_compliance_checker(
     Args:
         property_address: Address of the property
         property_type: Type of property (residential, commercial, industrial)
-        compliance_areas: Areas to check for compliance
-        jurisdiction: Jurisdiction level (local, state, federal)
+        compliance_areas: Areas to check for compliance (zoning, building_codes,
+            environmental, safety); other areas are listed as unsupported
+        jurisdiction: Jurisdiction level (local, state, federal); other names
+            (e.g. a city) are checked against the local rules
+        property_facts: Known facts about the property checked by the rules, e.g.
+            zoning_code, height_ft, front_setback_ft, side_setback_ft, lot_coverage,
+            year_built, smoke_detectors, carbon_monoxide_detectors,
+            electrical_panel_age_years, expired_permits, sprinkler_system,
+            fire_exits, ada_accessible; requirements without facts are reported as unverified
         
     Returns:
         Dictionary containing compliance assessment
     """
     current_date = datetime.now()
     
-    # Simulated compliance database
-    compliance_results = {}
+    # Compiled rules of the jurisdiction (and the jurisdictions it extends)
+    rules = compliance_rules.load_rules()
+    evaluation = compliance_rules.evaluate_compliance(
+        {key: [value] for key, value in (property_facts or {}).items()},
+        property_type, jurisdiction, compliance_areas, rules,
+    )
+    severity_names = {rank: name for name, rank in compliance_rules.SEVERITIES.items()}
+    applied_jurisdiction = evaluation["jurisdictions"][0]
     
-    if "zoning" in compliance_areas:
-        zoning_compliance = {
-            "current_zoning": np.random.choice(["R1", "R2", "R3", "C1", "C2", "M1"]),
-            "permitted_uses": [
-                "Single-family residential",
-                "Home office",
-                "Accessory dwelling unit"
-            ],
-            "restrictions": [
-                "Maximum height: 35 feet",
-                "Minimum setback: 25 feet front, 10 feet side",
-                "Maximum lot coverage: 40%"
-            ],
-            "compliance_status": np.random.choice(["Compliant", "Non-Compliant", "Conditional"]),
-            "required_permits": ["Building permit", "Occupancy permit"],
-            "recent_changes": "Zoning ordinance updated 2023-06-15"
-        }
-        compliance_results["zoning"] = zoning_compliance
-    
-    if "building_codes" in compliance_areas:
-        building_compliance = {
-            "applicable_codes": [
-                "International Building Code 2021",
-                "International Residential Code 2021",
-                "Local amendments"
-            ],
-            "compliance_status": np.random.choice(["Compliant", "Partially Compliant", "Non-Compliant"]),
-            "code_violations": [
-                {"violation": "Electrical panel not up to code", "severity": "Medium", "deadline": "2024-06-01"},
-                {"violation": "Missing smoke detectors", "severity": "High", "deadline": "2024-03-15"}
-            ],
-            "required_inspections": ["Electrical", "Plumbing", "HVAC", "Final"],
-            "permit_status": "Active permits: 2, Expired permits: 0"
-        }
-        compliance_results["building_codes"] = building_compliance
-    
-    if "environmental" in compliance_areas:
-        environmental_compliance = {
-            "environmental_assessments": {
-                "phase_1_esa": "Completed 2023-08-15",
-                "phase_2_esa": "Not required",
-                "asbestos_survey": "Completed 2023-07-20",
-                "lead_paint_assessment": "Required for pre-1978 construction"
-            },
-            "compliance_status": "Compliant",
-            "environmental_concerns": [
-                "Former gas station within 500 feet",
-                "Wetlands buffer zone restrictions"
-            ],
-            "required_permits": ["Stormwater permit", "Wetlands permit"],
-            "monitoring_requirements": "Annual groundwater monitoring"
-        }
-        compliance_results["environmental"] = environmental_compliance
-    
-    if "safety" in compliance_areas:
-        safety_compliance = {
-            "fire_safety": {
-                "sprinkler_system": "Required for commercial use",
-                "fire_exits": "Compliant",
-                "fire_alarm_system": "Installed and tested",
-                "last_inspection": "2023-12-01"
-            },
-            "accessibility": {
-                "ada_compliance": "Partially compliant",
-                "required_modifications": ["Ramp installation", "Bathroom modifications"],
-                "compliance_deadline": "2024-12-31"
-            },
-            "compliance_status": "Mostly Compliant"
+    compliance_results = {}
+    immediate_actions = []
+    missing_facts = set()
+    for area, outcome in evaluation["areas"].items():
+        group = outcome["groups"][0]
+        table = group["table"]
+        failed, unverified = group["failed"][0], group["unverified"][0]
+        violations = [
+            {
+                "rule": table.rule_ids[rule],
+                "violation": table.messages[rule],
+                "severity": severity_names[int(table.severities[rule])],
+                "remedy": table.remedies[rule]
+            }
+            for rule in np.flatnonzero(failed)
+        ]
+        immediate_actions += [violation["remedy"] for violation in violations if violation["severity"] == "High"]
+        for rule in np.flatnonzero(unverified):
+            condition = table.conditions[rule]
+            missing_facts.update(
+                field for field in (table.checks[rule][0], condition[0] if condition else None)
+                if field and field not in (property_facts or {})
+            )
+        compliance_results[area] = {
+            **rules.area_metadata(applied_jurisdiction, property_type, area),
+            "compliance_status": outcome["status"][0],
+            "rules_checked": len(table),
+            "violations": violations,
+            "unverified_requirements": [
+                {"rule": table.rule_ids[rule], "requirement": table.messages[rule]}
+                for rule in np.flatnonzero(unverified)
+            ]
         }
-        compliance_results["safety"] = safety_compliance
-    
-    # Calculate overall compliance score
-    compliance_scores = []
-    for area, data in compliance_results.items():
-        status = data.get("compliance_status", "Unknown")
-        if status == "Compliant":
-            compliance_scores.append(1.0)
-        elif status in ["Partially Compliant", "Mostly Compliant", "Conditional"]:
-            compliance_scores.append(0.7)
-        elif status == "Non-Compliant":
-            compliance_scores.append(0.3)
-        else:
-            compliance_scores.append(0.5)
-    
-    overall_compliance_score = sum(compliance_scores) / len(compliance_scores) if compliance_scores else 0.5
+    
+    overall_compliance_score = float(evaluation["overall_compliance_score"][0])
     
     return {
         "property_info": {
             "address": property_address,
             "property_type": property_type,
-            "jurisdiction": jurisdiction,
+            "jurisdiction": applied_jurisdiction,
+            "requested_jurisdiction": jurisdiction,
+            "rules_version": rules.versions[applied_jurisdiction],
             "assessment_date": current_date.isoformat()
         },
         "compliance_assessment": {
             "overall_compliance_score": round(overall_compliance_score, 2),
-            "compliance_rating": "Excellent" if overall_compliance_score > 0.9 else "Good" if overall_compliance_score > 0.7 else "Fair" if overall_compliance_score > 0.5 else "Poor",
-            "areas_assessed": compliance_areas,
+            "compliance_rating": _compliance_rating(np.array([overall_compliance_score]))[0],
+            "areas_assessed": list(evaluation["areas"]),
+            "unsupported_areas": evaluation["unsupported_areas"],
             "detailed_results": compliance_results
         },
         "recommendations": {
-            "immediate_actions": ["Address high-priority violations", "Update permits"],
+            "immediate_actions": immediate_actions or ["No high-severity violations found"],
+            "information_needed": sorted(missing_facts),
             "professional_consultation": [
                 "Zoning attorney for complex zoning issues",
                 "Building code consultant for code compliance",
@@ -423,17 +569,382 @@ def regulatory_compliance_checker(
     }
 
 
+DEFAULT_FINANCING_DETAILS = {
+    "down_payment_percent": 0.20,
+    "interest_rate": 0.065,
+    "loan_term_years": 30,
+    "closing_costs_percent": 0.03
+}
+
+DEFAULT_MARKET_ASSUMPTIONS = {
+    "annual_appreciation": 0.035,
+    "rental_yield": 0.08,
+    "rental_growth": 0.03,
+    "vacancy_rate": 0.05,
+    "expense_ratio": 0.35,
+    "discount_rate": 0.08
+}
+
+PORTFOLIO_METRICS = [
+    "initial_investment",
+    "annual_cash_flow",
+    "cash_on_cash_return",
+    "total_return",
+    "total_roi",
+    "annualized_return",
+    "final_property_value",
+    "npv",
+    "irr"
+]
+
+# Metrics reported as percentages by investment_analyzer
+_PERCENT_METRICS = {"cash_on_cash_return", "total_roi", "annualized_return", "irr"}
+
+
+def _investment_metrics(
+    property_value,
+    down_payment_percent,
+    interest_rate,
+    loan_term_years,
+    closing_costs_percent,
+    annual_appreciation,
+    rental_yield,
+    rental_growth,
+    vacancy_rate,
+    expense_ratio,
+    discount_rate,
+    analysis_period,
+    include_irr: bool = True,
+    include_annual: bool = False,
+    chunk_size: int = 10_000,
+) -> Dict[str, np.ndarray]:
+    """
+    Vectorized investment metrics shared by the scalar and portfolio analyzers.
+    
+    All arguments broadcast against each other; returns are decimals, not percentages.
+    Cash flows come from the monthly projection engine (rent growing yearly, the
+    amortizing loan and the sale at exit), ``chunk_size`` properties at a time.
+    NPV and IRR are computed on the yearly totals of that projection. Callers that
+    do not report IRR can skip the root finding with ``include_irr=False``;
+    ``include_annual=True`` adds the yearly operating cash flows and year-end loan
+    balances (one column per year) used by the exit analysis.
+    """
+    inputs = np.broadcast_arrays(*[np.asarray(value, dtype=float) for value in (
+        property_value, down_payment_percent, interest_rate, loan_term_years,
+        closing_costs_percent, annual_appreciation, rental_yield, rental_growth,
+        vacancy_rate, expense_ratio, discount_rate, analysis_period,
+    )])
+    shape = inputs[0].shape
+    (property_value, down_payment_percent, interest_rate, loan_term_years,
+     closing_costs_percent, annual_appreciation, rental_yield, rental_growth,
+     vacancy_rate, expense_ratio, discount_rate, analysis_period) = [value.ravel() for value in inputs]
+    
+    # Calculate initial investment
+    down_payment = property_value * down_payment_percent
+    closing_costs = property_value * closing_costs_percent
+    initial_investment = down_payment + closing_costs
+    loan_amount = property_value - down_payment
+    
+    # Property appreciation
+    final_property_value = property_value * (1 + annual_appreciation) ** analysis_period
+    total_appreciation = final_property_value - property_value
+    
+    # Monthly projection, summarised per property and per year
+    years = np.rint(analysis_period).astype(int)
+    months = int(years.max()) * 12
+    periods = np.arange(years.max() + 1)
+    annual_cash_flow = np.empty(len(years))
+    total_cash_flow = np.empty(len(years))
+    present_value = np.empty(len(years))
+    internal_rate = np.full(len(years), np.nan)
+    if include_annual:
+        operating_cash_flows = np.empty((len(years), len(periods) - 1))
+        year_end_balance = np.empty((len(years), len(periods) - 1))
+    
+    for start in range(0, len(years), chunk_size):
+        rows = slice(start, start + chunk_size)
+        projection = project_monthly_cash_flows(
+            property_value[rows],
+            property_value[rows] * rental_yield[rows] / 12,
+            months,
+            hold_months=years[rows] * 12,
+            rent_growth=rental_growth[rows],
+            vacancy_rate=vacancy_rate[rows],
+            expense_ratio=expense_ratio[rows],
+            loan_amount=loan_amount[rows],
+            interest_rate=interest_rate[rows],
+            loan_term_years=loan_term_years[rows],
+            initial_investment=initial_investment[rows],
+            annual_appreciation=annual_appreciation[rows],
+        )
+        summary = summarize_projection(projection)
+        annual_cash_flow[rows] = summary["first_year_cash_flow"]
+        total_cash_flow[rows] = summary["total_operating_cash_flow"]
+        
+        # Yearly series with the sale at exit, for NPV and IRR
+        cash_flows = np.empty((projection.shape[1], len(periods)))
+        cash_flows[:, 0] = -initial_investment[rows]
+        cash_flows[:, 1:] = annual_totals(projection, NET_CASH_FLOW)
+        present_value[rows] = np.sum(cash_flows * (1 + discount_rate[rows, None]) ** -periods, axis=1)
+        if include_irr:
+            internal_rate[rows] = irr(cash_flows)
+        if include_annual:
+            operating_cash_flows[rows] = cash_flows[:, 1:] - annual_totals(projection, SALE_PROCEEDS)
+            year_end_balance[rows] = projection[LOAN_BALANCE, :, 12::12]
+    
+    # Calculate returns
+    cash_on_cash_return = annual_cash_flow / initial_investment
+    total_return = total_cash_flow + total_appreciation
+    total_roi = total_return / initial_investment
+    with np.errstate(invalid="ignore"):
+        annualized_return = (1 + total_roi) ** (1 / analysis_period) - 1
+    
+    metrics = {
+        "initial_investment": initial_investment,
+        "annual_cash_flow": annual_cash_flow,
+        "cash_on_cash_return": cash_on_cash_return,
+        "total_return": total_return,
+        "total_roi": total_roi,
+        "annualized_return": annualized_return,
+        "final_property_value": final_property_value,
+        "npv": present_value,
+        "irr": internal_rate
+    }
+    if include_annual:
+        metrics["operating_cash_flows"] = operating_cash_flows
+        metrics["year_end_loan_balance"] = year_end_balance
+    return {name: values.reshape(shape + values.shape[1:]) for name, values in metrics.items()}
+
+
+def _simulation_metrics(
+    property_value,
+    down_payment_percent,
+    interest_rate,
+    loan_term_years,
+    closing_costs_percent,
+    annual_appreciation,
+    rental_yield,
+    rental_growth,
+    vacancy_rate,
+    expense_ratio,
+    discount_rate,
+    analysis_period: int,
+) -> Dict[str, np.ndarray]:
+    """
+    SIMULATION_METRICS of _investment_metrics from yearly cash flows only.
+    
+    Rent is level within a year and the loan payment is fixed, so each year's
+    operating cash flow has a closed form and the exit balance comes from
+    loan_balance: arrays are paths x years instead of paths x months, and no IRR
+    is solved. The results match _investment_metrics for the same inputs.
+    """
+    (property_value, down_payment_percent, interest_rate, loan_term_years,
+     closing_costs_percent, annual_appreciation, rental_yield, rental_growth,
+     vacancy_rate, expense_ratio, discount_rate) = [
+        value[:, None] for value in np.broadcast_arrays(*[np.atleast_1d(np.asarray(value, dtype=float)) for value in (
+            property_value, down_payment_percent, interest_rate, loan_term_years,
+            closing_costs_percent, annual_appreciation, rental_yield, rental_growth,
+            vacancy_rate, expense_ratio, discount_rate,
+        )])
+    ]
+    year = np.arange(analysis_period)
+    hold_months = analysis_period * 12
+    
+    initial_investment = property_value * (down_payment_percent + closing_costs_percent)
+    loan_amount = property_value * (1 - down_payment_percent)
+    payments = np.rint(loan_term_years * 12)
+    debt_service = monthly_payment(loan_amount, interest_rate, loan_term_years) * np.clip(payments - 12 * year, 0, 12)
+    operating_cash_flows = (
+        property_value * rental_yield * (1 + rental_growth) ** year * (1 - vacancy_rate) * (1 - expense_ratio)
+        - debt_service
+    )
+    
+    final_property_value = property_value * (1 + annual_appreciation) ** analysis_period
+    exit_balance = np.where(
+        payments > hold_months, loan_balance(loan_amount, interest_rate, loan_term_years, hold_months), 0.0
+    )
+    discount = (1 + discount_rate) ** -(year + 1.0)
+    present_value = (
+        np.sum(operating_cash_flows * discount, axis=1, keepdims=True)
+        + (final_property_value - exit_balance) * discount[:, -1:]
+        - initial_investment
+    )
+    total_roi = (operating_cash_flows.sum(axis=1, keepdims=True) + final_property_value - property_value) / initial_investment
+    with np.errstate(invalid="ignore"):
+        annualized_return = (1 + total_roi) ** (1 / analysis_period) - 1
+    return {
+        "annualized_return": annualized_return[:, 0],
+        "npv": present_value[:, 0],
+        "final_property_value": final_property_value[:, 0],
+    }
+
+
+def analyze_investment_portfolio(
+    data: Optional[Any] = None,
+    decimals: Optional[int] = 2,
+    **columns: Any,
+) -> Any:
+    """
+    Score many properties in one vectorized call (portfolio mode of investment_analyzer).
+    
+    Args:
+        data: DataFrame or mapping of columns. Recognised columns are ``property_value``,
+            ``analysis_period`` and every key of DEFAULT_FINANCING_DETAILS and
+            DEFAULT_MARKET_ASSUMPTIONS; missing columns fall back to those defaults.
+        decimals: Rounding applied to the outputs, as in investment_analyzer (None to skip)
+        **columns: Columns passed as keyword arrays, overriding ``data``
+        
+    Returns:
+        Columnar metrics (PORTFOLIO_METRICS) in the units investment_analyzer reports,
+        as a DataFrame when ``data`` is a DataFrame and a dict of arrays otherwise
+    """
+    inputs = {"analysis_period": 10, **DEFAULT_FINANCING_DETAILS, **DEFAULT_MARKET_ASSUMPTIONS}
+    if data is not None:
+        available = data.columns if hasattr(data, "columns") else data.keys()
+        inputs.update({key: np.asarray(data[key]) for key in available if key in inputs or key == "property_value"})
+    inputs.update({key: np.asarray(value) for key, value in columns.items()})
+    if "property_value" not in inputs:
+        raise ValueError("analyze_investment_portfolio requires a property_value column")
+    
+    metrics = _investment_metrics(**inputs)
+    results = {}
+    for name in PORTFOLIO_METRICS:
+        values = metrics[name]
+        if name in _PERCENT_METRICS:
+            values = values * 100
+        results[name] = np.round(values, decimals) if decimals is not None else np.array(values)
+    
+    if hasattr(data, "columns"):
+        import pandas as pd
+        return pd.DataFrame(results, index=data.index)
+    return results
+
+
+# Outputs summarised by the Monte Carlo simulation, in investment_analyzer units
+SIMULATION_METRICS = ["annualized_return", "npv", "final_property_value"]
+
+
+def _sample_assumption(rng: np.random.Generator, spec: Any, size: int) -> np.ndarray:
+    """
+    Draw ``size`` values of one assumption from its distribution spec.
+    
+    A plain number is a constant. A dict names a ``distribution`` (normal, lognormal,
+    uniform, triangular) with its parameters, plus optional ``min``/``max`` clipping.
+    """
+    if not isinstance(spec, dict):
+        return np.full(size, float(spec))
+    
+    distribution = spec.get("distribution", "normal")
+    if distribution == "normal":
+        values = rng.normal(spec["mean"], spec["std"], size)
+    elif distribution == "lognormal":
+        values = rng.lognormal(np.log(spec["mean"]), spec["sigma"], size)
+    elif distribution == "uniform":
+        values = rng.uniform(spec["low"], spec["high"], size)
+    elif distribution == "triangular":
+        values = rng.triangular(spec["low"], spec["mode"], spec["high"], size)
+    else:
+        raise ValueError(f"Unsupported distribution: {distribution}")
+    
+    if "min" in spec or "max" in spec:
+        values = np.clip(values, spec.get("min", -np.inf), spec.get("max", np.inf))
+    return values
+
+
+def simulate_investment(
+    property_value: float,
+    assumption_distributions: Optional[Dict[str, Any]] = None,
+    financing_details: Optional[Dict[str, Any]] = None,
+    market_assumptions: Optional[Dict[str, Any]] = None,
+    analysis_period: int = 10,
+    n_paths: int = 100_000,
+    seed: Optional[int] = None,
+    percentiles: List[float] = [5, 10, 25, 50, 75, 90, 95],
+    chunk_size: int = 25_000,
+) -> Dict[str, Any]:
+    """
+    Monte Carlo simulation of investment_analyzer over uncertain assumptions.
+    
+    Paths are generated and evaluated ``chunk_size`` at a time with the yearly kernel
+    _simulation_metrics (same results as the scalar analyzer, without its monthly
+    projection or IRR), so the sampled assumptions and the paths x years intermediate
+    arrays are bounded by the chunk. The outcomes are kept for exact percentiles, so memory
+    still grows as O(n_paths): one float per path and metric (about 2.4 MB for 100k paths).
+    The same ``seed`` and ``chunk_size`` reproduce the same results.
+    
+    Args:
+        property_value: Current property value
+        assumption_distributions: Distribution spec per assumption (any financing or
+            market key), e.g. {"annual_appreciation": {"distribution": "normal",
+            "mean": 0.035, "std": 0.02}}; see _sample_assumption
+        financing_details: Point financing assumptions for keys without a distribution
+        market_assumptions: Point market assumptions for keys without a distribution
+        analysis_period: Analysis period in years
+        n_paths: Number of simulated paths
+        seed: Seed for a reproducible run (None draws fresh entropy)
+        percentiles: Percentiles reported for each metric
+        chunk_size: Paths evaluated per vectorized batch
+        
+    Returns:
+        Dictionary with percentile bands and means for SIMULATION_METRICS
+    """
+    point_assumptions = {
+        **DEFAULT_FINANCING_DETAILS, **(financing_details or {}),
+        **DEFAULT_MARKET_ASSUMPTIONS, **(market_assumptions or {}),
+    }
+    assumption_distributions = assumption_distributions or {}
+    unknown = set(assumption_distributions) - set(point_assumptions)
+    if unknown:
+        raise ValueError(f"Unknown assumptions: {sorted(unknown)}")
+    
+    rng = np.random.default_rng(seed)
+    outcomes = {name: np.empty(n_paths) for name in SIMULATION_METRICS}
+    
+    for start in range(0, n_paths, chunk_size):
+        size = min(chunk_size, n_paths - start)
+        sampled = {
+            key: _sample_assumption(rng, assumption_distributions.get(key, value), size)
+            for key, value in point_assumptions.items()
+        }
+        metrics = _simulation_metrics(property_value=property_value, analysis_period=analysis_period, **sampled)
+        for name in SIMULATION_METRICS:
+            outcomes[name][start:start + size] = metrics[name]
+    outcomes["annualized_return"] *= 100
+    
+    return {
+        "n_paths": n_paths,
+        "seed": seed,
+        "distributions": assumption_distributions,
+        "percentiles": {
+            name: {
+                f"p{percentile:g}": round(float(value), 2)
+                for percentile, value in zip(percentiles, np.nanpercentile(values, percentiles))
+            }
+            for name, values in outcomes.items()
+        },
+        "mean": {name: round(float(np.nanmean(values)), 2) for name, values in outcomes.items()},
+        "probability_of_loss": round(float(np.mean(outcomes["npv"] < 0)), 4)
+    }
+
+
 @tool(
     name="investment_analyzer",
     description="Comprehensive investment analysis for real estate properties",
     show_result=True,
 )
+@cached_tool(
+    maxsize=256,
+    # Unseeded Monte Carlo runs are stochastic and must not be replayed
+    skip=lambda arguments: arguments["simulation"] is not None and arguments["simulation"].get("seed") is None,
+    timestamps=[("investment_info", "analysis_date")],
+)
 def investment_analyzer(
     property_value: float,
     investment_type: str = "buy_hold",
     financing_details: Optional[Dict[str, Any]] = None,
     market_assumptions: Optional[Dict[str, Any]] = None,
     analysis_period: int = 10,
+    simulation: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """
     Comprehensive investment analysis for real estate properties.
@@ -444,6 +955,8 @@ def investment_analyzer(
         financing_details: Financing parameters
         market_assumptions: Market growth and rental assumptions
         analysis_period: Analysis period in years
+        simulation: Optional Monte Carlo settings ("distributions", "n_paths", "seed",
+            "percentiles") adding percentile bands of the returns (see simulate_investment)
         
     Returns:
         Dictionary containing comprehensive investment analysis
@@ -451,59 +964,49 @@ def investment_analyzer(
     current_date = datetime.now()
     
     # Default parameters
-    if financing_details is None:
-        financing_details = {
-            "down_payment_percent": 0.20,
-            "interest_rate": 0.065,
-            "loan_term_years": 30,
-            "closing_costs_percent": 0.03
+    financing_details = {**DEFAULT_FINANCING_DETAILS, **(financing_details or {})}
+    market_assumptions = {**DEFAULT_MARKET_ASSUMPTIONS, **(market_assumptions or {})}
+    
+    metrics = _investment_metrics(
+        property_value=property_value,
+        analysis_period=analysis_period,
+        **{key: financing_details[key] for key in DEFAULT_FINANCING_DETAILS},
+        **{key: market_assumptions[key] for key in DEFAULT_MARKET_ASSUMPTIONS},
+        include_annual=True,
+    )
+    initial_investment = float(metrics["initial_investment"])
+    annual_cash_flow = float(metrics["annual_cash_flow"])
+    cash_on_cash_return = float(metrics["cash_on_cash_return"])
+    total_return = float(metrics["total_return"])
+    total_roi = float(metrics["total_roi"])
+    annualized_return = float(metrics["annualized_return"])
+    final_property_value = float(metrics["final_property_value"])
+    net_present_value = float(metrics["npv"])
+    internal_rate_of_return = float(metrics["irr"])
+    
+    # Exit analysis: NPV and IRR if the property is sold at the end of each year,
+    # from the yearly cash flows and loan balances of the projection above
+    exit_years = np.arange(1, len(metrics["operating_cash_flows"]) + 1)
+    sale_proceeds = (
+        property_value * (1 + market_assumptions["annual_appreciation"]) ** exit_years
+        - metrics["year_end_loan_balance"]
+    )
+    horizons = horizon_metrics(
+        initial_investment,
+        metrics["operating_cash_flows"],
+        rates=[market_assumptions["discount_rate"]],
+        terminal_values=sale_proceeds,
+    )
+    exit_analysis = [
+        {
+            "exit_year": int(year),
+            "npv": round(float(horizon_npv), 2),
+            "irr": round(float(horizon_irr) * 100, 2) if np.isfinite(horizon_irr) else None
         }
+        for year, horizon_npv, horizon_irr in zip(horizons["horizon"], horizons["npv"][:, 0], horizons["irr"])
+    ]
     
-    if market_assumptions is None:
-        market_assumptions = {
-            "annual_appreciation": 0.035,
-            "rental_yield": 0.08,
-            "rental_growth": 0.03,
-            "vacancy_rate": 0.05,
-            "expense_ratio": 0.35
-        }
-    
-    # Calculate initial investment
-    down_payment = property_value * financing_details["down_payment_percent"]
-    closing_costs = property_value * financing_details["closing_costs_percent"]
-    initial_investment = down_payment + closing_costs
-    
-    # Calculate loan details
-    loan_amount = property_value - down_payment
-    monthly_rate = financing_details["interest_rate"] / 12
-    num_payments = financing_details["loan_term_years"] * 12
-    
-    if monthly_rate > 0:
-        monthly_payment = loan_amount * (monthly_rate * (1 + monthly_rate)**num_payments) / ((1 + monthly_rate)**num_payments - 1)
-    else:
-        monthly_payment = loan_amount / num_payments
-    
-    # Investment analysis
-    annual_rental_income = property_value * market_assumptions["rental_yield"]
-    effective_rental_income = annual_rental_income * (1 - market_assumptions["vacancy_rate"])
-    annual_expenses = effective_rental_income * market_assumptions["expense_ratio"]
-    annual_debt_service = monthly_payment * 12
-    
-    # Calculate returns
-    annual_cash_flow = effective_rental_income - annual_expenses - annual_debt_service
-    cash_on_cash_return = annual_cash_flow / initial_investment
-    
-    # Property appreciation
-    final_property_value = property_value * (1 + market_assumptions["annual_appreciation"]) ** analysis_period
-    total_appreciation = final_property_value - property_value
-    
-    # Total return calculation
-    total_cash_flow = annual_cash_flow * analysis_period
-    total_return = total_cash_flow + total_appreciation
-    total_roi = total_return / initial_investment
-    annualized_return = (1 + total_roi) ** (1/analysis_period) - 1
-    
-    return {
+    results = {
         "investment_info": {
             "property_value": property_value,
             "investment_type": investment_type,
@@ -516,9 +1019,13 @@ def investment_analyzer(
             "cash_on_cash_return": round(cash_on_cash_return * 100, 2),
             "total_return": round(total_return, 2),
             "total_roi": round(total_roi * 100, 2),
-            "annualized_return": round(annualized_return * 100, 2),
-            "final_property_value": round(final_property_value, 2)
+            "annualized_return": round(annualized_return * 100, 2) if np.isfinite(annualized_return) else None,
+            "final_property_value": round(final_property_value, 2),
+            "npv": round(net_present_value, 2),
+            # None when the IRR does not converge (NaN is not valid JSON)
+            "irr": round(internal_rate_of_return * 100, 2) if np.isfinite(internal_rate_of_return) else None
         },
+        "exit_analysis": exit_analysis,
         "assumptions": {
             "financing": financing_details,
             "market": market_assumptions
@@ -532,6 +1039,114 @@ def investment_analyzer(
             ]
         }
     }
+    
+    if simulation is not None:
+        results["simulation"] = simulate_investment(
+            property_value,
+            assumption_distributions=simulation.get("distributions"),
+            financing_details=financing_details,
+            market_assumptions=market_assumptions,
+            analysis_period=analysis_period,
+            n_paths=simulation.get("n_paths", 100_000),
+            seed=simulation.get("seed"),
+            percentiles=simulation.get("percentiles", [5, 10, 25, 50, 75, 90, 95]),
+        )
+    
+    return results
+
+
+# Where neighborhood_profiler reports each POI count, with the range simulated
+# when no POI index covers the location (the upper bound is the scoring target)
+NEIGHBORHOOD_POI_FIELDS = {
+    "grocery_store": ("amenities", ("shopping", "grocery_stores"), (2, 8)),
+    "shopping_center": ("amenities", ("shopping", "shopping_centers"), (1, 4)),
+    "restaurant": ("amenities", ("shopping", "restaurants"), (10, 50)),
+    "pharmacy": ("amenities", ("shopping", "pharmacies"), (1, 5)),
+    "bank": ("amenities", ("shopping", "banks"), (2, 8)),
+    "park": ("amenities", ("recreation", "parks"), (3, 12)),
+    "playground": ("amenities", ("recreation", "playgrounds"), (2, 8)),
+    "sports_facility": ("amenities", ("recreation", "sports_facilities"), (1, 5)),
+    "fitness_center": ("amenities", ("recreation", "fitness_centers"), (2, 10)),
+    "library": ("amenities", ("recreation", "libraries"), (1, 3)),
+    "hospital": ("amenities", ("healthcare", "hospitals"), (1, 3)),
+    "urgent_care": ("amenities", ("healthcare", "urgent_care"), (1, 4)),
+    "medical_office": ("amenities", ("healthcare", "medical_offices"), (5, 20)),
+    "bus_stop": ("transportation", ("public_transit", "bus_stops"), (3, 15)),
+    "subway_station": ("transportation", ("public_transit", "subway_stations"), (0, 3)),
+    "elementary_school": ("schools", ("elementary_schools", "count"), (2, 6)),
+    "middle_school": ("schools", ("middle_schools", "count"), (1, 3)),
+    "high_school": ("schools", ("high_schools", "count"), (1, 3)),
+    "nightlife": ("lifestyle", ("entertainment", "nightlife_options"), (2, 20)),
+    "cultural_venue": ("lifestyle", ("entertainment", "cultural_venues"), (1, 8)),
+    "movie_theater": ("lifestyle", ("entertainment", "movie_theaters"), (1, 4)),
+}
+
+_AMENITY_POIS = [name for name, (category, _, _) in NEIGHBORHOOD_POI_FIELDS.items() if category == "amenities"]
+_TRANSIT_POIS = ["bus_stop", "subway_station"]
+
+_COORDINATES = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$")
+
+
+def _poi_coverage(counts: Dict[str, np.ndarray], names: List[str]) -> np.ndarray:
+    """Mean share of each POI type's target count reached (0-1)."""
+    return np.mean(
+        [np.minimum(np.asarray(counts[name]) / NEIGHBORHOOD_POI_FIELDS[name][2][1], 1.0) for name in names],
+        axis=0,
+    )
+
+
+def _amenity_score(counts: Dict[str, np.ndarray]) -> np.ndarray:
+    return np.round(5 + 5 * _poi_coverage(counts, _AMENITY_POIS), 1)
+
+
+def _transit_score(counts: Dict[str, np.ndarray]) -> np.ndarray:
+    return np.round(40 + 55 * _poi_coverage(counts, _TRANSIT_POIS)).astype(int)
+
+
+def profile_neighborhoods(
+    data: Optional[Any] = None,
+    radius_miles: float = 1.0,
+    index_dir: Any = poi_index.DEFAULT_POI_INDEX,
+    **columns: Any,
+) -> Any:
+    """
+    Count points of interest around many locations in one call (batch mode of neighborhood_profiler).
+    
+    Args:
+        data: DataFrame or mapping with ``latitude`` and ``longitude`` columns
+        radius_miles: Analysis radius in miles
+        index_dir: POI index built with poi_index.build_poi_index
+        **columns: Columns passed as keyword arrays, overriding ``data``
+        
+    Returns:
+        Columnar results (one count per POI type, amenity score, transit score)
+        as a DataFrame when ``data`` is a DataFrame and a dict of arrays otherwise
+    """
+    inputs = {}
+    if data is not None:
+        available = data.columns if hasattr(data, "columns") else data.keys()
+        inputs.update({key: np.asarray(data[key]) for key in available if key in ("latitude", "longitude")})
+    inputs.update({key: np.asarray(value) for key, value in columns.items()})
+    if "latitude" not in inputs or "longitude" not in inputs:
+        raise ValueError("profile_neighborhoods requires latitude and longitude columns")
+    index = poi_index.load_poi_index(index_dir)
+    if index is None:
+        raise ValueError(f"No POI index in {index_dir}; build one with poi_index.build_poi_index")
+    
+    matrix = index.count_within_batch(inputs["latitude"], inputs["longitude"], radius_miles)
+    counts = {name: matrix[:, column] for column, name in enumerate(index.poi_types)}
+    results = {
+        "latitude": np.atleast_1d(inputs["latitude"]).astype(float),
+        "longitude": np.atleast_1d(inputs["longitude"]).astype(float),
+        **counts,
+        "amenity_score": _amenity_score(counts),
+        "transit_score": _transit_score(counts),
+    }
+    
+    if hasattr(data, "columns"):
+        import pandas as pd
+        return pd.DataFrame(results, index=data.index)
+    return results
 
 
 @tool(
@@ -543,54 +1158,52 @@ def neighborhood_profiler(
     location: str,
     profile_categories: List[str] = ["amenities", "transportation", "schools", "safety", "lifestyle"],
     radius_miles: float = 1.0,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
 ) -> Dict[str, Any]:
     """
     Create comprehensive neighborhood profiles and amenity analysis.
     
     Args:
-        location: Geographic location (address, neighborhood, zip code)
+        location: Geographic location (address, neighborhood, zip code, or "lat, lon")
         profile_categories: Categories to profile
         radius_miles: Analysis radius in miles
+        latitude: Latitude of the location (enables POI counts from the local index)
+        longitude: Longitude of the location
         
     Returns:
         Dictionary containing comprehensive neighborhood profile
     """
     current_date = datetime.now()
     
+    # Points of interest within the radius from the local POI index, simulated without coordinates or index
+    match = _COORDINATES.match(location)
+    if (latitude is None or longitude is None) and match:
+        latitude, longitude = float(match.group(1)), float(match.group(2))
+    index = poi_index.load_poi_index() if latitude is not None and longitude is not None else None
+    if index is not None:
+        poi_counts = index.count_within(latitude, longitude, radius_miles)
+        poi_source = "poi_index"
+    else:
+        poi_counts = {name: np.random.randint(low, high) for name, (_, _, (low, high)) in NEIGHBORHOOD_POI_FIELDS.items()}
+        poi_source = "simulated"
+    
     # Simulated neighborhood data
     neighborhood_profile = {}
     
     if "amenities" in profile_categories:
         amenities_data = {
-            "shopping": {
-                "grocery_stores": np.random.randint(2, 8),
-                "shopping_centers": np.random.randint(1, 4),
-                "restaurants": np.random.randint(10, 50),
-                "pharmacies": np.random.randint(1, 5),
-                "banks": np.random.randint(2, 8)
-            },
-            "recreation": {
-                "parks": np.random.randint(3, 12),
-                "playgrounds": np.random.randint(2, 8),
-                "sports_facilities": np.random.randint(1, 5),
-                "fitness_centers": np.random.randint(2, 10),
-                "libraries": np.random.randint(1, 3)
-            },
-            "healthcare": {
-                "hospitals": np.random.randint(1, 3),
-                "urgent_care": np.random.randint(1, 4),
-                "medical_offices": np.random.randint(5, 20)
-            },
-            "amenity_score": round(np.random.uniform(6.5, 9.5), 1)
+            "shopping": {},
+            "recreation": {},
+            "healthcare": {},
+            "amenity_score": float(_amenity_score(poi_counts))
         }
         neighborhood_profile["amenities"] = amenities_data
     
     if "transportation" in profile_categories:
         transportation_data = {
             "public_transit": {
-                "bus_stops": np.random.randint(3, 15),
-                "subway_stations": np.random.randint(0, 3),
-                "transit_score": np.random.randint(40, 95)
+                "transit_score": int(_transit_score(poi_counts))
             },
             "walkability": {
                 "walk_score": np.random.randint(50, 95),
@@ -608,15 +1221,12 @@ def neighborhood_profiler(
     if "schools" in profile_categories:
         schools_data = {
             "elementary_schools": {
-                "count": np.random.randint(2, 6),
                 "average_rating": round(np.random.uniform(6, 10), 1)
             },
             "middle_schools": {
-                "count": np.random.randint(1, 3),
                 "average_rating": round(np.random.uniform(6, 10), 1)
             },
             "high_schools": {
-                "count": np.random.randint(1, 3),
                 "average_rating": round(np.random.uniform(6, 10), 1),
                 "graduation_rate": f"{np.random.randint(85, 98)}%"
             },
@@ -647,11 +1257,7 @@ def neighborhood_profiler(
                 "architectural_style": np.random.choice(["Modern", "Traditional", "Mixed", "Historic"]),
                 "age_of_homes": f"{np.random.randint(10, 60)} years average"
             },
-            "entertainment": {
-                "nightlife_options": np.random.randint(2, 20),
-                "cultural_venues": np.random.randint(1, 8),
-                "movie_theaters": np.random.randint(1, 4)
-            },
+            "entertainment": {},
             "environmental": {
                 "air_quality_index": np.random.randint(25, 85),
                 "noise_level": np.random.choice(["Low", "Moderate", "High"]),
@@ -660,6 +1266,13 @@ def neighborhood_profiler(
         }
         neighborhood_profile["lifestyle"] = lifestyle_data
     
+    for name, (category, path, _) in NEIGHBORHOOD_POI_FIELDS.items():
+        if category in neighborhood_profile:
+            section = neighborhood_profile[category]
+            for key in path[:-1]:
+                section = section.setdefault(key, {})
+            section[path[-1]] = int(poi_counts[name])
+    
     # Calculate overall neighborhood score
     category_scores = []
     if "amenities" in neighborhood_profile:
@@ -682,6 +1295,8 @@ def neighborhood_profiler(
         "location_info": {
             "location": location,
             "analysis_radius": radius_miles,
+            "coordinates": {"latitude": latitude, "longitude": longitude} if latitude is not None and longitude is not None else None,
+            "poi_source": poi_source,
             "profile_date": current_date.isoformat(),
             "categories_analyzed": profile_categories
         },
@@ -703,6 +1318,10 @@ def neighborhood_profiler(
     }
 
 
+# Labels of the stored trend flags
+_TREND_LABELS = {-1: "Falling", 0: "Stable", 1: "Rising"}
+
+
 @tool(
     name="economic_indicator_tracker",
     description="Track and analyze economic indicators affecting real estate markets",
@@ -726,72 +1345,109 @@ def economic_indicator_tracker(
     """
     current_date = datetime.now()
     
-    # Simulated economic data
+    # Monthly series from the local time-series store (precomputed rolling means,
+    # year-over-year changes and trends), synthetic where the store has no data
+    names = [name for name, spec in economic_store.SERIES.items() if spec[0] in indicators]
+    series = economic_store.resolve_series(location, names, current_month=economic_store.month_index(current_date))
+    
+    def latest(name: str, column: str = "value", lag: int = 0, digits: int = 2) -> Optional[float]:
+        value = series[name].latest(column, lag)
+        return round(value, digits) if value is not None else None
+    
+    def period_summary(indicator: str) -> Dict[str, Any]:
+        summary = {}
+        for name, view in series.items():
+            if economic_store.SERIES[name][0] == indicator:
+                change = view.change(time_period)
+                summary[name] = {
+                    "average": round(view.mean(time_period), 2),
+                    "change": round(change, 2) if change is not None else None,
+                    "trend": _TREND_LABELS[int(view.latest("trend"))]
+                }
+        return summary
+    
     indicator_data = {}
     
     if "interest_rates" in indicators:
-        base_rate = 5.25
-        rate_history = []
-        for i in range(min(6, time_period)):
-            month_date = current_date - timedelta(days=30 * i)
-            rate_change = np.random.uniform(-0.25, 0.25)
-            rate = max(0.5, base_rate + rate_change * (i / time_period))
-            rate_history.append({
-                "date": month_date.strftime("%Y-%m"),
-                "fed_funds_rate": round(rate, 2),
-                "mortgage_30yr": round(rate + 1.5 + np.random.uniform(-0.2, 0.2), 2)
-            })
-        
-        rate_trend = "Rising" if rate_history[0]["fed_funds_rate"] > rate_history[-1]["fed_funds_rate"] else "Falling"
+        fed_funds = series["fed_funds_rate"]
+        mortgage = series["mortgage_30yr"]
+        # The two series may end (and start) in different months: pair them on
+        # the months both cover
+        last_month = min(fed_funds.last_month, mortgage.last_month)
+        months = max(min(time_period, last_month - max(fed_funds.start_month, mortgage.start_month) + 1), 0)
+        first_month = last_month - months + 1
+        rate_history = [
+            {
+                "date": economic_store.month_label(first_month + offset),
+                "fed_funds_rate": round(float(fed_rate), 2),
+                "mortgage_30yr": round(float(mortgage_rate), 2)
+            }
+            for offset, (fed_rate, mortgage_rate) in enumerate(zip(
+                fed_funds.between(first_month, last_month), mortgage.between(first_month, last_month)
+            ))
+        ][::-1]
         
         indicator_data["interest_rates"] = {
-            "current_fed_funds": rate_history[0]["fed_funds_rate"],
-            "current_30yr_mortgage": rate_history[0]["mortgage_30yr"],
-            "trend": rate_trend,
-            "12_month_change": round(rate_history[0]["fed_funds_rate"] - rate_history[-1]["fed_funds_rate"], 2),
-            "forecast": "Rates expected to stabilize" if abs(rate_history[0]["fed_funds_rate"] - 5.0) < 0.5 else "Continued volatility expected",
-            "historical_data": rate_history
+            "current_fed_funds": latest("fed_funds_rate"),
+            "current_30yr_mortgage": latest("mortgage_30yr"),
+            "trend": _TREND_LABELS[int(fed_funds.latest("trend"))],
+            "12_month_change": latest("fed_funds_rate", "yoy_change"),
+            "forecast": "Rates expected to stabilize" if abs(latest("fed_funds_rate") - 5.0) < 0.5 else "Continued volatility expected",
+            "historical_data": rate_history,
+            "period_summary": period_summary("interest_rates")
         }
     
     if "employment" in indicators:
+        unemployment_trend = int(series["unemployment_rate"].latest("trend"))
         employment_data = {
-            "unemployment_rate": round(np.random.uniform(3.0, 6.5), 1),
-            "job_growth_rate": round(np.random.uniform(0.5, 3.0), 1),
-            "labor_force_participation": round(np.random.uniform(62, 67), 1),
-            "wage_growth_rate": round(np.random.uniform(2.5, 5.0), 1),
-            "employment_trend": np.random.choice(["Improving", "Stable", "Declining"])
+            "unemployment_rate": latest("unemployment_rate", digits=1),
+            "job_growth_rate": latest("job_growth_rate", digits=1),
+            "labor_force_participation": latest("labor_force_participation", digits=1),
+            "wage_growth_rate": latest("wage_growth_rate", digits=1),
+            # Falling unemployment is an improving labour market
+            "employment_trend": {-1: "Improving", 0: "Stable", 1: "Declining"}[unemployment_trend],
+            "period_summary": period_summary("employment")
         }
         indicator_data["employment"] = employment_data
     
     if "inflation" in indicators:
         inflation_data = {
-            "cpi_annual": round(np.random.uniform(2.0, 4.5), 1),
-            "core_cpi": round(np.random.uniform(2.5, 4.0), 1),
-            "housing_inflation": round(np.random.uniform(3.0, 6.0), 1),
-            "inflation_trend": np.random.choice(["Rising", "Falling", "Stable"]),
-            "fed_target": 2.0
+            "cpi_annual": latest("cpi", "yoy_change", digits=1),
+            "core_cpi": latest("core_cpi", "yoy_change", digits=1),
+            "housing_inflation": latest("housing_cpi", "yoy_change", digits=1),
+            "inflation_trend": _TREND_LABELS[int(series["cpi"].latest("trend"))],
+            "fed_target": 2.0,
+            "period_summary": period_summary("inflation")
         }
         indicator_data["inflation"] = inflation_data
     
     if "gdp" in indicators:
+        gdp_growth = latest("real_gdp", "yoy_change", digits=1)
+        gdp_trend = int(series["real_gdp"].latest("trend"))
+        quarterly = series["real_gdp"].change(3)
         gdp_data = {
-            "gdp_growth_annual": round(np.random.uniform(1.5, 4.0), 1),
-            "gdp_growth_quarterly": round(np.random.uniform(0.3, 1.2), 1),
-            "consumer_spending": round(np.random.uniform(2.0, 5.0), 1),
-            "economic_phase": np.random.choice(["Expansion", "Peak", "Contraction", "Trough"]),
-            "recession_probability": round(np.random.uniform(10, 35), 0)
+            "gdp_growth_annual": gdp_growth,
+            "gdp_growth_quarterly": round(quarterly, 1) if quarterly is not None else None,
+            "consumer_spending": latest("consumer_spending", "yoy_change", digits=1),
+            "economic_phase": (
+                ("Expansion" if gdp_trend >= 0 else "Peak") if (gdp_growth or 0) >= 0
+                else ("Trough" if gdp_trend > 0 else "Contraction")
+            ),
+            "recession_probability": round(float(np.clip(30 - 6 * (gdp_growth or 0) - 5 * gdp_trend, 5, 60)), 0),
+            "period_summary": period_summary("gdp")
         }
         indicator_data["gdp"] = gdp_data
     
     if "housing_market" in indicators:
         housing_data = {
-            "home_price_index": round(np.random.uniform(280, 320), 1),
-            "price_growth_annual": round(np.random.uniform(2.0, 8.0), 1),
-            "existing_home_sales": round(np.random.uniform(4.0, 6.5), 1),
-            "housing_starts": round(np.random.uniform(1200, 1600), 0),
-            "months_supply": round(np.random.uniform(2.5, 6.0), 1),
-            "affordability_index": round(np.random.uniform(100, 140), 0),
-            "market_condition": "Seller's market" if np.random.uniform(2.5, 6.0) < 4.0 else "Buyer's market"
+            "home_price_index": latest("home_price_index", digits=1),
+            "price_growth_annual": latest("home_price_index", "yoy_change", digits=1),
+            "existing_home_sales": latest("existing_home_sales", digits=1),
+            "housing_starts": latest("housing_starts", digits=0),
+            "months_supply": latest("months_supply", digits=1),
+            "affordability_index": latest("affordability_index", digits=0),
+            "market_condition": "Seller's market" if latest("months_supply") < 4.0 else "Buyer's market",
+            "period_summary": period_summary("housing_market")
         }
         indicator_data["housing_market"] = housing_data
     
@@ -802,11 +1458,12 @@ def economic_indicator_tracker(
         unemployment = indicator_data["employment"]["unemployment_rate"]
         health_factors.append(1 - (unemployment / 10))
     
-    if "inflation" in indicator_data:
+    # Year-over-year figures are None while a stored series has under 12 months
+    if "inflation" in indicator_data and indicator_data["inflation"]["cpi_annual"] is not None:
         inflation = indicator_data["inflation"]["cpi_annual"]
         health_factors.append(1 - abs(inflation - 2.5) / 5)
     
-    if "gdp" in indicator_data:
+    if "gdp" in indicator_data and indicator_data["gdp"]["gdp_growth_annual"] is not None:
         gdp_growth = indicator_data["gdp"]["gdp_growth_annual"]
         health_factors.append(min(gdp_growth / 4, 1))
     
@@ -834,6 +1491,10 @@ def economic_indicator_tracker(
             "location": location,
             "indicators_tracked": indicators,
             "time_period_months": time_period,
+            "data_sources": {
+                indicator: sorted({view.source for name, view in series.items() if economic_store.SERIES[name][0] == indicator})
+                for indicator in indicator_data
+            },
             "analysis_date": current_date.isoformat()
         },
         "economic_indicators": indicator_data,
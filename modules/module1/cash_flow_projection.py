@@ -0,0 +1,172 @@
+"""
+Monthly cash-flow projection engine shared by the investment tools.
+
+A projection is one preallocated array of shape
+(len(PROJECTION_COLUMNS), properties, months + 1): each column is a
+properties x months matrix, month 0 holds the initial investment and the
+sale happens at each property's exit month.
+"""
+from typing import Dict
+
+import numpy as np
+
+from financial_math import ArrayLike, amortization_schedule
+
+PROJECTION_COLUMNS = [
+    "gross_rent",
+    "vacancy_loss",
+    "operating_expenses",
+    "interest",
+    "principal",
+    "sale_proceeds",
+    "loan_balance",
+    "net_cash_flow",
+]
+(
+    GROSS_RENT,
+    VACANCY_LOSS,
+    OPERATING_EXPENSES,
+    INTEREST,
+    PRINCIPAL,
+    SALE_PROCEEDS,
+    LOAN_BALANCE,
+    NET_CASH_FLOW,
+) = range(len(PROJECTION_COLUMNS))
+
+
+def project_monthly_cash_flows(
+    property_value: ArrayLike,
+    monthly_rent: ArrayLike,
+    months: int,
+    hold_months: ArrayLike = None,
+    rent_growth: ArrayLike = 0.0,
+    vacancy_rate: ArrayLike = 0.0,
+    expense_ratio: ArrayLike = 0.0,
+    monthly_expenses: ArrayLike = 0.0,
+    expense_inflation: ArrayLike = 0.0,
+    loan_amount: ArrayLike = 0.0,
+    interest_rate: ArrayLike = 0.0,
+    loan_term_years: ArrayLike = 30,
+    initial_investment: ArrayLike = 0.0,
+    annual_appreciation: ArrayLike = 0.0,
+    selling_costs_percent: ArrayLike = 0.0,
+    dtype: type = np.float64,
+) -> np.ndarray:
+    """
+    Project monthly cash flows for a batch of properties.
+
+    Rent grows and fixed expenses inflate once a year; vacancy and the
+    ``expense_ratio`` apply to the rent of each month, and the loan's
+    interest/principal split comes from the amortization engine. At the exit
+    month the property is sold at its appreciated value, net of selling
+    costs and the remaining loan balance. Months after the exit are zero.
+
+    Args:
+        property_value: Purchase price(s)
+        monthly_rent: Gross monthly rent in the first year
+        months: Width of the projection in months
+        hold_months: Exit month per property (defaults to ``months``)
+        rent_growth: Annual rent growth (decimal)
+        vacancy_rate: Share of gross rent lost to vacancy
+        expense_ratio: Operating expenses as a share of rent net of vacancy
+        monthly_expenses: Fixed monthly expenses in the first year
+        expense_inflation: Annual growth of the fixed expenses
+        loan_amount: Loan principal(s)
+        interest_rate: Annual loan rate(s) (decimal)
+        loan_term_years: Loan term(s) in years
+        initial_investment: Cash invested at month 0 (positive amount)
+        annual_appreciation: Annual property appreciation (decimal)
+        selling_costs_percent: Selling costs as a share of the sale price
+        dtype: Float type of the projection matrix
+
+    Returns:
+        Array of shape (len(PROJECTION_COLUMNS), properties, months + 1)
+    """
+    inputs = np.broadcast_arrays(*[np.atleast_1d(np.asarray(value, dtype=float)) for value in (
+        property_value, monthly_rent, rent_growth, vacancy_rate, expense_ratio,
+        monthly_expenses, expense_inflation, loan_amount, interest_rate, loan_term_years,
+        initial_investment, annual_appreciation, selling_costs_percent,
+        months if hold_months is None else hold_months,
+    )])
+    (property_value, monthly_rent, rent_growth, vacancy_rate, expense_ratio,
+     monthly_expenses, expense_inflation, loan_amount, interest_rate, loan_term_years,
+     initial_investment, annual_appreciation, selling_costs_percent, hold_months) = [
+        value.ravel()[:, None] for value in inputs
+    ]
+    count = property_value.shape[0]
+    hold_months = np.minimum(np.rint(hold_months).astype(np.int64), months)
+
+    projection = np.zeros((len(PROJECTION_COLUMNS), count, months + 1), dtype=dtype)
+    month = np.arange(1, months + 1)
+    years = -(-months // 12)
+    held = month <= hold_months
+
+    # Operating cash flows; growth factors are computed per year, then repeated by month
+    year = np.arange(years)
+    rent_factor = np.repeat((1 + rent_growth) ** year, 12, axis=1)[:, :months]
+    expense_factor = np.repeat((1 + expense_inflation) ** year, 12, axis=1)[:, :months]
+    rent = projection[GROSS_RENT, :, 1:]
+    np.multiply(monthly_rent * rent_factor, held, out=rent)
+    np.multiply(rent, vacancy_rate, out=projection[VACANCY_LOSS, :, 1:])
+    np.multiply(rent - projection[VACANCY_LOSS, :, 1:], expense_ratio, out=projection[OPERATING_EXPENSES, :, 1:])
+    if np.any(monthly_expenses):
+        projection[OPERATING_EXPENSES, :, 1:] += held * monthly_expenses * expense_factor
+
+    # Debt service split from the amortization engine
+    schedule = amortization_schedule(loan_amount[:, 0], interest_rate[:, 0], loan_term_years[:, 0], months=months)
+    projection[INTEREST, :, 1:] = schedule["interest"] * held
+    projection[PRINCIPAL, :, 1:] = schedule["principal"] * held
+    projection[LOAN_BALANCE, :, 0] = loan_amount[:, 0]
+    projection[LOAN_BALANCE, :, 1:] = schedule["balance"] * held
+
+    # Sale at the exit month, net of selling costs and the loan payoff
+    rows = np.arange(count)
+    exit_balance = projection[LOAN_BALANCE, rows, hold_months[:, 0]]
+    sale_price = property_value[:, 0] * (1 + annual_appreciation[:, 0]) ** (hold_months[:, 0] / 12)
+    projection[SALE_PROCEEDS, rows, hold_months[:, 0]] = (
+        sale_price * (1 - selling_costs_percent[:, 0]) - exit_balance
+    )
+
+    net = projection[NET_CASH_FLOW]
+    net[:, 0] = -initial_investment[:, 0]
+    net[:, 1:] = (
+        projection[GROSS_RENT, :, 1:]
+        - projection[VACANCY_LOSS, :, 1:]
+        - projection[OPERATING_EXPENSES, :, 1:]
+        - projection[INTEREST, :, 1:]
+        - projection[PRINCIPAL, :, 1:]
+    )
+    net += projection[SALE_PROCEEDS]
+    return projection
+
+
+def annual_totals(projection: np.ndarray, column: int) -> np.ndarray:
+    """
+    Sum one projection column into years (month 0 excluded).
+
+    Returns:
+        Matrix of shape (properties, years)
+    """
+    monthly = projection[column, :, 1:]
+    years = -(-monthly.shape[1] // 12)
+    padded = np.zeros((monthly.shape[0], years * 12), dtype=monthly.dtype)
+    padded[:, :monthly.shape[1]] = monthly
+    return padded.reshape(monthly.shape[0], years, 12).sum(axis=2)
+
+
+def summarize_projection(projection: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Per-property totals of a projection.
+
+    Returns:
+        Dictionary with the first-year and total operating cash flow, total
+        interest and principal paid, and the sale proceeds
+    """
+    operating = projection[NET_CASH_FLOW, :, 1:] - projection[SALE_PROCEEDS, :, 1:]
+    return {
+        "first_year_cash_flow": operating[:, :12].sum(axis=1),
+        "total_operating_cash_flow": operating.sum(axis=1),
+        "total_interest": projection[INTEREST].sum(axis=1),
+        "total_principal": projection[PRINCIPAL].sum(axis=1),
+        "sale_proceeds": projection[SALE_PROCEEDS].sum(axis=1),
+    }
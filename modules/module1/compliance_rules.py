@@ -0,0 +1,352 @@
+"""
+Rule engine behind regulatory_compliance_checker.
+
+Rules live in JSON files (one per jurisdiction, see ``rules/``) that may
+extend other jurisdictions, e.g. local -> state -> federal. A rule checks
+one property fact with a comparison (``<``, ``<=``, ``>``, ``>=``, ``==``,
+``!=``, ``in``, ``not_in`` or ``required``), optionally only ``when`` a
+condition on another fact holds. The files are compiled once into decision
+tables indexed by (jurisdiction, property type, area); compilation is
+cached until a rule file changes. Evaluation is vectorized over a whole
+portfolio of properties. Jurisdictions and areas usually come from an LLM:
+unknown jurisdictions are checked against FALLBACK_JURISDICTION and unknown
+areas are reported instead of evaluated, never raised on.
+"""
+import functools
+import json
+import math
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+DEFAULT_RULES_DIR = Path(__file__).resolve().parent / "rules"
+
+COMPLIANCE_AREAS = ["zoning", "building_codes", "environmental", "safety"]
+
+# Rule file applied to jurisdictions without one (e.g. a city name)
+FALLBACK_JURISDICTION = "local"
+
+SEVERITIES = {"Low": 1, "Medium": 2, "High": 3}
+
+# Score of each area status in the overall compliance score
+STATUS_SCORES = {
+    "Compliant": 1.0,
+    "Partially Compliant": 0.7,
+    "Conditional": 0.7,
+    "Non-Compliant": 0.3,
+}
+
+_OPERATORS = {"<", "<=", ">", ">=", "==", "!=", "in", "not_in", "required"}
+_BOOLEAN_STRINGS = {"true": 1.0, "yes": 1.0, "y": 1.0, "false": 0.0, "no": 0.0, "n": 0.0}
+
+# String facts are encoded as codes far from any numeric fact
+_CATEGORY_BASE = 1e15
+_UNKNOWN_CATEGORY = _CATEGORY_BASE - 1
+
+
+class DecisionTable:
+    """Compiled rules of one (jurisdiction, property type, area)."""
+
+    def __init__(self, rules: List[Dict[str, Any]], vocabulary: Dict[str, float]):
+        self.rule_ids = [rule["id"] for rule in rules]
+        self.messages = [rule["message"] for rule in rules]
+        self.remedies = [rule.get("remedy", "") for rule in rules]
+        self.severities = np.array([SEVERITIES[rule.get("severity", "Medium")] for rule in rules], dtype=np.int8)
+        self.checks = [_compile_check(rule, vocabulary) for rule in rules]
+        self.conditions = [_compile_check(rule["when"], vocabulary) if "when" in rule else None for rule in rules]
+        self.fields = sorted(
+            {check[0] for check in self.checks} | {condition[0] for condition in self.conditions if condition}
+        )
+
+    def __len__(self) -> int:
+        return len(self.rule_ids)
+
+    def evaluate(self, facts: Dict[str, np.ndarray], size: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Evaluate every rule for every property.
+
+        Args:
+            facts: Encoded fact columns (see encode_facts); absent columns count as missing
+            size: Number of properties
+
+        Returns:
+            Boolean matrices (properties x rules) of failed and unverified rules;
+            a rule is unverified when a fact it needs is missing
+        """
+        failed = np.zeros((size, len(self)), dtype=bool)
+        unverified = np.zeros((size, len(self)), dtype=bool)
+        missing_column = np.full(size, np.nan)
+        for column, (check, condition) in enumerate(zip(self.checks, self.conditions)):
+            applies = np.ones(size, dtype=bool)
+            unknown = np.zeros(size, dtype=bool)
+            if condition is not None:
+                values = facts.get(condition[0], missing_column)
+                unknown |= np.isnan(values)
+                applies &= _compare(values, condition[1], condition[2])
+            values = facts.get(check[0], missing_column)
+            missing = np.isnan(values)
+            unverified[:, column] = unknown | (applies & missing)
+            failed[:, column] = applies & ~missing & ~unknown & ~_compare(values, check[1], check[2])
+        return failed, unverified
+
+
+def _compile_check(rule: Dict[str, Any], vocabulary: Dict[str, float]) -> Tuple[str, str, Any]:
+    """(field, operator, encoded operand) of a rule or ``when`` condition."""
+    operator = rule["op"]
+    if operator not in _OPERATORS:
+        raise ValueError(f"Unsupported operator {operator!r} in rule {rule.get('id', rule)}")
+    if operator in ("in", "not_in"):
+        operand = np.array([_encode_value(value, vocabulary) for value in rule["value"]])
+    elif operator == "required":
+        operand = None
+    else:
+        operand = _encode_value(rule["value"], vocabulary)
+    return rule["field"], operator, operand
+
+
+def _compare(values: np.ndarray, operator: str, operand: Any) -> np.ndarray:
+    with np.errstate(invalid="ignore"):
+        if operator == "required":
+            return values != 0
+        if operator == "in":
+            return np.isin(values, operand)
+        if operator == "not_in":
+            return ~np.isin(values, operand)
+        return {
+            "<": np.less, "<=": np.less_equal, ">": np.greater,
+            ">=": np.greater_equal, "==": np.equal, "!=": np.not_equal,
+        }[operator](values, operand)
+
+
+def _encode_value(value: Any, vocabulary: Dict[str, float], grow: bool = True) -> float:
+    """Numeric code of a fact: numbers and booleans as floats, strings through the vocabulary."""
+    if value is None:
+        return math.nan
+    if isinstance(value, (bool, np.bool_)):
+        return float(value)
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return float(value)
+    text = str(value).strip()
+    if not text:
+        return math.nan
+    if text.lower() in _BOOLEAN_STRINGS:
+        return _BOOLEAN_STRINGS[text.lower()]
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    key = text.upper()
+    if key not in vocabulary:
+        if not grow:
+            return _UNKNOWN_CATEGORY
+        vocabulary[key] = _CATEGORY_BASE + len(vocabulary)
+    return vocabulary[key]
+
+
+class CompiledRules:
+    """Decision tables and area metadata of every jurisdiction in a rules directory."""
+
+    def __init__(self, documents: Dict[str, Dict[str, Any]]):
+        self.vocabulary: Dict[str, float] = {}
+        self.versions = {name: document.get("version") for name, document in documents.items()}
+        self.tables: Dict[Tuple[str, str, str], DecisionTable] = {}
+        self.metadata: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+
+        property_types = set()
+        for document in documents.values():
+            for area in document.get("areas", {}).values():
+                property_types.update(key for key in area.get("metadata", {}) if key != "*")
+                for rule in area.get("rules", []):
+                    property_types.update(rule.get("property_types", []))
+        self.property_types = sorted(property_types)
+
+        for jurisdiction in documents:
+            chain = _resolve_chain(jurisdiction, documents)
+            for property_type in self.property_types + ["*"]:
+                for area in COMPLIANCE_AREAS:
+                    rules, metadata = [], {}
+                    for name in chain:
+                        section = documents[name].get("areas", {}).get(area, {})
+                        rules += [
+                            rule for rule in section.get("rules", [])
+                            if "property_types" not in rule or property_type in rule["property_types"]
+                        ]
+                        for key in ("*", property_type):
+                            _merge_metadata(metadata, section.get("metadata", {}).get(key, {}))
+                    key = (jurisdiction, property_type, area)
+                    self.tables[key] = DecisionTable(rules, self.vocabulary)
+                    self.metadata[key] = metadata
+
+    @property
+    def jurisdictions(self) -> List[str]:
+        return sorted(self.versions)
+
+    def resolve_jurisdiction(self, jurisdiction: Any) -> str:
+        """Rule file of a jurisdiction name (case-insensitive), FALLBACK_JURISDICTION for unknown names."""
+        if jurisdiction in self.versions:
+            return jurisdiction
+        key = str(jurisdiction).strip().lower()
+        for name in self.versions:
+            if name.lower() == key:
+                return name
+        if FALLBACK_JURISDICTION not in self.versions:
+            raise ValueError(f"Unknown jurisdiction {jurisdiction!r}; rule files cover {self.jurisdictions}")
+        return FALLBACK_JURISDICTION
+
+    def table(self, jurisdiction: str, property_type: str, area: str) -> DecisionTable:
+        """Decision table for a property type (general rules only for unknown types)."""
+        property_type = property_type if property_type in self.property_types else "*"
+        return self.tables[(self.resolve_jurisdiction(jurisdiction), property_type, area)]
+
+    def area_metadata(self, jurisdiction: str, property_type: str, area: str) -> Dict[str, Any]:
+        property_type = property_type if property_type in self.property_types else "*"
+        return self.metadata.get((self.resolve_jurisdiction(jurisdiction), property_type, area), {})
+
+    def encode_facts(self, columns: Dict[str, Any], fields: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Float columns of the needed facts (NaN where missing, strings as vocabulary codes)."""
+        encoded = {}
+        for field in fields:
+            if field not in columns:
+                continue
+            values = np.atleast_1d(np.asarray(columns[field]))
+            if values.dtype.kind in "biuf":
+                encoded[field] = values.astype(float)
+            else:
+                encoded[field] = np.array(
+                    [_encode_value(_missing_to_none(value), self.vocabulary, grow=False) for value in values]
+                )
+        return encoded
+
+
+def split_areas(areas: Sequence[str]) -> Tuple[List[str], List[str]]:
+    """
+    Separate the requested areas the rules cover from the others.
+
+    Names are matched case-insensitively with spaces or hyphens as
+    underscores ("Building Codes" is building_codes).
+
+    Returns:
+        Covered areas (normalized, duplicates removed) and unsupported names as given
+    """
+    covered, unsupported = [], []
+    for area in areas:
+        name = str(area).strip().lower().replace(" ", "_").replace("-", "_")
+        if name in COMPLIANCE_AREAS:
+            if name not in covered:
+                covered.append(name)
+        elif area not in unsupported:
+            unsupported.append(area)
+    return covered, unsupported
+
+
+def _missing_to_none(value: Any) -> Any:
+    return None if isinstance(value, float) and math.isnan(value) else value
+
+
+def _merge_metadata(target: Dict[str, Any], source: Dict[str, Any]) -> None:
+    """Lists accumulate across jurisdictions; other values are overridden by the more local file."""
+    for key, value in source.items():
+        if isinstance(value, list):
+            target[key] = target.get(key, []) + [item for item in value if item not in target.get(key, [])]
+        else:
+            target[key] = value
+
+
+def _resolve_chain(jurisdiction: str, documents: Dict[str, Dict[str, Any]], seen: Tuple[str, ...] = ()) -> List[str]:
+    """Jurisdictions whose rules apply, most general first."""
+    if jurisdiction in seen:
+        raise ValueError(f"Circular rule file extension: {' -> '.join(seen + (jurisdiction,))}")
+    if jurisdiction not in documents:
+        raise ValueError(f"Rule file for {seen[-1]!r} extends unknown jurisdiction {jurisdiction!r}")
+    chain: List[str] = []
+    for parent in documents[jurisdiction].get("extends", []):
+        chain += [name for name in _resolve_chain(parent, documents, seen + (jurisdiction,)) if name not in chain]
+    return chain + [jurisdiction]
+
+
+def _rule_file_signature(rules_dir: Path) -> Tuple[Tuple[str, int, int], ...]:
+    return tuple(
+        (path.name, path.stat().st_mtime_ns, path.stat().st_size) for path in sorted(rules_dir.glob("*.json"))
+    )
+
+
+@functools.lru_cache(maxsize=8)
+def _compile(rules_dir: str, signature: Tuple[Tuple[str, int, int], ...]) -> CompiledRules:
+    documents = {}
+    for name, _, _ in signature:
+        document = json.loads((Path(rules_dir) / name).read_text(encoding="utf-8"))
+        documents[document.get("jurisdiction", Path(name).stem)] = document
+    return CompiledRules(documents)
+
+
+def load_rules(rules_dir: Union[str, Path] = DEFAULT_RULES_DIR) -> CompiledRules:
+    """Compiled rules of a directory; recompiled only when a rule file is added, removed or modified."""
+    rules_dir = Path(rules_dir).resolve()
+    return _compile(str(rules_dir), _rule_file_signature(rules_dir))
+
+
+def evaluate_compliance(
+    columns: Dict[str, Any],
+    property_types: Any,
+    jurisdictions: Any,
+    compliance_areas: Sequence[str] = COMPLIANCE_AREAS,
+    rules: Optional[CompiledRules] = None,
+) -> Dict[str, Any]:
+    """
+    Evaluate the compliance areas of many properties.
+
+    Properties are grouped by (jurisdiction, property type) and each group
+    goes through its decision tables in one vectorized pass.
+
+    Args:
+        columns: Fact columns (e.g. ``zoning_code``, ``height_ft``, ``smoke_detectors``)
+        property_types: Property type per property (or one for all)
+        jurisdictions: Jurisdiction per property (or one for all); names
+            without a rule file are checked against FALLBACK_JURISDICTION
+        compliance_areas: Areas to evaluate; areas the rules do not cover are skipped
+        rules: Compiled rules (defaults to load_rules())
+
+    Returns:
+        Dictionary with, per area, the status array and the failed and
+        unverified matrices with their decision tables per group, the
+        overall compliance score array, the jurisdiction applied to each
+        property and the skipped (unsupported) areas
+    """
+    rules = rules or load_rules()
+    size = max([len(np.atleast_1d(np.asarray(values))) for values in columns.values()] + [
+        len(np.atleast_1d(property_types)), len(np.atleast_1d(jurisdictions))
+    ])
+    property_types = np.broadcast_to(np.asarray(property_types, dtype=object), (size,))
+    jurisdictions = np.broadcast_to(np.asarray(jurisdictions, dtype=object), (size,))
+    resolved = {name: rules.resolve_jurisdiction(name) for name in set(jurisdictions.tolist())}
+    jurisdictions = np.array([resolved[name] for name in jurisdictions.tolist()], dtype=object)
+    columns = {key: np.broadcast_to(np.asarray(values), (size,)) for key, values in columns.items()}
+    compliance_areas, unsupported_areas = split_areas(compliance_areas)
+
+    results: Dict[str, Any] = {"areas": {}, "jurisdictions": jurisdictions, "unsupported_areas": unsupported_areas}
+    score_total = np.zeros(size)
+    groups = {}
+    for index, key in enumerate(zip(jurisdictions.tolist(), property_types.tolist())):
+        groups.setdefault(key, []).append(index)
+
+    for area in compliance_areas:
+        status = np.empty(size, dtype=object)
+        area_groups = []
+        for (jurisdiction, property_type), members in groups.items():
+            members = np.array(members)
+            table = rules.table(jurisdiction, property_type, area)
+            facts = rules.encode_facts({key: values[members] for key, values in columns.items()}, table.fields)
+            failed, unverified = table.evaluate(facts, len(members))
+            high = failed[:, table.severities == SEVERITIES["High"]].any(axis=1)
+            status[members] = np.select(
+                [high, failed.any(axis=1), unverified.any(axis=1)],
+                ["Non-Compliant", "Partially Compliant", "Conditional"],
+                "Compliant",
+            )
+            area_groups.append({"members": members, "table": table, "failed": failed, "unverified": unverified})
+        score_total += np.vectorize(STATUS_SCORES.get, otypes=[float])(status)
+        results["areas"][area] = {"status": status, "groups": area_groups}
+
+    results["overall_compliance_score"] = score_total / len(compliance_areas) if compliance_areas else np.full(size, 0.5)
+    return results
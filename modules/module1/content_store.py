@@ -0,0 +1,224 @@
+"""
+Content-addressed document store behind the agents' FileTools (tools.DedupFileTools).
+
+Saved documents are hashed on write and stored once per distinct content
+under ``.blobs/`` (BLAKE2b digest as file name); a SQLite index maps every
+saved name (e.g. the timestamped ``*_property_valuation_test.txt`` reports)
+to its blob. Plain files already in the directory stay readable and are
+hashed once per modification (their digests are kept in the index too, so
+a new process only stats them), so listing, searching and reading only ever
+deal with unique contents, however many runs saved the same report. Use
+load_content_store to share one store per directory within a process.
+"""
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, Optional, Tuple, Union
+
+BLOB_DIR = ".blobs"
+INDEX_FILE = ".content_index.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    name TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    saved_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS plain_files (
+    name TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    digest TEXT NOT NULL
+);
+"""
+
+_stores: Dict[str, "ContentStore"] = {}
+_stores_lock = threading.Lock()
+
+
+def content_digest(data: bytes) -> str:
+    """Hex BLAKE2b-256 digest used as blob name."""
+    return hashlib.blake2b(data, digest_size=32).hexdigest()
+
+
+class ContentStore:
+    """Deduplicating store rooted at a documents directory."""
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+        self.blob_dir = self.root / BLOB_DIR
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        # Digest of plain files, keyed by name and refreshed when (mtime, size) changes;
+        # loaded from the plain_files table on first use
+        self._plain_digests: Optional[Dict[str, Tuple[int, int, str]]] = None
+        # One directory scan at a time (the scan updates _plain_digests)
+        self._scan_lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(str(self.root / INDEX_FILE), check_same_thread=False)
+            self._connection.executescript(_SCHEMA)
+            self._connection.commit()
+        return self._connection
+
+    def blob_path(self, digest: str) -> Path:
+        return self.blob_dir / digest[:2] / digest
+
+    def put(self, name: str, data: bytes, overwrite: bool = True) -> Optional[str]:
+        """
+        Store ``data`` under ``name``.
+
+        Returns:
+            Digest of the content, or None when ``name`` exists and ``overwrite`` is False
+        """
+        name = PurePosixPath(name).as_posix()
+        digest = content_digest(data)
+        with self._lock:
+            if not overwrite and self._exists(name):
+                return None
+            blob = self.blob_path(digest)
+            if not blob.exists():
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                # Write then rename so a blob is never visible half-written
+                handle, temporary = tempfile.mkstemp(dir=blob.parent)
+                with os.fdopen(handle, "wb") as stream:
+                    stream.write(data)
+                os.replace(temporary, blob)
+            self.connection.execute(
+                "INSERT OR REPLACE INTO documents (name, digest, size, saved_at) VALUES (?, ?, ?, ?)",
+                (name, digest, len(data), datetime.now().isoformat()),
+            )
+            self.connection.commit()
+        return digest
+
+    def _exists(self, name: str) -> bool:
+        row = self.connection.execute("SELECT 1 FROM documents WHERE name = ?", (name,)).fetchone()
+        return row is not None or (self.root / name).is_file()
+
+    def path(self, name: str) -> Optional[Path]:
+        """File holding the content saved under ``name`` (blob or plain file), None when unknown."""
+        name = PurePosixPath(name).as_posix()
+        row = self.connection.execute("SELECT digest FROM documents WHERE name = ?", (name,)).fetchone()
+        if row is not None:
+            return self.blob_path(row[0])
+        path = self.root / name
+        return path if path.is_file() else None
+
+    def get(self, name: str) -> Optional[bytes]:
+        """Content saved under ``name``, None when unknown."""
+        path = self.path(name)
+        return path.read_bytes() if path is not None else None
+
+    def _plain_files(self) -> Dict[str, Tuple[str, float]]:
+        """Plain files of the directory (outside the store) with digest and mtime."""
+        with self._scan_lock:
+            return self._scan_plain_files()
+
+    def _scan_plain_files(self) -> Dict[str, Tuple[str, float]]:
+        with self._lock:
+            if self._plain_digests is None:
+                self._plain_digests = {
+                    name: (mtime_ns, size, digest)
+                    for name, mtime_ns, size, digest in self.connection.execute(
+                        "SELECT name, mtime_ns, size, digest FROM plain_files"
+                    )
+                }
+        files = {}
+        hashed = []
+        for directory, subdirectories, file_names in os.walk(self.root):
+            # The blobs are reached through the index, never by walking them
+            subdirectories[:] = [name for name in subdirectories if name != BLOB_DIR]
+            for file_name in file_names:
+                if file_name.startswith(INDEX_FILE):
+                    continue
+                path = Path(directory) / file_name
+                name = path.relative_to(self.root).as_posix()
+                stat = path.stat()
+                cached = self._plain_digests.get(name)
+                if cached is None or cached[:2] != (stat.st_mtime_ns, stat.st_size):
+                    cached = (stat.st_mtime_ns, stat.st_size, content_digest(path.read_bytes()))
+                    self._plain_digests[name] = cached
+                    hashed.append((name, *cached))
+                files[name] = (cached[2], stat.st_mtime)
+        removed = [(name,) for name in self._plain_digests if name not in files]
+        if hashed or removed:
+            with self._lock:
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO plain_files (name, mtime_ns, size, digest) VALUES (?, ?, ?, ?)", hashed
+                )
+                self.connection.executemany("DELETE FROM plain_files WHERE name = ?", removed)
+                self.connection.commit()
+            for (name,) in removed:
+                del self._plain_digests[name]
+        return files
+
+    def catalog(self) -> Dict[str, Tuple[str, str]]:
+        """Every known name with its digest and save time (stored names take precedence)."""
+        entries = {
+            name: (digest, datetime.fromtimestamp(mtime).isoformat())
+            for name, (digest, mtime) in self._plain_files().items()
+        }
+        entries.update({
+            name: (digest, saved_at)
+            for name, digest, saved_at in self.connection.execute("SELECT name, digest, saved_at FROM documents")
+        })
+        return entries
+
+    def unique(self, names: Optional[List[str]] = None) -> List[Dict[str, object]]:
+        """
+        Group names by content.
+
+        Returns:
+            One entry per distinct content, newest name first, with the other
+            names holding the same content as ``duplicates``
+        """
+        catalog = self.catalog()
+        groups: Dict[str, List[Tuple[str, str]]] = {}
+        for name in (catalog if names is None else names):
+            digest, saved_at = catalog[name]
+            groups.setdefault(digest, []).append((saved_at, name))
+        entries = []
+        for digest, members in groups.items():
+            members.sort(reverse=True)
+            entries.append({"name": members[0][1], "digest": digest, "duplicates": [name for _, name in members[1:]]})
+        return sorted(entries, key=lambda entry: entry["name"])
+
+    def ingest_plain_files(self, remove: bool = False) -> Dict[str, int]:
+        """
+        Move plain files of the directory into the store.
+
+        Args:
+            remove: Delete each plain file once its content is stored
+
+        Returns:
+            Dictionary with the number of files ingested and of blobs they share
+        """
+        files = self._plain_files()
+        for name in files:
+            self.put(name, (self.root / name).read_bytes())
+            if remove:
+                (self.root / name).unlink()
+        if remove:
+            self._plain_files()
+        return {"files": len(files), "unique_contents": len({digest for digest, _ in files.values()})}
+
+    def stats(self) -> Dict[str, int]:
+        catalog = self.catalog()
+        return {"names": len(catalog), "unique_contents": len({digest for digest, _ in catalog.values()})}
+
+
+def load_content_store(root: Union[str, Path]) -> ContentStore:
+    """Shared store for ``root``, opened once per process."""
+    key = str(Path(root).resolve())
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = ContentStore(root)
+        return _stores[key]
@@ -0,0 +1,306 @@
+"""
+Local demographic data store behind demographic_analyzer.
+
+Areas are stored in one SQLite table keyed by normalized location and
+radius, with the demographic fields as flat columns plus a precomputed
+``demographic_score`` and trend labels. ``load_census_file`` bulk-loads
+census-style CSV files and only rewrites areas whose data changed.
+Locations missing from the store get a synthetic estimate seeded by the
+location, so repeated calls always return the same figures.
+"""
+import csv
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import unicodedata
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+DEFAULT_DEMOGRAPHIC_DB = Path("tmp") / "demographics.db"
+
+# Stored columns: (column, category, path in the analyzer output, type)
+DEMOGRAPHIC_FIELDS = [
+    ("total_population", "population", ("total_population",), int),
+    ("population_density", "population", ("population_density",), int),
+    ("age_under_18", "population", ("age_distribution", "under_18"), float),
+    ("age_18_34", "population", ("age_distribution", "18_34"), float),
+    ("age_35_54", "population", ("age_distribution", "35_54"), float),
+    ("age_55_plus", "population", ("age_distribution", "55_plus"), float),
+    ("household_size", "population", ("household_size",), float),
+    ("growth_rate", "population", ("growth_rate",), float),
+    ("migration_pattern", "population", ("migration_pattern",), str),
+    ("median_household_income", "income", ("median_household_income",), int),
+    ("per_capita_income", "income", ("per_capita_income",), int),
+    ("income_under_25k", "income", ("income_distribution", "under_25k"), float),
+    ("income_25k_50k", "income", ("income_distribution", "25k_50k"), float),
+    ("income_50k_75k", "income", ("income_distribution", "50k_75k"), float),
+    ("income_75k_100k", "income", ("income_distribution", "75k_100k"), float),
+    ("income_over_100k", "income", ("income_distribution", "over_100k"), float),
+    ("income_growth_rate", "income", ("income_growth_rate",), float),
+    ("poverty_rate", "income", ("poverty_rate",), float),
+    ("high_school_graduation", "education", ("high_school_graduation",), float),
+    ("bachelor_degree", "education", ("bachelor_degree",), float),
+    ("advanced_degree", "education", ("advanced_degree",), float),
+    ("school_quality_rating", "education", ("school_quality_rating",), int),
+    ("unemployment_rate", "employment", ("unemployment_rate",), float),
+    ("labor_force_participation", "employment", ("labor_force_participation",), float),
+    ("job_growth_rate", "employment", ("job_growth_rate",), float),
+    ("average_commute_time", "employment", ("average_commute_time",), int),
+]
+DEMOGRAPHIC_CATEGORIES = ["population", "income", "education", "employment"]
+_COLUMNS = [field[0] for field in DEMOGRAPHIC_FIELDS]
+_TYPES = {field[0]: field[3] for field in DEMOGRAPHIC_FIELDS}
+
+# Ranges of the synthetic estimate for areas missing from the store
+_SYNTHETIC_RANGES = {
+    "total_population": (15000, 100000),
+    "population_density": (1000, 8000),
+    "age_under_18": (15, 25),
+    "age_18_34": (20, 35),
+    "age_35_54": (25, 35),
+    "age_55_plus": (15, 30),
+    "household_size": (2.1, 2.8),
+    "growth_rate": (-0.5, 3.5),
+    "median_household_income": (45000, 120000),
+    "per_capita_income": (25000, 65000),
+    "income_under_25k": (10, 25),
+    "income_25k_50k": (15, 30),
+    "income_50k_75k": (20, 30),
+    "income_75k_100k": (15, 25),
+    "income_over_100k": (10, 30),
+    "income_growth_rate": (1.0, 4.0),
+    "poverty_rate": (5, 20),
+    "high_school_graduation": (80, 95),
+    "bachelor_degree": (20, 60),
+    "advanced_degree": (8, 25),
+    "school_quality_rating": (6, 10),
+    "unemployment_rate": (2.5, 8.0),
+    "labor_force_participation": (60, 75),
+    "job_growth_rate": (0.5, 3.5),
+    "average_commute_time": (20, 45),
+}
+_MIGRATION_PATTERNS = ["Inbound", "Outbound", "Stable"]
+_SQL_TYPES = {int: "INTEGER", float: "REAL", str: "TEXT"}
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS demographics (
+    location_key TEXT NOT NULL,
+    radius_miles REAL NOT NULL,
+    location TEXT NOT NULL,
+    {", ".join(f"{column} {_SQL_TYPES[_TYPES[column]]}" for column in _COLUMNS)},
+    demographic_score REAL,
+    population_trend TEXT,
+    income_trend TEXT,
+    row_hash TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (location_key, radius_miles)
+)
+"""
+
+_connections: Dict[str, sqlite3.Connection] = {}
+_connections_lock = threading.Lock()
+
+
+def normalize_location(location: str) -> str:
+    """Lowercase, accent-free, punctuation-free form of a location ("Maârif, Casablanca" -> "maarif casablanca")."""
+    text = unicodedata.normalize("NFKD", str(location))
+    text = "".join(character for character in text if not unicodedata.combining(character))
+    return " ".join(re.sub(r"[^\w]+", " ", text.lower()).split())
+
+
+def get_connection(db_path: Union[str, Path] = DEFAULT_DEMOGRAPHIC_DB) -> sqlite3.Connection:
+    """Shared connection to the store, creating the database and schema on first use."""
+    key = str(Path(db_path).resolve())
+    with _connections_lock:
+        connection = _connections.get(key)
+        if connection is None:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(key, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            connection.execute(_SCHEMA)
+            connection.commit()
+            _connections[key] = connection
+        return connection
+
+
+def demographic_score(record: Dict[str, Any], categories: Iterable[str] = DEMOGRAPHIC_CATEGORIES) -> float:
+    """Investment attractiveness score (0-1) of an area from the selected categories."""
+    score_factors = []
+    if "population" in categories:
+        score_factors.append(min(record["growth_rate"] / 3, 1))
+    if "income" in categories:
+        score_factors.append(min(record["median_household_income"] / 100000, 1))
+    if "education" in categories:
+        score_factors.append(record["bachelor_degree"] / 100)
+    if "employment" in categories:
+        score_factors.append(1 - record["unemployment_rate"] / 10)
+    return sum(score_factors) / len(score_factors) if score_factors else 0.5
+
+
+def _trend(rate: float, stable_band: float = 0.5) -> str:
+    return "Growing" if rate > stable_band else "Declining" if rate < -stable_band else "Stable"
+
+
+def _derived_fields(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Precomputed score and trend labels stored with each area."""
+    return {
+        "demographic_score": round(demographic_score(record), 4),
+        "population_trend": _trend(record["growth_rate"]),
+        # Income growth is judged against ~2% inflation
+        "income_trend": _trend(record["income_growth_rate"] - 2.0)
+    }
+
+
+def _coerce(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Typed field values from a raw (e.g. CSV) record."""
+    values = {}
+    for column in _COLUMNS:
+        value = record[column]
+        if _TYPES[column] is str:
+            values[column] = str(value)
+        elif _TYPES[column] is int:
+            values[column] = int(round(float(value)))
+        else:
+            values[column] = round(float(value), 4)
+    return values
+
+
+def _row_hash(values: Dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps([values[column] for column in _COLUMNS]).encode()).hexdigest()
+
+
+def synthetic_record(location: str, radius_miles: float = 1.0) -> Dict[str, Any]:
+    """Deterministic estimate for an area missing from the store, seeded by location and radius."""
+    digest = hashlib.blake2b(f"{normalize_location(location)}|{float(radius_miles):g}".encode(), digest_size=8)
+    rng = np.random.default_rng(int.from_bytes(digest.digest(), "little"))
+    record = {}
+    for column, (low, high) in _SYNTHETIC_RANGES.items():
+        record[column] = int(rng.integers(low, high)) if _TYPES[column] is int else float(rng.uniform(low, high))
+    record["migration_pattern"] = _MIGRATION_PATTERNS[int(rng.integers(len(_MIGRATION_PATTERNS)))]
+    record = _coerce(record)
+    record.update(_derived_fields(record))
+    return record
+
+
+def lookup(
+    location: str,
+    radius_miles: float = 1.0,
+    db_path: Union[str, Path] = DEFAULT_DEMOGRAPHIC_DB,
+) -> Optional[Dict[str, Any]]:
+    """
+    Stored record of an area, using the closest stored radius for the location.
+
+    Returns:
+        Record with the DEMOGRAPHIC_FIELDS columns, score, trends and
+        ``radius_miles``, or None when the location is not in the store
+    """
+    row = get_connection(db_path).execute(
+        "SELECT * FROM demographics WHERE location_key = ? "
+        "ORDER BY ABS(radius_miles - ?), radius_miles LIMIT 1",
+        (normalize_location(location), float(radius_miles)),
+    ).fetchone()
+    return dict(row) if row is not None else None
+
+
+def upsert_records(
+    records: Iterable[Dict[str, Any]],
+    db_path: Union[str, Path] = DEFAULT_DEMOGRAPHIC_DB,
+    batch_size: int = 1000,
+) -> Dict[str, int]:
+    """
+    Insert new areas and rewrite only the areas whose fields changed.
+
+    Args:
+        records: Mappings with ``location``, optional ``radius_miles`` (default 1)
+            and every DEMOGRAPHIC_FIELDS column
+        db_path: SQLite database of the store
+        batch_size: Records compared and written per transaction
+
+    Returns:
+        Counts of inserted, updated and unchanged areas
+    """
+    connection = get_connection(db_path)
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    columns = ["location_key", "radius_miles", "location", *_COLUMNS,
+               "demographic_score", "population_trend", "income_trend", "row_hash", "updated_at"]
+    statement = (
+        f"INSERT INTO demographics ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+        "ON CONFLICT (location_key, radius_miles) DO UPDATE SET "
+        + ", ".join(f"{column} = excluded.{column}" for column in columns[2:])
+    )
+
+    def flush(batch: List[Tuple[Any, ...]]) -> None:
+        keys = {(row[0], row[1]) for row in batch}
+        existing = {}
+        for location_key in {key[0] for key in keys}:
+            for row in connection.execute(
+                "SELECT radius_miles, row_hash FROM demographics WHERE location_key = ?", (location_key,)
+            ):
+                existing[(location_key, row["radius_miles"])] = row["row_hash"]
+        changed = []
+        for row in batch:
+            previous = existing.get((row[0], row[1]))
+            if previous is None:
+                counts["inserted"] += 1
+            elif previous != row[-2]:
+                counts["updated"] += 1
+            else:
+                counts["unchanged"] += 1
+                continue
+            changed.append(row)
+        with connection:
+            connection.executemany(statement, changed)
+
+    timestamp = datetime.now().isoformat()
+    batch = []
+    for record in records:
+        values = _coerce(record)
+        derived = _derived_fields(values)
+        radius = record.get("radius_miles")
+        batch.append((
+            normalize_location(record["location"]),
+            # A radius of 0 is kept; only a missing one (None, or empty in a CSV) defaults to 1 mile
+            1.0 if radius is None or radius == "" else float(radius),
+            str(record["location"]),
+            *(values[column] for column in _COLUMNS),
+            derived["demographic_score"],
+            derived["population_trend"],
+            derived["income_trend"],
+            _row_hash(values),
+            timestamp,
+        ))
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+    return counts
+
+
+def load_census_file(
+    path: Union[str, Path],
+    db_path: Union[str, Path] = DEFAULT_DEMOGRAPHIC_DB,
+    delimiter: str = ",",
+    encoding: str = "utf-8",
+) -> Dict[str, int]:
+    """
+    Bulk-load a census-style CSV file (one area per row) into the store.
+
+    The header must contain ``location``, every DEMOGRAPHIC_FIELDS column and
+    optionally ``radius_miles``; rows are streamed, so file size is not limited
+    by memory. Re-running the load on a refreshed file only rewrites changed areas.
+
+    Returns:
+        Counts of inserted, updated and unchanged areas
+    """
+    with open(path, newline="", encoding=encoding) as handle:
+        reader = csv.DictReader(handle, delimiter=delimiter)
+        missing = {"location", *_COLUMNS} - set(reader.fieldnames or [])
+        if missing:
+            raise ValueError(f"Census file is missing columns: {sorted(missing)}")
+        return upsert_records(reader, db_path)
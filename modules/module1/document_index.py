@@ -0,0 +1,285 @@
+"""
+Incremental full-text index over the agents' documents directory.
+
+The index lives in the content store's SQLite database as an FTS5 table with
+one row per distinct content (unicode61 tokenizer with diacritics removed, so
+"resiliation" finds "résiliation" and French and English reports share one
+index). Saves through DedupFileTools are indexed as they are written; plain
+files dropped into the directory are picked up by a periodic refresh that
+only stats them and re-hashes the ones whose mtime or size changed. Searches
+start that refresh in a background thread and answer from the index as it
+is; only the very first build of an empty index runs before the query. A
+search is an inverted-index lookup ranked by BM25, so its cost follows the
+number of matching documents, not the size of the directory. Use
+load_document_index to share one index per directory within a process.
+"""
+import re
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from content_store import ContentStore, content_digest, load_content_store
+
+_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS document_text USING fts5(
+    body, tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TABLE IF NOT EXISTS indexed_contents (
+    digest TEXT PRIMARY KEY,
+    text_id INTEGER
+);
+CREATE TABLE IF NOT EXISTS indexed_names (
+    name TEXT PRIMARY KEY,
+    digest TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS indexed_contents_text ON indexed_contents (text_id);
+CREATE INDEX IF NOT EXISTS indexed_names_digest ON indexed_names (digest);
+CREATE VIRTUAL TABLE IF NOT EXISTS document_terms USING fts5vocab(document_text, 'row');
+"""
+
+_TOKEN = re.compile(r"\w+")
+
+_indexes: Dict[str, "DocumentIndex"] = {}
+_indexes_lock = threading.Lock()
+
+# Terms at least this long also match their inflections (prefix query)
+PREFIX_LENGTH = 4
+
+
+def decode(data: bytes) -> Optional[str]:
+    """Text of a document (UTF-8, else Windows-1252), None for binary content."""
+    if b"\0" in data[:8192]:
+        return None
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return data.decode("cp1252", errors="replace")
+
+
+# FTS5's BM25 gives terms found in at least this share of the documents an
+# IDF of 1e-6, so they cannot reorder documents matching a rarer query term.
+# They are left out of the match when the rarer terms alone fill the results
+COMMON_TERM_SHARE = 0.5
+
+
+def query_terms(query: str) -> List[str]:
+    """Distinct terms of a free-text query, folded like the index (lowercase, no diacritics)."""
+    folded = "".join(
+        character for character in unicodedata.normalize("NFKD", query.lower())
+        if not unicodedata.combining(character)
+    )
+    return list(dict.fromkeys(_TOKEN.findall(folded)))
+
+
+def match_expression(terms: List[str]) -> Optional[str]:
+    """FTS5 expression matching any of ``terms`` (None when there is none)."""
+    # Quoting keeps FTS5 operators in the query from being interpreted
+    return " OR ".join(f'"{term}"*' if len(term) >= PREFIX_LENGTH else f'"{term}"' for term in terms) or None
+
+
+class DocumentIndex:
+    """Full-text index of a ContentStore, refreshed incrementally."""
+
+    def __init__(self, store: ContentStore, refresh_interval: float = 30.0):
+        self.store = store
+        self.refresh_interval = refresh_interval
+        self._refreshed_at: Optional[float] = None
+        # Number of indexed texts, counted once and then kept up to date
+        self._texts: Optional[int] = None
+        # Held while a background refresh runs, so searches start at most one
+        self._refreshing = threading.Lock()
+        with store._lock:
+            store.connection.executescript(_SCHEMA)
+
+    def _index_content(self, digest: str, data: bytes) -> None:
+        """Add one content to the FTS table unless it is already there (caller holds the lock)."""
+        connection = self.store.connection
+        if connection.execute("SELECT 1 FROM indexed_contents WHERE digest = ?", (digest,)).fetchone():
+            return
+        text = decode(data)
+        text_id = None
+        if text is not None:
+            text_id = connection.execute("INSERT INTO document_text (body) VALUES (?)", (text,)).lastrowid
+            if self._texts is not None:
+                self._texts += 1
+        # Binary contents are recorded without text so they are not read again
+        connection.execute("INSERT INTO indexed_contents (digest, text_id) VALUES (?, ?)", (digest, text_id))
+
+    def add(self, name: str, data: bytes, digest: Optional[str] = None) -> None:
+        """Index a document as it is saved."""
+        digest = digest or content_digest(data)
+        with self.store._lock:
+            connection = self.store.connection
+            previous = connection.execute("SELECT digest FROM indexed_names WHERE name = ?", (name,)).fetchone()
+            self._index_content(digest, data)
+            connection.execute("INSERT OR REPLACE INTO indexed_names (name, digest) VALUES (?, ?)", (name, digest))
+            if previous is not None and previous[0] != digest:
+                self._drop_orphans()
+            connection.commit()
+
+    def _drop_orphans(self) -> None:
+        """Remove contents no name refers to any more (caller holds the lock)."""
+        connection = self.store.connection
+        orphans = connection.execute(
+            "SELECT digest, text_id FROM indexed_contents "
+            "WHERE digest NOT IN (SELECT digest FROM indexed_names)"
+        ).fetchall()
+        if orphans:
+            connection.executemany("DELETE FROM document_text WHERE rowid = ?", [(text_id,) for _, text_id in orphans])
+            connection.executemany("DELETE FROM indexed_contents WHERE digest = ?", [(digest,) for digest, _ in orphans])
+            self._texts = None
+
+    def refresh(self, force: bool = False) -> Dict[str, int]:
+        """
+        Bring the index up to date with the directory.
+
+        Args:
+            force: Refresh even if the last refresh is more recent than refresh_interval
+
+        Returns:
+            Dictionary with the names added, changed and removed (all zero when skipped)
+        """
+        changes = {"added": 0, "changed": 0, "removed": 0}
+        now = time.monotonic()
+        if not force and not self._refresh_due(now):
+            return changes
+
+        # Other instances may have indexed texts since the count was taken
+        self._texts = None
+        catalog = {name: digest for name, (digest, _) in self.store.catalog().items()}
+        with self.store._lock:
+            connection = self.store.connection
+            indexed = dict(connection.execute("SELECT name, digest FROM indexed_names"))
+            for name, digest in catalog.items():
+                if indexed.get(name) == digest:
+                    continue
+                changes["changed" if name in indexed else "added"] += 1
+                path = self.store.path(name)
+                if path is not None:
+                    self._index_content(digest, path.read_bytes())
+                connection.execute("INSERT OR REPLACE INTO indexed_names (name, digest) VALUES (?, ?)", (name, digest))
+            removed = [(name,) for name in indexed if name not in catalog]
+            connection.executemany("DELETE FROM indexed_names WHERE name = ?", removed)
+            changes["removed"] = len(removed)
+            if changes["changed"] or changes["removed"]:
+                self._drop_orphans()
+            connection.commit()
+        self._refreshed_at = now
+        return changes
+
+    def _refresh_due(self, now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        return self._refreshed_at is None or now - self._refreshed_at >= self.refresh_interval
+
+    def _refresh_in_background(self) -> None:
+        """Start a refresh in a daemon thread when one is due and none is running."""
+        if not self._refresh_due() or not self._refreshing.acquire(blocking=False):
+            return
+
+        def run() -> None:
+            try:
+                self.refresh()
+            finally:
+                self._refreshing.release()
+
+        threading.Thread(target=run, name="document-index-refresh", daemon=True).start()
+
+    def _built(self) -> bool:
+        with self.store._lock:
+            return self.store.connection.execute("SELECT 1 FROM indexed_names LIMIT 1").fetchone() is not None
+
+    def search(self, query: str, limit: int = 10, snippet_tokens: int = 16) -> List[Dict[str, Any]]:
+        """
+        Rank the documents matching ``query`` (any of its terms, BM25).
+
+        Args:
+            query: Free text in French or English
+            limit: Maximum number of results
+            snippet_tokens: Length of each snippet in tokens
+
+        Returns:
+            One entry per distinct content: its last name in sort order (the
+            newest of timestamped reports), the other names with that content,
+            BM25 score (higher is better) and a snippet with the matched terms
+            in bold
+        """
+        terms = query_terms(query)
+        if not terms:
+            return []
+        if self._refreshed_at is None and not self._built():
+            # Nothing to answer from yet: build the index before the query
+            self.refresh()
+        else:
+            self._refresh_in_background()
+        with self.store._lock:
+            connection = self.store.connection
+            selective = self._selective_terms(terms)
+            rows = self._match(match_expression(selective), limit, snippet_tokens)
+            if len(selective) < len(terms) and len(rows) < limit:
+                # Too few documents match the rarer terms: the common ones fill the results
+                rows = self._match(match_expression(terms), limit, snippet_tokens)
+            results = []
+            for digest, score, snippet in rows:
+                names = [name for (name,) in connection.execute(
+                    "SELECT name FROM indexed_names WHERE digest = ? ORDER BY name DESC", (digest,)
+                )]
+                results.append({
+                    "name": names[0] if names else None,
+                    "duplicates": names[1:],
+                    "score": round(score, 2),
+                    "snippet": " ".join(snippet.split())
+                })
+        return results
+
+    def _match(self, expression: str, limit: int, snippet_tokens: int) -> List[Any]:
+        """Digest, score and snippet of the best matches of an FTS5 expression (caller holds the lock)."""
+        return self.store.connection.execute(
+            "SELECT c.digest, -bm25(document_text), snippet(document_text, 0, '**', '**', '…', ?) "
+            "FROM document_text JOIN indexed_contents c ON c.text_id = document_text.rowid "
+            "WHERE document_text MATCH ? ORDER BY bm25(document_text) LIMIT ?",
+            (snippet_tokens, expression, limit),
+        ).fetchall()
+
+    def _selective_terms(self, terms: List[str]) -> List[str]:
+        """
+        Terms matching less than COMMON_TERM_SHARE of the corpus (caller holds the lock).
+
+        The rarest term is kept when every term is common.
+        """
+        connection = self.store.connection
+        if self._texts is None:
+            self._texts = connection.execute(
+                "SELECT COUNT(*) FROM indexed_contents WHERE text_id IS NOT NULL"
+            ).fetchone()[0]
+        total = self._texts
+        frequencies = {}
+        for term in terms:
+            if len(term) >= PREFIX_LENGTH:
+                # A prefix matches at least as many documents as its most frequent expansion
+                row = connection.execute(
+                    "SELECT MAX(doc) FROM document_terms WHERE term >= ? AND term < ?", (term, term + "\uffff")
+                ).fetchone()
+            else:
+                row = connection.execute("SELECT doc FROM document_terms WHERE term = ?", (term,)).fetchone()
+            frequencies[term] = (row[0] or 0) if row else 0
+        selective = [term for term in terms if frequencies[term] < COMMON_TERM_SHARE * total]
+        return selective or [min(terms, key=frequencies.get)]
+
+    def stats(self) -> Dict[str, int]:
+        with self.store._lock:
+            connection = self.store.connection
+            return {
+                "names": connection.execute("SELECT COUNT(*) FROM indexed_names").fetchone()[0],
+                "contents": connection.execute("SELECT COUNT(*) FROM indexed_contents").fetchone()[0],
+            }
+
+
+def load_document_index(root: Union[str, Path]) -> DocumentIndex:
+    """Shared index of the store at ``root``, opened once per process."""
+    key = str(Path(root).resolve())
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = DocumentIndex(load_content_store(root))
+        return _indexes[key]
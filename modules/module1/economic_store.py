@@ -0,0 +1,365 @@
+"""
+Local time-series store behind economic_indicator_tracker.
+
+Every (location, series) pair is a directory of append-only, memory-mapped
+columnar files holding one value per month. Rolling means, year-over-year
+changes, prefix sums and trend flags are computed once when observations
+are ingested, so answering any time period is a constant-time slice.
+Series missing from the store get a synthetic history seeded by the
+location, so repeated calls always return the same figures.
+"""
+import csv
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from demographic_store import normalize_location
+
+DEFAULT_ECONOMIC_STORE = Path("tmp") / "economic_series"
+
+# Monthly series: indicator, kind ("rate": percent or count level, changes in
+# points; "index": price/volume index, changes in percent), trend band, and
+# the synthetic history (start level for rates or current level for indexes,
+# long-run mean or monthly drift, volatility, bounds)
+SERIES = {
+    "fed_funds_rate": ("interest_rates", "rate", 0.05, (5.25, 4.0, 0.10, (0.25, 8.0))),
+    "mortgage_30yr": ("interest_rates", "rate", 0.05, (6.9, 6.2, 0.12, (2.5, 9.5))),
+    "unemployment_rate": ("employment", "rate", 0.05, (4.0, 4.5, 0.10, (1.5, 12.0))),
+    "job_growth_rate": ("employment", "rate", 0.05, (1.8, 1.5, 0.15, (-3.0, 5.0))),
+    "labor_force_participation": ("employment", "rate", 0.05, (64.5, 64.0, 0.10, (60.0, 68.0))),
+    "wage_growth_rate": ("employment", "rate", 0.05, (3.8, 3.5, 0.10, (1.0, 6.5))),
+    "cpi": ("inflation", "index", 0.10, (300.0, 0.0025, 0.002, None)),
+    "core_cpi": ("inflation", "index", 0.10, (305.0, 0.0026, 0.0015, None)),
+    "housing_cpi": ("inflation", "index", 0.10, (320.0, 0.0035, 0.002, None)),
+    "real_gdp": ("gdp", "index", 0.10, (22000.0, 0.002, 0.003, None)),
+    "consumer_spending": ("gdp", "index", 0.10, (15000.0, 0.0025, 0.003, None)),
+    "home_price_index": ("housing_market", "index", 0.10, (300.0, 0.004, 0.006, None)),
+    "existing_home_sales": ("housing_market", "rate", 0.05, (5.0, 5.0, 0.15, (3.0, 7.0))),
+    "housing_starts": ("housing_market", "rate", 20.0, (1400.0, 1400.0, 40.0, (900.0, 1900.0))),
+    "months_supply": ("housing_market", "rate", 0.1, (3.8, 4.0, 0.2, (1.5, 9.0))),
+    "affordability_index": ("housing_market", "rate", 1.0, (120.0, 120.0, 2.0, (80.0, 170.0))),
+}
+
+# Stored columns (file suffix, dtype); each holds one entry per month
+COLUMNS = {
+    "value": np.float64,
+    "prefix_sum": np.float64,
+    "rolling_mean_3": np.float64,
+    "rolling_mean_12": np.float64,
+    "yoy_change": np.float64,
+    "trend": np.int8,
+}
+
+# Months of synthetic history for series missing from the store
+SYNTHETIC_HISTORY_MONTHS = 240
+
+# Stored months needed to extend the derived columns (12-month change plus the 3-month trend lag)
+_CONTEXT = 15
+
+_cache: Dict[str, Tuple[int, "SeriesView"]] = {}
+_lock = threading.Lock()
+
+
+def month_index(month: Union[str, datetime]) -> int:
+    """Months since year 0 of a ``YYYY-MM`` (or ``YYYY-MM-DD``) string or datetime."""
+    if isinstance(month, str):
+        month = datetime.strptime(month[:7], "%Y-%m")
+    return month.year * 12 + month.month - 1
+
+
+def month_label(index: int) -> str:
+    """``YYYY-MM`` label of a month index."""
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def derive_columns(
+    values: np.ndarray,
+    kind: str,
+    band: float,
+    history: Sequence[float] = (),
+    prior_sum: float = 0.0,
+) -> Dict[str, np.ndarray]:
+    """
+    Derived columns for new monthly values, continuing a stored series.
+
+    Every window ends at most 15 months back, so the last _CONTEXT stored
+    values are enough to extend the columns exactly.
+
+    Args:
+        values: New monthly values
+        kind: "rate" (changes in points) or "index" (changes in percent)
+        band: Change of the trend basis treated as flat
+        history: Last stored values (at most _CONTEXT; the full series when shorter)
+        prior_sum: Prefix sum at the last stored month
+
+    Returns:
+        Dictionary of column name to array aligned with ``values``; windows
+        without enough history are NaN and their trend is 0
+    """
+    values = np.asarray(values, dtype=float)
+    series = np.concatenate([np.asarray(history, dtype=float), values])
+    positions = np.arange(len(series))
+    running = np.concatenate([[0.0], np.cumsum(series)])
+
+    def lagged(column: np.ndarray, lag: int) -> np.ndarray:
+        shifted = np.full(len(column), np.nan)
+        if lag < len(column):
+            shifted[lag:] = column[:len(column) - lag]
+        return shifted
+
+    rolling = {
+        window: np.where(
+            positions >= window - 1,
+            (running[positions + 1] - running[np.maximum(positions + 1 - window, 0)]) / window,
+            np.nan,
+        )
+        for window in (3, 12)
+    }
+    if kind == "index":
+        yoy = (series / lagged(series, 12) - 1) * 100
+        basis = yoy
+    else:
+        yoy = series - lagged(series, 12)
+        basis = rolling[3]
+    with np.errstate(invalid="ignore"):
+        change = basis - lagged(basis, 3)
+    trend = np.zeros(len(series), dtype=np.int8)
+    trend[change > band] = 1
+    trend[change < -band] = -1
+
+    new = slice(len(series) - len(values), None)
+    return {
+        "value": values,
+        "prefix_sum": prior_sum + np.cumsum(values),
+        "rolling_mean_3": rolling[3][new],
+        "rolling_mean_12": rolling[12][new],
+        "yoy_change": yoy[new],
+        "trend": trend[new],
+    }
+
+
+class SeriesView:
+    """Read-only columns of one monthly series; see series_view."""
+
+    def __init__(self, name: str, start_month: int, columns: Dict[str, np.ndarray], source: str):
+        self.name = name
+        self.start_month = start_month
+        self.columns = columns
+        self.source = source
+        self.length = len(columns["value"])
+
+    @property
+    def last_month(self) -> int:
+        return self.start_month + self.length - 1
+
+    def latest(self, column: str = "value", lag: int = 0) -> Optional[float]:
+        """Entry ``lag`` months before the latest one (None outside the history)."""
+        if lag >= self.length:
+            return None
+        value = self.columns[column][self.length - 1 - lag]
+        return None if np.isnan(value) else float(value)
+
+    def window(self, months: int, column: str = "value") -> np.ndarray:
+        """Last ``months`` entries of a column (a slice of the mapped file)."""
+        return self.columns[column][max(self.length - months, 0):]
+
+    def between(self, first_month: int, last_month: int, column: str = "value") -> np.ndarray:
+        """Entries of a column from ``first_month`` to ``last_month`` (month indexes, inclusive)."""
+        start = max(first_month - self.start_month, 0)
+        return self.columns[column][start:max(last_month - self.start_month + 1, start)]
+
+    def mean(self, months: int) -> float:
+        """Mean over the last ``months`` months (at least the latest one) from the prefix sums."""
+        months = min(max(months, 1), self.length)
+        prefix = self.columns["prefix_sum"]
+        before = prefix[self.length - months - 1] if months < self.length else prefix[0] - self.columns["value"][0]
+        return float((prefix[-1] - before) / months)
+
+    def change(self, months: int) -> Optional[float]:
+        """Change over the last ``months`` months, in points or percent by series kind."""
+        current, past = self.latest(), self.latest(lag=min(months, self.length - 1))
+        if current is None or past is None:
+            return None
+        return (current / past - 1) * 100 if SERIES[self.name][1] == "index" else current - past
+
+
+def _series_dir(location: str, name: str, root: Union[str, Path]) -> Path:
+    return Path(root) / (normalize_location(location).replace(" ", "_") or "national") / name
+
+
+def _read_columns(directory: Path, length: int) -> Dict[str, np.ndarray]:
+    columns = {}
+    for name, dtype in COLUMNS.items():
+        if length:
+            columns[name] = np.memmap(directory / f"{name}.bin", dtype=dtype, mode="r", shape=(length,))
+        else:
+            columns[name] = np.empty(0, dtype=dtype)
+    return columns
+
+
+def series_view(location: str, name: str, root: Union[str, Path] = DEFAULT_ECONOMIC_STORE) -> Optional[SeriesView]:
+    """Stored series for a location, reopened when new months are appended; None when absent."""
+    directory = _series_dir(location, name, root)
+    meta_path = directory / "meta.json"
+    try:
+        modified = meta_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    key = str(directory.resolve())
+    with _lock:
+        cached = _cache.get(key)
+        if cached is None or cached[0] != modified:
+            meta = json.loads(meta_path.read_text())
+            view = SeriesView(name, meta["start_month"], _read_columns(directory, meta["length"]), "economic_store")
+            cached = (modified, view)
+            _cache[key] = cached
+        return cached[1]
+
+
+def append_observations(
+    location: str,
+    name: str,
+    start_month: Union[str, datetime],
+    values: Sequence[float],
+    root: Union[str, Path] = DEFAULT_ECONOMIC_STORE,
+) -> Dict[str, int]:
+    """
+    Append consecutive monthly values to a series and extend its derived columns.
+
+    The store is append-only: months up to the last stored one are skipped,
+    and a gap after it is filled with the last stored value.
+
+    Args:
+        location: Geographic scope (national, state, metro, local)
+        name: Series name (a key of SERIES)
+        start_month: Month of the first value
+        values: Consecutive monthly values
+        root: Store directory
+
+    Returns:
+        Dictionary with the number of appended, gap-filled and skipped months
+    """
+    if name not in SERIES:
+        raise ValueError(f"Unknown economic series: {name}")
+    _, kind, band, _ = SERIES[name]
+    values = np.asarray(values, dtype=float)
+    start = month_index(start_month)
+    directory = _series_dir(location, name, root)
+
+    with _lock:
+        meta_path = directory / "meta.json"
+        meta = json.loads(meta_path.read_text()) if meta_path.exists() else {"start_month": start, "length": 0}
+        stored = _read_columns(directory, meta["length"])
+        next_month = meta["start_month"] + meta["length"]
+
+        skipped = min(max(next_month - start, 0), len(values)) if meta["length"] else 0
+        values = values[skipped:]
+        gap = max(start + skipped - next_month, 0) if meta["length"] else 0
+        if not len(values):
+            return {"appended": 0, "gap_filled": 0, "skipped": skipped}
+        if gap:
+            values = np.concatenate([np.full(gap, stored["value"][-1]), values])
+
+        prior_sum = float(stored["prefix_sum"][-1]) if meta["length"] else 0.0
+        new_columns = derive_columns(values, kind, band, np.array(stored["value"][-_CONTEXT:]), prior_sum)
+
+        directory.mkdir(parents=True, exist_ok=True)
+        for column, dtype in COLUMNS.items():
+            with open(directory / f"{column}.bin", "ab") as handle:
+                handle.write(np.ascontiguousarray(new_columns[column], dtype=dtype).tobytes())
+        # meta.json is replaced last, never rewritten in place: readers in other
+        # processes see the old or the new length, and never map past it
+        meta.update(length=meta["length"] + len(values), kind=kind, updated_at=datetime.now().isoformat())
+        handle, temporary = tempfile.mkstemp(dir=directory, prefix=".meta.", suffix=".json")
+        with os.fdopen(handle, "w") as stream:
+            stream.write(json.dumps(meta))
+        os.replace(temporary, meta_path)
+    return {"appended": len(values) - gap, "gap_filled": gap, "skipped": skipped}
+
+
+def load_indicator_file(
+    path: Union[str, Path],
+    root: Union[str, Path] = DEFAULT_ECONOMIC_STORE,
+    delimiter: str = ",",
+    encoding: str = "utf-8",
+) -> Dict[str, int]:
+    """
+    Ingest a long-format CSV with ``location``, ``series``, ``month`` and ``value`` columns.
+
+    Rows may come in any order; each series is sorted by month and appended
+    (already stored months are skipped, so a file can be reloaded as it grows).
+
+    Returns:
+        Dictionary with the number of series and of appended (including months
+        carried forward inside the file), gap-filled and skipped months
+    """
+    grouped: Dict[Tuple[str, str], Dict[int, float]] = {}
+    with open(path, newline="", encoding=encoding) as handle:
+        for row in csv.DictReader(handle, delimiter=delimiter):
+            if not row.get("value"):
+                continue
+            key = (row.get("location") or "national", row["series"])
+            grouped.setdefault(key, {})[month_index(row["month"])] = float(row["value"])
+
+    totals = {"series": len(grouped), "appended": 0, "gap_filled": 0, "skipped": 0}
+    for (location, name), observations in grouped.items():
+        months = np.array(sorted(observations))
+        observed = np.array([observations[month] for month in months])
+        # Months missing inside the file carry the previous value forward
+        offsets = np.arange(months[-1] - months[0] + 1)
+        series = observed[np.searchsorted(months - months[0], offsets, side="right") - 1]
+        counts = append_observations(location, name, month_label(int(months[0])), series, root)
+        for count_key, value in counts.items():
+            totals[count_key] += value
+    return totals
+
+
+@functools.lru_cache(maxsize=512)
+def synthetic_view(location: str, name: str, last_month: int) -> SeriesView:
+    """Stable synthetic history of a series ending at ``last_month``."""
+    _, kind, band, (start, center, volatility, bounds) = SERIES[name]
+    digest = hashlib.blake2b(f"{normalize_location(location)}|{name}".encode(), digest_size=8).digest()
+    rng = np.random.default_rng(int.from_bytes(digest, "big"))
+    shocks = rng.standard_normal(SYNTHETIC_HISTORY_MONTHS)
+    if kind == "index":
+        # Log random walk with drift, ending at the reference level
+        path = np.cumsum(center + volatility * shocks)
+        values = start * np.exp(path - path[-1])
+    else:
+        # Mean-reverting walk within the bounds
+        values = np.empty(SYNTHETIC_HISTORY_MONTHS)
+        level = start
+        for month, shock in enumerate(shocks):
+            level = float(np.clip(level + 0.1 * (center - level) + volatility * shock, *bounds))
+            values[month] = level
+    columns = derive_columns(values, kind, band)
+    for column in columns.values():
+        column.setflags(write=False)
+    return SeriesView(name, last_month - SYNTHETIC_HISTORY_MONTHS + 1, columns, "synthetic_estimate")
+
+
+def resolve_series(
+    location: str,
+    names: Iterable[str],
+    root: Union[str, Path] = DEFAULT_ECONOMIC_STORE,
+    current_month: Optional[int] = None,
+) -> Dict[str, SeriesView]:
+    """
+    Series for a location: stored for the location, else stored nationally, else synthetic.
+    """
+    current_month = current_month if current_month is not None else month_index(datetime.now())
+    views = {}
+    for name in names:
+        view = series_view(location, name, root)
+        if view is None and normalize_location(location) != "national":
+            view = series_view("national", name, root)
+        views[name] = view if view is not None else synthetic_view(normalize_location(location), name, current_month)
+    return views
@@ -0,0 +1,544 @@
+"""
+Vectorized financial math shared by the property valuation tools.
+
+Every function accepts scalars or NumPy arrays and broadcasts them against
+each other, so the same call prices a single loan or a whole portfolio.
+"""
+from typing import Dict, List, Union
+
+import numpy as np
+
+ArrayLike = Union[float, int, List[float], np.ndarray]
+
+
+def monthly_payment(
+    principal: ArrayLike,
+    annual_rate: ArrayLike,
+    term_years: ArrayLike,
+) -> np.ndarray:
+    """
+    Level monthly payment of fully amortizing loans.
+
+    Args:
+        principal: Loan amount(s)
+        annual_rate: Annual interest rate(s) (decimal)
+        term_years: Loan term(s) in years
+
+    Returns:
+        Array of monthly payments, broadcast over the inputs
+    """
+    principal = np.asarray(principal, dtype=float)
+    monthly_rate = np.asarray(annual_rate, dtype=float) / 12
+    num_payments = np.asarray(term_years, dtype=float) * 12
+
+    growth = (1 + monthly_rate) ** num_payments
+    amortizing = monthly_rate > 0
+    # Zero-rate loans are repaid in equal instalments
+    safe_denominator = np.where(amortizing, growth - 1, 1.0)
+    return np.where(
+        amortizing,
+        principal * monthly_rate * growth / safe_denominator,
+        principal / num_payments,
+    )
+
+
+def amortization_schedule(
+    principal: ArrayLike,
+    annual_rate: ArrayLike,
+    term_years: ArrayLike,
+    months: int = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Full amortization schedules for a batch of loans in one call.
+
+    Balances come from the closed form
+    B_k = P(1+r)^k - A((1+r)^k - 1)/r, so no month-by-month loop is needed.
+    Loans shorter than the longest term are zero-padded after their last
+    payment.
+
+    Args:
+        principal: Loan amount(s)
+        annual_rate: Annual interest rate(s) (decimal)
+        term_years: Loan term(s) in years
+        months: Number of schedule rows to return (defaults to the longest term)
+
+    Returns:
+        Dictionary with the per-loan ``monthly_payment``, ``total_payments``
+        and ``total_interest`` vectors, the ``month`` index and the
+        ``payment``, ``principal``, ``interest`` and ``balance`` columns as
+        (loans x months) matrices
+    """
+    principal, annual_rate, term_years = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(principal, dtype=float)),
+        np.atleast_1d(np.asarray(annual_rate, dtype=float)),
+        np.atleast_1d(np.asarray(term_years, dtype=float)),
+    )
+    monthly_rate = annual_rate / 12
+    num_payments = np.rint(term_years * 12).astype(np.int64)
+    payment = monthly_payment(principal, annual_rate, term_years)
+
+    if months is None:
+        months = int(num_payments.max()) if num_payments.size else 0
+    month = np.arange(1, months + 1)
+
+    rate = monthly_rate[:, None]
+    growth = (1 + rate) ** month
+    amortizing = rate > 0
+    safe_rate = np.where(amortizing, rate, 1.0)
+    balance = np.where(
+        amortizing,
+        principal[:, None] * growth - payment[:, None] * (growth - 1) / safe_rate,
+        principal[:, None] - payment[:, None] * month,
+    )
+    active = month <= num_payments[:, None]
+    # Closed-form rounding leaves a few cents of drift at the final payment
+    balance[month >= num_payments[:, None]] = 0.0
+    balance[~active] = 0.0
+
+    opening_balance = np.empty_like(balance)
+    opening_balance[:, 0] = principal
+    opening_balance[:, 1:] = balance[:, :-1]
+
+    interest = np.where(active, opening_balance * rate, 0.0)
+    payments = np.where(active, payment[:, None], 0.0)
+    principal_paid = payments - interest
+
+    total_payments = payment * num_payments
+    return {
+        "monthly_payment": payment,
+        "total_payments": total_payments,
+        "total_interest": total_payments - principal,
+        "month": month,
+        "payment": payments,
+        "principal": principal_paid,
+        "interest": interest,
+        "balance": balance,
+    }
+
+
+def loan_balance(
+    principal: ArrayLike,
+    annual_rate: ArrayLike,
+    term_years: ArrayLike,
+    months_elapsed: ArrayLike,
+) -> np.ndarray:
+    """
+    Outstanding balance of fully amortizing loans after a number of payments.
+
+    Args:
+        principal: Loan amount(s)
+        annual_rate: Annual interest rate(s) (decimal)
+        term_years: Loan term(s) in years
+        months_elapsed: Payments already made
+
+    Returns:
+        Array of remaining balances (zero once the loan is repaid)
+    """
+    principal = np.asarray(principal, dtype=float)
+    monthly_rate = np.asarray(annual_rate, dtype=float) / 12
+    months_elapsed = np.minimum(
+        np.asarray(months_elapsed, dtype=float),
+        np.asarray(term_years, dtype=float) * 12,
+    )
+    payment = monthly_payment(principal, annual_rate, term_years)
+
+    growth = (1 + monthly_rate) ** months_elapsed
+    amortizing = monthly_rate > 0
+    safe_rate = np.where(amortizing, monthly_rate, 1.0)
+    balance = np.where(
+        amortizing,
+        principal * growth - payment * (growth - 1) / safe_rate,
+        principal - payment * months_elapsed,
+    )
+    return np.maximum(balance, 0.0)
+
+
+def npv(rates: ArrayLike, cash_flows: ArrayLike) -> np.ndarray:
+    """
+    Net present value of one or many cash-flow series at one or many rates.
+
+    The first cash flow of each series is at t=0 and is not discounted
+    (same convention as numpy_financial.npv).
+
+    Args:
+        rates: Discount rate per period, scalar or vector of k rates
+        cash_flows: Series of shape (T,) or (m, T)
+
+    Returns:
+        NPVs of shape (m, k); the rate axis is dropped for a scalar rate and
+        the series axis for a single series
+    """
+    rates = np.asarray(rates, dtype=float)
+    cash_flows = np.asarray(cash_flows, dtype=float)
+    periods = np.arange(cash_flows.shape[-1])
+
+    discount = (1 + np.atleast_1d(rates)[:, None]) ** -periods
+    values = cash_flows @ discount.T
+    return values[..., 0] if rates.ndim == 0 else values
+
+
+def cash_flow_sign_changes(cash_flows: ArrayLike) -> np.ndarray:
+    """
+    Number of sign changes in each cash-flow series.
+
+    By Descartes' rule of signs this bounds the number of IRRs, so any count
+    above one means the series may have several internal rates of return.
+    """
+    cash_flows = np.asarray(cash_flows, dtype=float)
+    signs = np.sign(cash_flows)
+    # Zero flows do not break a run of equal signs
+    signs = np.where(signs == 0, np.nan, signs)
+    changes = np.zeros(signs.shape[:-1], dtype=int)
+    previous = np.full(signs.shape[:-1], np.nan)
+    for column in np.moveaxis(signs, -1, 0):
+        changes += (column * previous < 0).astype(int)
+        previous = np.where(np.isnan(column), previous, column)
+    return changes
+
+
+# Rates scanned for sign changes before the root is polished (-95% .. +1000%)
+_IRR_GRID = np.unique(np.concatenate([
+    np.linspace(-0.95, 0.5, 59),
+    np.geomspace(0.5, 10.0, 17),
+]))
+
+
+def irr(
+    cash_flows: ArrayLike,
+    guess: ArrayLike = 0.1,
+    tol: float = 1e-10,
+    max_iter: int = 100,
+) -> np.ndarray:
+    """
+    Internal rate of return for a matrix of cash-flow series at once.
+
+    Each series is first bracketed by scanning a rate grid for a sign change
+    of its NPV; when several brackets exist (multiple sign changes in the
+    flows) the one closest to ``guess`` is used. The root is then polished
+    with Newton steps on the analytic derivative, falling back to bisection
+    whenever a step leaves the bracket, so every series either converges or
+    is reported as NaN.
+
+    Args:
+        cash_flows: Series of shape (T,) or (m, T), first flow at t=0
+        guess: Initial rate, scalar or one per series
+        tol: Convergence tolerance on the rate
+        max_iter: Maximum number of Newton/bisection iterations
+
+    Returns:
+        IRR per series (NaN where no root exists in the grid range)
+    """
+    cash_flows = np.asarray(cash_flows, dtype=float)
+    single = cash_flows.ndim == 1
+    flows = np.atleast_2d(cash_flows)
+    num_series = flows.shape[0]
+    periods = np.arange(flows.shape[1])
+    guess = np.broadcast_to(np.asarray(guess, dtype=float), (num_series,))
+
+    # Bracket every series on the grid
+    grid_values = npv(_IRR_GRID, flows)
+    signs = np.sign(grid_values)
+    crossing = signs[:, :-1] * signs[:, 1:] <= 0
+    crossing &= ~((signs[:, :-1] == 0) & (signs[:, 1:] == 0))
+    midpoints = (_IRR_GRID[:-1] + _IRR_GRID[1:]) / 2
+    distance = np.where(crossing, np.abs(midpoints - guess[:, None]), np.inf)
+    bracket = np.argmin(distance, axis=1)
+    has_root = crossing.any(axis=1)
+
+    rows = np.arange(num_series)
+    low = _IRR_GRID[bracket]
+    high = _IRR_GRID[bracket + 1]
+    low_value = grid_values[rows, bracket]
+    rate = np.where((guess > low) & (guess < high), guess, (low + high) / 2)
+
+    active = has_root.copy()
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        idx = np.flatnonzero(active)
+        r = rate[idx]
+        discount = (1 + r[:, None]) ** -periods
+        value = np.sum(flows[idx] * discount, axis=1)
+        derivative = np.sum(-periods * flows[idx] * discount, axis=1) / (1 + r)
+
+        # Shrink the bracket around the root
+        same_side = np.sign(value) == np.sign(low_value[idx])
+        low[idx] = np.where(same_side, r, low[idx])
+        low_value[idx] = np.where(same_side, value, low_value[idx])
+        high[idx] = np.where(same_side, high[idx], r)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = r - value / derivative
+        inside = np.isfinite(newton) & (newton > low[idx]) & (newton < high[idx])
+        new_rate = np.where(inside, newton, (low[idx] + high[idx]) / 2)
+
+        done = (np.abs(new_rate - r) < tol * (1 + np.abs(r))) | (value == 0)
+        rate[idx] = np.where(value == 0, r, new_rate)
+        active[idx[done]] = False
+
+    result = np.where(has_root, rate, np.nan)
+    return result[0] if single else result
+
+
+def horizon_metrics(
+    initial_investment: float,
+    cash_flows: ArrayLike,
+    rates: ArrayLike = (0.05, 0.08, 0.10),
+    terminal_values: ArrayLike = None,
+) -> Dict[str, np.ndarray]:
+    """
+    NPV, IRR, ROI, cumulative cash flow and payback for every exit horizon.
+
+    Horizon h holds the investment for h years: the initial outlay, the
+    first h annual cash flows and, when given, the terminal value of selling
+    at the end of year h. NPVs for all horizons come from prefix sums of the
+    discounted flows, and the IRRs of all horizons are solved together in
+    one vectorized irr() call over the (horizons x periods) flow matrix.
+
+    Args:
+        initial_investment: Cash invested at t=0 (positive amount)
+        cash_flows: Annual cash flows for years 1..N
+        rates: Discount rates for the NPV columns
+        terminal_values: Exit proceeds if sold at the end of each year 1..N
+
+    Returns:
+        Dictionary of per-horizon arrays (row h-1 is horizon h): ``npv``
+        (N x rates), ``irr``, ``roi`` (percent), ``payback_period`` (years,
+        NaN when not reached) plus the ``cumulative_cash_flow`` from t=0
+    """
+    flows = np.concatenate([[-float(initial_investment)], np.asarray(cash_flows, dtype=float)])
+    num_years = len(flows) - 1
+    periods = np.arange(num_years + 1)
+    horizons = periods[1:]
+    exits = np.zeros(num_years) if terminal_values is None else np.asarray(terminal_values, dtype=float)
+
+    # NPV: prefix sums of discounted flows plus the discounted exit at each horizon
+    discount = (1 + np.asarray(rates, dtype=float)[:, None]) ** -periods
+    discounted_prefix = np.cumsum(flows * discount, axis=1)
+    npv_curve = (discounted_prefix[:, 1:] + exits * discount[:, 1:]).T
+
+    # ROI: prefix sums of the positive inflows
+    inflows = np.cumsum(np.maximum(flows[1:], 0)) + np.maximum(exits, 0)
+    roi = (inflows - initial_investment) / initial_investment * 100
+
+    # Payback: first year the cumulative cash flow turns positive
+    cumulative = np.cumsum(flows)
+    positive = np.flatnonzero(cumulative > 0)
+    payback = np.full(num_years, np.nan)
+    if positive.size:
+        payback[horizons >= positive[0]] = positive[0]
+
+    # IRR: all horizons in one vectorized solve; row h-1 holds the flows up to
+    # year h plus the exit, padded with zeros (which leave the NPV unchanged)
+    series = np.where(periods <= horizons[:, None], flows, 0.0)
+    series[horizons - 1, horizons] += exits
+    irr_curve = irr(series)
+
+    return {
+        "horizon": horizons,
+        "npv": npv_curve,
+        "irr": irr_curve,
+        "roi": roi,
+        "cumulative_cash_flow": cumulative,
+        "payback_period": payback,
+    }
+
+
+# additional_params keys read by each calculation type of financial_calculator
+CALCULATOR_PARAMETERS = {
+    "mortgage": [],
+    "roi": ["initial_investment", "annual_rental_income", "annual_expenses", "appreciation_rate"],
+    "cash_flow": [
+        "monthly_rental_income", "mortgage_payment", "monthly_property_taxes",
+        "monthly_insurance", "monthly_maintenance", "vacancy_rate",
+    ],
+    "npv": ["cash_flows", "annual_cash_flow", "appreciation_rate", "terminal_value"],
+    "irr": ["cash_flows", "annual_cash_flow", "appreciation_rate", "terminal_value"],
+}
+
+
+def calculator_defaults(
+    calculation_type: str,
+    principal: ArrayLike,
+    term_years: ArrayLike = 30,
+    **params: ArrayLike,
+) -> Dict[str, ArrayLike]:
+    """
+    Fill in the financial_calculator defaults for missing ``additional_params``.
+
+    Defaults are derived from the principal (and from other parameters when
+    they are given, e.g. expenses from rental income), so the result holds
+    every key of CALCULATOR_PARAMETERS for the calculation type.
+    """
+    principal = np.asarray(principal, dtype=float)
+    resolved = dict(params)
+
+    if calculation_type == "roi":
+        resolved.setdefault("initial_investment", principal * 0.2)
+        resolved.setdefault("annual_rental_income", principal * 0.08)
+        resolved.setdefault("annual_expenses", np.asarray(resolved["annual_rental_income"]) * 0.3)
+        resolved.setdefault("appreciation_rate", 0.03)
+    elif calculation_type == "cash_flow":
+        resolved.setdefault("monthly_rental_income", principal * 0.008)
+        resolved.setdefault("mortgage_payment", 0)
+        resolved.setdefault("monthly_property_taxes", principal * 0.01 / 12)
+        resolved.setdefault("monthly_insurance", principal * 0.003 / 12)
+        resolved.setdefault("monthly_maintenance", np.asarray(resolved["monthly_rental_income"]) * 0.1)
+        resolved.setdefault("vacancy_rate", 0.05)
+    elif calculation_type in ("npv", "irr"):
+        resolved.setdefault("cash_flows", None)
+        resolved.setdefault("annual_cash_flow", principal * 0.08 * 0.7)
+        resolved.setdefault("appreciation_rate", 0.03)
+        resolved.setdefault(
+            "terminal_value",
+            principal * (1 + np.asarray(resolved["appreciation_rate"], dtype=float)) ** np.asarray(term_years, dtype=float),
+        )
+    return resolved
+
+
+def calculator_cash_flows(
+    principal: ArrayLike,
+    term_years: ArrayLike,
+    cash_flows: ArrayLike = None,
+    **params: ArrayLike,
+) -> np.ndarray:
+    """
+    Annual cash-flow series used by the npv and irr calculation types.
+
+    An explicit ``cash_flows`` list is used as is. Otherwise each series is
+    the purchase at t=0, ``annual_cash_flow`` for ``term_years`` years and
+    the ``terminal_value`` added to the final year; series with shorter
+    terms are zero-padded.
+
+    Returns:
+        Matrix of shape (series x periods), one row per broadcast input
+    """
+    if cash_flows is not None:
+        return np.atleast_2d(np.asarray(cash_flows, dtype=float))
+
+    resolved = calculator_defaults("npv", principal, term_years, **params)
+    principal, term_years, annual_cash_flow, terminal_value = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(principal, dtype=float)),
+        np.atleast_1d(np.asarray(term_years, dtype=float)),
+        np.atleast_1d(np.asarray(resolved["annual_cash_flow"], dtype=float)),
+        np.atleast_1d(np.asarray(resolved["terminal_value"], dtype=float)),
+    )
+
+    years = np.rint(term_years).astype(np.int64)
+    periods = np.arange(years.max() + 1)
+    series = np.where(periods <= years[:, None], annual_cash_flow[:, None], 0.0)
+    series[:, 0] = -principal
+    series[np.arange(len(years)), years] += terminal_value
+    return series
+
+
+def calculator_metrics(
+    calculation_type: str,
+    principal: ArrayLike,
+    interest_rate: ArrayLike = 0.05,
+    term_years: ArrayLike = 30,
+    **params: ArrayLike,
+) -> Dict[str, np.ndarray]:
+    """
+    Vectorized headline results of financial_calculator for one calculation type.
+
+    Inputs are the calculator's arguments plus its ``additional_params``
+    keys (CALCULATOR_PARAMETERS); any of them may be an array, and all
+    broadcast against each other. Units match financial_calculator
+    (percentages where it reports them).
+
+    Returns:
+        Dictionary of result arrays for the calculation type
+    """
+    principal = np.asarray(principal, dtype=float)
+    interest_rate = np.asarray(interest_rate, dtype=float)
+    term_years = np.asarray(term_years, dtype=float)
+    params = calculator_defaults(calculation_type, principal, term_years, **params)
+
+    if calculation_type == "mortgage":
+        payment = monthly_payment(principal, interest_rate, term_years)
+        total_payments = payment * term_years * 12
+        return {
+            "monthly_payment": payment,
+            "total_payments": total_payments,
+            "total_interest": total_payments - principal,
+        }
+
+    if calculation_type == "roi":
+        initial_investment = np.asarray(params["initial_investment"], dtype=float)
+        appreciation_rate = np.asarray(params["appreciation_rate"], dtype=float)
+
+        # Calculate various ROI metrics
+        net_annual_income = np.asarray(params["annual_rental_income"], dtype=float) - params["annual_expenses"]
+        cash_on_cash_return = net_annual_income / initial_investment
+
+        # Calculate appreciation over term
+        future_value = principal * (1 + appreciation_rate) ** term_years
+        total_appreciation = future_value - principal
+
+        # Total return calculation
+        total_rental_income = net_annual_income * term_years
+        total_return = total_rental_income + total_appreciation
+        total_roi = total_return / initial_investment
+        with np.errstate(invalid="ignore"):
+            annualized_roi = (1 + total_roi) ** (1 / term_years) - 1
+        return {
+            "cash_on_cash_return": cash_on_cash_return * 100,
+            "annual_net_income": net_annual_income,
+            "total_appreciation": total_appreciation,
+            "total_return": total_return,
+            "total_roi_percentage": total_roi * 100,
+            "annualized_roi": annualized_roi * 100,
+            "future_property_value": future_value,
+        }
+
+    if calculation_type == "cash_flow":
+        rental_income = np.asarray(params["monthly_rental_income"], dtype=float)
+        vacancy_rate = np.asarray(params["vacancy_rate"], dtype=float)
+        expenses = {
+            name: np.asarray(params[key], dtype=float)
+            for name, key in (
+                ("mortgage_payment", "mortgage_payment"),
+                ("property_taxes", "monthly_property_taxes"),
+                ("insurance", "monthly_insurance"),
+                ("maintenance", "monthly_maintenance"),
+            )
+        }
+
+        # Calculate monthly cash flow
+        effective_rental_income = rental_income * (1 - vacancy_rate)
+        total_expenses = sum(expenses.values())
+        monthly_cash_flow = effective_rental_income - total_expenses
+        return {
+            "monthly_cash_flow": monthly_cash_flow,
+            "annual_cash_flow": monthly_cash_flow * 12,
+            "break_even_rent": total_expenses / (1 - vacancy_rate),
+            **expenses,
+        }
+
+    if calculation_type in ("npv", "irr"):
+        explicit = params["cash_flows"]
+        series_params = {
+            key: np.asarray(params[key], dtype=float)
+            for key in ("annual_cash_flow", "terminal_value")
+        }
+        shape = np.broadcast(principal, interest_rate, term_years, *series_params.values()).shape
+        count = int(np.prod(shape))
+        if explicit is not None:
+            explicit = np.asarray(explicit, dtype=float)
+            series = np.broadcast_to(explicit, (count, explicit.size))
+        else:
+            series = calculator_cash_flows(
+                np.broadcast_to(principal, shape).ravel(),
+                np.broadcast_to(term_years, shape).ravel(),
+                **{key: np.broadcast_to(value, shape).ravel() for key, value in series_params.items()},
+            )
+
+        if calculation_type == "npv":
+            rates = np.broadcast_to(interest_rate, shape).reshape(-1, 1)
+            periods = np.arange(series.shape[1])
+            values = np.sum(series * (1 + rates) ** -periods, axis=1)
+            return {"npv": values.reshape(shape)}
+        return {"irr": (np.atleast_1d(irr(series)) * 100).reshape(shape)}
+
+    raise ValueError(f"Unsupported calculation type: {calculation_type}")
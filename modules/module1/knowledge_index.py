@@ -0,0 +1,360 @@
+"""
+Persisted, hash-keyed section index over the agents' Markdown knowledge files.
+
+Each file is split on its heading hierarchy (``#`` to ``###``; deeper
+headings stay inside their section) and every section is stored once in a
+SQLite database, keyed by a BLAKE2b hash of its heading path and text,
+together with its chunks and, once computed, their embeddings. A file whose
+mtime and size match the index is not read at all; a changed file is
+re-split and only its new sections are chunked (and later embedded), so
+startup costs one stat per knowledge file however many files and sections
+there are. Syncs run in one write transaction each, so several processes can
+start on the same changed files. The chunks loaded into each vector database
+are recorded too, so a database catches up with sections indexed by any
+process and drops the ones that were removed.
+"""
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+DEFAULT_KNOWLEDGE_INDEX = Path("tmp") / "knowledge_index.db"
+
+# Headings up to this level start a section
+SECTION_LEVEL = 3
+# Sections longer than this are chunked on paragraph boundaries
+MAX_CHUNK_CHARS = 2_000
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS knowledge_files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    sections TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sections (
+    digest TEXT PRIMARY KEY,
+    heading TEXT NOT NULL,
+    level INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    section TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    embedding BLOB,
+    PRIMARY KEY (section, position)
+);
+CREATE TABLE IF NOT EXISTS loaded_chunks (
+    target TEXT NOT NULL,
+    section TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (target, section, position)
+);
+"""
+
+_cache: Dict[str, "KnowledgeIndex"] = {}
+_cache_lock = threading.Lock()
+
+
+def _digest(data: Union[str, bytes]) -> str:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def split_sections(text: str, max_level: int = SECTION_LEVEL) -> List[Dict[str, Any]]:
+    """
+    Split Markdown on its headings.
+
+    Args:
+        text: Markdown document
+        max_level: Deepest heading level starting a new section
+
+    Returns:
+        Sections in document order, each with its heading path (parent
+        headings joined by " > "), heading level and text (heading line
+        included); sections without any text besides the heading are skipped
+    """
+    sections = []
+    # Heading of each level above the current line (None where a level is skipped)
+    path: List[Optional[str]] = []
+    level, lines = 0, []
+
+    def close() -> None:
+        body = "\n".join(lines[1:] if level else lines).strip()
+        if body:
+            text = "\n".join(lines).strip()
+            heading = " > ".join(title for title in path if title)
+            sections.append({"heading": heading, "level": level, "text": text, "digest": _digest(heading + "\n" + text)})
+
+    for line in text.splitlines():
+        match = _HEADING.match(line)
+        if match and len(match.group(1)) <= max_level:
+            close()
+            level = len(match.group(1))
+            path = path[:level - 1] + [None] * (level - 1 - len(path)) + [match.group(2)]
+            lines = [line]
+        else:
+            lines.append(line)
+    close()
+    return sections
+
+
+def chunk_section(text: str, max_chars: int = MAX_CHUNK_CHARS) -> List[str]:
+    """Paragraph-aligned chunks of at most ``max_chars`` (longer paragraphs are kept whole)."""
+    chunks, current = [], ""
+    for paragraph in re.split(r"\n\s*\n", text):
+        if current and len(current) + len(paragraph) + 2 > max_chars:
+            chunks.append(current)
+            current = paragraph
+        else:
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class KnowledgeIndex:
+    """Section and chunk store for a set of knowledge files; see module docstring."""
+
+    def __init__(self, index_path: Union[str, Path] = DEFAULT_KNOWLEDGE_INDEX):
+        self.index_path = Path(index_path)
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(str(self.index_path), check_same_thread=False, timeout=30)
+        self.connection.executescript(_SCHEMA)
+        self.connection.commit()
+
+    def sync(self, paths: Iterable[Union[str, Path]]) -> Dict[str, Any]:
+        """
+        Bring the index up to date with the knowledge files.
+
+        Args:
+            paths: Markdown files to index; files indexed before but no longer
+                listed are dropped
+
+        Returns:
+            Dictionary with the files read (changed on disk), sections added
+            and removed, and the digests of the added sections
+        """
+        paths = [str(Path(path).resolve()) for path in paths]
+        report = {"files": len(paths), "files_read": 0, "sections_added": 0, "sections_removed": 0, "added": []}
+        with self._lock:
+            connection = self.connection
+            # Write lock up front: another process syncing the same files waits,
+            # then finds them indexed
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                self._sync(paths, report)
+                connection.commit()
+            except BaseException:
+                connection.rollback()
+                raise
+        report["sections_added"] = len(report["added"])
+        return report
+
+    def _sync(self, paths: List[str], report: Dict[str, Any]) -> None:
+        """Body of sync (caller holds the lock and the write transaction)."""
+        connection = self.connection
+        indexed = {
+            path: (mtime_ns, size, digest)
+            for path, mtime_ns, size, digest in connection.execute(
+                "SELECT path, mtime_ns, size, digest FROM knowledge_files"
+            )
+        }
+        for path in paths:
+            stat = Path(path).stat()
+            previous = indexed.get(path)
+            if previous is not None and previous[:2] == (stat.st_mtime_ns, stat.st_size):
+                continue
+            report["files_read"] += 1
+            data = Path(path).read_bytes()
+            digest = _digest(data)
+            if previous is not None and previous[2] == digest:
+                # Touched but identical: only the recorded stat changes
+                connection.execute(
+                    "UPDATE knowledge_files SET mtime_ns = ?, size = ? WHERE path = ?",
+                    (stat.st_mtime_ns, stat.st_size, path),
+                )
+                continue
+            sections = split_sections(data.decode("utf-8", errors="replace"))
+            for section in sections:
+                inserted = connection.execute(
+                    "INSERT OR IGNORE INTO sections (digest, heading, level) VALUES (?, ?, ?)",
+                    (section["digest"], section["heading"], section["level"]),
+                ).rowcount
+                if not inserted:
+                    continue
+                connection.executemany(
+                    "INSERT OR IGNORE INTO chunks (section, position, text) VALUES (?, ?, ?)",
+                    [(section["digest"], position, text) for position, text in enumerate(chunk_section(section["text"]))],
+                )
+                report["added"].append(section["digest"])
+            connection.execute(
+                "INSERT OR REPLACE INTO knowledge_files (path, mtime_ns, size, digest, sections) VALUES (?, ?, ?, ?, ?)",
+                (path, stat.st_mtime_ns, stat.st_size, digest, json.dumps([section["digest"] for section in sections])),
+            )
+        connection.executemany(
+            "DELETE FROM knowledge_files WHERE path = ?", [(path,) for path in indexed if path not in paths]
+        )
+        if report["files_read"] or len(indexed) > len(set(indexed) & set(paths)):
+            report["sections_removed"] = self._drop_unreferenced()
+
+    def _drop_unreferenced(self) -> int:
+        """Delete sections no indexed file contains any more (caller holds the lock)."""
+        referenced = set()
+        for (sections,) in self.connection.execute("SELECT sections FROM knowledge_files"):
+            referenced.update(json.loads(sections))
+        stale = [
+            (digest,) for (digest,) in self.connection.execute("SELECT digest FROM sections")
+            if digest not in referenced
+        ]
+        self.connection.executemany("DELETE FROM chunks WHERE section = ?", stale)
+        self.connection.executemany("DELETE FROM sections WHERE digest = ?", stale)
+        return len(stale)
+
+    def chunks(self, sections: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Indexed chunks in file and document order, read from the index only.
+
+        Args:
+            sections: Restrict to these section digests (e.g. sync()["added"])
+
+        Returns:
+            One dictionary per chunk with its text, source file, heading path,
+            section digest and position in the section
+        """
+        wanted = set(sections) if sections is not None else None
+        with self._lock:
+            files = self.connection.execute("SELECT path, sections FROM knowledge_files ORDER BY path").fetchall()
+            rows = {
+                (section, position): (heading, text)
+                for section, position, heading, text in self.connection.execute(
+                    "SELECT c.section, c.position, s.heading, c.text FROM chunks c JOIN sections s ON s.digest = c.section"
+                )
+            }
+        by_section: Dict[str, List[int]] = {}
+        for section, position in rows:
+            by_section.setdefault(section, []).append(position)
+        chunks = []
+        for path, sections_json in files:
+            for section in json.loads(sections_json):
+                if wanted is not None and section not in wanted:
+                    continue
+                for position in sorted(by_section.get(section, [])):
+                    heading, text = rows[(section, position)]
+                    chunks.append({
+                        "text": text,
+                        "source": path,
+                        "heading": heading,
+                        "section": section,
+                        "position": position
+                    })
+        return chunks
+
+    def embed_missing(self, embed: Callable[[List[str]], Sequence[Sequence[float]]], batch_size: int = 64) -> int:
+        """
+        Embed the chunks that have no embedding yet (new or changed sections).
+
+        Args:
+            embed: Function mapping a list of texts to their embedding vectors
+            batch_size: Texts per call to ``embed``
+
+        Returns:
+            Number of chunks embedded
+        """
+        with self._lock:
+            pending = self.connection.execute(
+                "SELECT section, position, text FROM chunks WHERE embedding IS NULL"
+            ).fetchall()
+        for first in range(0, len(pending), batch_size):
+            batch = pending[first:first + batch_size]
+            vectors = np.asarray(embed([text for _, _, text in batch]), dtype=np.float32)
+            with self._lock:
+                self.connection.executemany(
+                    "UPDATE chunks SET embedding = ? WHERE section = ? AND position = ?",
+                    [(vector.tobytes(), section, position) for (section, position, _), vector in zip(batch, vectors)],
+                )
+                self.connection.commit()
+        return len(pending)
+
+    def vector_changes(self, target: str) -> Dict[str, List[Any]]:
+        """
+        Chunks a vector database is missing and chunks it holds that were removed.
+
+        Based on what was recorded with mark_loaded, whichever process indexed
+        or loaded them.
+
+        Args:
+            target: Name of the vector database (e.g. its table name)
+
+        Returns:
+            Dictionary with the chunks to ``load`` (as returned by chunks()) and
+            the (section, position) pairs to ``remove``
+        """
+        with self._lock:
+            loaded = set(self.connection.execute(
+                "SELECT section, position FROM loaded_chunks WHERE target = ?", (target,)
+            ).fetchall())
+            current = set(self.connection.execute("SELECT section, position FROM chunks").fetchall())
+        return {
+            "load": [chunk for chunk in self.chunks() if (chunk["section"], chunk["position"]) not in loaded],
+            "remove": sorted(loaded - current),
+        }
+
+    def mark_loaded(
+        self,
+        target: str,
+        loaded: Iterable[Sequence[Any]] = (),
+        removed: Iterable[Sequence[Any]] = (),
+        reset: bool = False,
+    ) -> None:
+        """
+        Record chunks loaded into and removed from a vector database.
+
+        Args:
+            target: Name of the vector database
+            loaded: (section, position) pairs now in the database
+            removed: (section, position) pairs deleted from it
+            reset: Forget everything recorded for ``target`` first (database recreated)
+        """
+        with self._lock:
+            if reset:
+                self.connection.execute("DELETE FROM loaded_chunks WHERE target = ?", (target,))
+            self.connection.executemany(
+                "DELETE FROM loaded_chunks WHERE target = ? AND section = ? AND position = ?",
+                [(target, section, position) for section, position in removed],
+            )
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO loaded_chunks (target, section, position) VALUES (?, ?, ?)",
+                [(target, section, position) for section, position in loaded],
+            )
+            self.connection.commit()
+
+    def fingerprint(self) -> str:
+        """Digest of the indexed files' contents; changes whenever sync() changed the sections."""
+        with self._lock:
+            rows = self.connection.execute("SELECT path, digest FROM knowledge_files ORDER BY path").fetchall()
+        return _digest(json.dumps(rows))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            count = lambda table: self.connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            return {"files": count("knowledge_files"), "sections": count("sections"), "chunks": count("chunks")}
+
+
+def load_knowledge_index(index_path: Union[str, Path] = DEFAULT_KNOWLEDGE_INDEX) -> KnowledgeIndex:
+    """Shared index for ``index_path``, opened once per process."""
+    key = str(Path(index_path).resolve())
+    with _cache_lock:
+        if key not in _cache:
+            _cache[key] = KnowledgeIndex(index_path)
+        return _cache[key]
@@ -0,0 +1,228 @@
+"""
+Local heading-aware BM25 retrieval over the knowledge index.
+
+The chunks of knowledge_index are scored with BM25 (Okapi, k1 = 1.2,
+b = 0.75); the terms of each chunk's heading path count HEADING_WEIGHT times
+so "Cost Approach" ranks the section of that name first. The weights are
+stored as a float32 term x chunk matrix (.npy, memory mapped on load) next
+to the chunk texts, rebuilt only when the index fingerprint changes. Each
+build goes to its own directory named after the fingerprint and is never
+modified afterwards, so a process still mapping an older build keeps reading
+consistent files while another process rebuilds. A query batch is one
+matrix product over the rows of its terms, so retrieval takes microseconds
+and a single in-process index serves every agent of a team run; no network
+and no embedding model are involved.
+"""
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import unicodedata
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from knowledge_index import KnowledgeIndex
+
+try:
+    import fcntl
+except ImportError:  # Windows: builds stay atomic, concurrent ones just duplicate work
+    fcntl = None
+
+DEFAULT_SEARCH_DIR = Path("tmp") / "knowledge_search"
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Heading path terms count this many times in their chunk
+HEADING_WEIGHT = 3
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+_cache: Dict[str, "SectionSearch"] = {}
+_cache_lock = threading.Lock()
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase terms without diacritics (French and English text alike)."""
+    if not text.isascii():
+        text = "".join(
+            character for character in unicodedata.normalize("NFKD", text)
+            if not unicodedata.combining(character)
+        )
+    return [term for term in _TOKEN.findall(text.lower()) if len(term) > 1]
+
+
+@contextmanager
+def _build_lock(directory: Path) -> Iterator[None]:
+    """Exclusive lock on ``directory`` across processes (a no-op without fcntl)."""
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / ".lock", "w") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        yield
+
+
+def build_section_search(index: KnowledgeIndex, directory: Union[str, Path] = DEFAULT_SEARCH_DIR) -> Path:
+    """
+    Build and persist the BM25 matrix of the indexed chunks.
+
+    The build is written to a temporary directory renamed to
+    ``directory/<fingerprint>`` once complete; builds of other fingerprints
+    are then removed (files still mapped by other processes stay readable
+    until those unmap them).
+
+    Args:
+        index: Synced knowledge index
+        directory: Directory receiving one subdirectory (weights.npy and
+            meta.json) per build
+
+    Returns:
+        Directory of the build
+    """
+    directory = Path(directory)
+    with _build_lock(directory):
+        # Read under the lock: another process may have built this fingerprint meanwhile
+        fingerprint = index.fingerprint()
+        target = directory / fingerprint
+        if not (target / "meta.json").exists():
+            staging = Path(tempfile.mkdtemp(prefix=f".{fingerprint}.", dir=directory))
+            _write_section_search(index, fingerprint, staging)
+            try:
+                os.replace(staging, target)
+            except OSError:
+                # Built concurrently by a process without the lock
+                shutil.rmtree(staging, ignore_errors=True)
+        for stale in directory.iterdir():
+            if stale.is_dir() and stale != target:
+                shutil.rmtree(stale, ignore_errors=True)
+    return target
+
+
+def _write_section_search(index: KnowledgeIndex, fingerprint: str, directory: Path) -> None:
+    """Compute the BM25 matrix and write weights.npy and meta.json to ``directory``."""
+    chunks = index.chunks()
+    vocabulary: Dict[str, int] = {}
+    counts = []
+    for chunk in chunks:
+        terms = tokenize(chunk["text"]) + tokenize(chunk["heading"]) * HEADING_WEIGHT
+        ids = np.array([vocabulary.setdefault(term, len(vocabulary)) for term in terms], dtype=np.int64)
+        counts.append(ids)
+
+    frequencies = np.zeros((len(vocabulary), len(chunks)), dtype=np.float32)
+    for column, ids in enumerate(counts):
+        np.add.at(frequencies[:, column], ids, 1)
+    lengths = frequencies.sum(axis=0)
+    document_frequency = (frequencies > 0).sum(axis=1)
+    idf = np.log1p((len(chunks) - document_frequency + 0.5) / (document_frequency + 0.5))
+    normalization = BM25_K1 * (1 - BM25_B + BM25_B * lengths / max(float(lengths.mean()), 1.0)) if len(chunks) else 0
+    weights = (idf[:, None] * frequencies * (BM25_K1 + 1) / (frequencies + normalization)).astype(np.float32)
+
+    np.save(directory / "weights.npy", weights)
+    meta = {
+        "fingerprint": fingerprint,
+        "terms": list(vocabulary),
+        "chunks": [
+            {key: chunk[key] for key in ("text", "source", "heading", "section", "position")}
+            for chunk in chunks
+        ],
+    }
+    (directory / "meta.json").write_text(json.dumps(meta))
+
+
+class SectionSearch:
+    """Memory-mapped BM25 matrix of one build; see build_section_search."""
+
+    def __init__(self, directory: Union[str, Path]):
+        directory = Path(directory)
+        meta = json.loads((directory / "meta.json").read_text(encoding="utf-8"))
+        self.directory = directory
+        self.fingerprint: str = meta["fingerprint"]
+        self.chunks: List[Dict[str, Any]] = meta["chunks"]
+        self.terms = {term: row for row, term in enumerate(meta["terms"])}
+        self.weights = np.load(directory / "weights.npy", mmap_mode="r")
+
+    def scores(self, queries: Sequence[str]) -> np.ndarray:
+        """
+        BM25 score of every chunk for every query.
+
+        Only the matrix rows of terms present in the batch are read; the
+        batch is scored with one (queries x terms) @ (terms x chunks) product.
+
+        Returns:
+            Float32 matrix (queries x chunks)
+        """
+        token_rows = [[self.terms[term] for term in dict.fromkeys(tokenize(query)) if term in self.terms] for query in queries]
+        rows = sorted({row for query_rows in token_rows for row in query_rows})
+        if not rows or not self.chunks:
+            return np.zeros((len(queries), len(self.chunks)), dtype=np.float32)
+        position = {row: column for column, row in enumerate(rows)}
+        selector = np.zeros((len(queries), len(rows)), dtype=np.float32)
+        for query, query_rows in enumerate(token_rows):
+            selector[query, [position[row] for row in query_rows]] = 1.0
+        return selector @ self.weights[rows]
+
+    def search_batch(self, queries: Sequence[str], limit: int = 5) -> List[List[Dict[str, Any]]]:
+        """
+        Top ``limit`` chunks for each query.
+
+        Returns:
+            Per query, the matching chunks best first with their text, heading
+            path, source file and BM25 score
+        """
+        scores = self.scores(queries)
+        results = []
+        for row in scores:
+            limit_here = min(limit, len(row))
+            top = np.argpartition(-row, limit_here - 1)[:limit_here] if limit_here else np.array([], dtype=int)
+            top = top[np.argsort(-row[top], kind="stable")]
+            results.append([
+                {**self.chunks[column], "score": round(float(row[column]), 2)}
+                for column in top.tolist() if row[column] > 0
+            ])
+        return results
+
+    def search(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        return self.search_batch([query], limit)[0]
+
+    def retrieve(self, query: str, num_documents: Optional[int] = None, **kwargs: Any) -> List[Dict[str, Any]]:
+        """
+        agno retriever (``Agent(retriever=...)`` / ``Team(retriever=...)``).
+
+        agno passes the calling agent or team and other options as keywords;
+        they are ignored.
+
+        Returns:
+            Documents as dictionaries with name, content and meta_data
+        """
+        return [
+            {
+                "name": Path(result["source"]).stem,
+                "content": result["text"],
+                "meta_data": {"heading": result["heading"], "source": result["source"], "score": result["score"]},
+            }
+            for result in self.search(query, num_documents or 5)
+        ]
+
+
+def load_section_search(index: KnowledgeIndex, directory: Union[str, Path] = DEFAULT_SEARCH_DIR) -> SectionSearch:
+    """
+    Shared search for ``directory``, rebuilt when the index fingerprint changed.
+
+    Processes with an unchanged knowledge index only memory map the
+    persisted build of its fingerprint.
+    """
+    fingerprint = index.fingerprint()
+    key = str(Path(directory).resolve())
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is None or cached.fingerprint != fingerprint:
+            build = Path(directory) / fingerprint
+            if not (build / "meta.json").exists():
+                build = build_section_search(index, directory)
+            cached = SectionSearch(build)
+            _cache[key] = cached
+        return cached
@@ -0,0 +1,276 @@
+"""
+Clause and term extraction behind legal_document_analyzer.
+
+Documents are streamed line by line. Every clause type has English and
+French patterns; all of them are compiled into one alternation with a
+named group per type, so each line is scanned once whatever the number of
+types (matching runs on lowercase, accent-free text). Files are decoded
+as UTF-8, falling back to Windows-1252 for legacy exports. Directories are
+analyzed in parallel across a process pool.
+"""
+import codecs
+import os
+import re
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+# Clause types: (category, importance, label, patterns on folded text)
+CLAUSE_TYPES = {
+    # Key terms
+    "parties": ("terms", "High", "Parties to the agreement", [
+        r"buyer and seller", r"landlord and tenant", r"lessor", r"lessee", r"grantor", r"grantee",
+        r"identite des parties", r"acquereur", r"vendeur", r"bailleur", r"locataire",
+    ]),
+    "property_description": ("terms", "High", "Property description and boundaries", [
+        r"legal description", r"property description", r"boundar(?:y|ies)", r"lot size", r"square footage",
+        r"description du bien", r"limites de la propriete", r"cadastre", r"superficie",
+    ]),
+    "purchase_price": ("terms", "High", "Purchase price", [
+        r"purchase price", r"sale price", r"sales price", r"asking price", r"prix de vente", r"prix d'achat",
+    ]),
+    "payment_terms": ("terms", "High", "Payment terms", [
+        r"payment terms?", r"down payment", r"earnest money", r"installments?", r"financing",
+        r"modalites de paiement", r"acompte", r"versements?",
+    ]),
+    "closing": ("terms", "High", "Closing date and conditions", [
+        r"closing (?:date|conditions?|costs?)", r"settlement date", r"date de signature", r"acte definitif",
+    ]),
+    "contingency": ("terms", "High", "Contingencies and inspection periods", [
+        r"contingenc(?:y|ies)", r"inspection period", r"conditions? suspensives?", r"clauses? suspensives?",
+    ]),
+    "title_transfer": ("terms", "High", "Title and ownership transfer", [
+        r"title (?:search|insurance|transfer|report)", r"warranty deed", r"transfer of ownership",
+        r"titre de propriete", r"titre foncier", r"conservation fonciere",
+    ]),
+    "rent": ("terms", "High", "Rent amount and payment schedule", [
+        r"monthly rent", r"rent (?:amount|payment|due)", r"rental income", r"loyers?",
+    ]),
+    "lease_term": ("terms", "High", "Lease term and renewal options", [
+        r"lease term", r"renewal options?", r"term of (?:the )?lease", r"duree (?:minimale|du bail)", r"contrat de location",
+    ]),
+    "security_deposit": ("terms", "Medium", "Security deposit", [
+        r"security deposit", r"depot de garantie",
+    ]),
+    "maintenance": ("terms", "Medium", "Maintenance responsibilities", [
+        r"maintenance", r"repairs?", r"entretien", r"reparations?", r"etat des lieux",
+    ]),
+    "easement": ("terms", "Medium", "Easements and restrictions", [
+        r"easements?", r"right of way", r"restrictive covenants?", r"servitudes?",
+    ]),
+    # Compliance requirements
+    "zoning": ("compliance", "High", "Zoning and land use", [
+        r"zoning", r"land use", r"zonage", r"plan d'amenagement", r"usage des sols", r"coefficients? d'occupation",
+    ]),
+    "building_permit": ("compliance", "High", "Building permits and occupancy", [
+        r"building permits?", r"certificate of occupancy", r"permis de construire", r"permis d'habiter",
+    ]),
+    "disclosure": ("compliance", "High", "Disclosure requirements", [
+        r"disclosures?", r"lead[- ]based paint", r"seller'?s disclosure", r"mentions obligatoires",
+    ]),
+    "fire_safety": ("compliance", "High", "Fire safety", [
+        r"fire (?:safety|code|exits?)", r"smoke detectors?", r"securite incendie", r"nm 10\.1\.008",
+    ]),
+    "accessibility": ("compliance", "Medium", "Accessibility", [
+        r"\bada\b", r"accessibility", r"accessibilite", r"mobilite reduite",
+    ]),
+    "taxes": ("compliance", "Medium", "Transfer and property taxes", [
+        r"transfer tax", r"property tax(?:es)?", r"droits? de mutation", r"droits? d'enregistrement",
+        r"taxe (?:communale|professionnelle|d'habitation)", r"impot sur le revenu", r"revenus? fonciers?",
+    ]),
+    "registration": ("compliance", "Medium", "Recording and registration", [
+        r"recording", r"recorded", r"notar(?:y|ized)", r"enregistrement", r"acte notarie", r"notaires?",
+    ]),
+    "fair_housing": ("compliance", "Medium", "Fair housing", [
+        r"fair housing", r"discriminat(?:e|ion)",
+    ]),
+    "environmental": ("compliance", "Medium", "Environmental compliance", [
+        r"environmental", r"asbestos", r"wetlands?", r"amiante", r"environnement(?:al|ale)?",
+    ]),
+    # Risk factors
+    "default_remedies": ("risks", "High", "Default and remedies clauses", [
+        r"default", r"breach", r"liquidated damages", r"remedies", r"penalt(?:y|ies)",
+        r"defaut de", r"sanctions?", r"penalites?",
+    ]),
+    "litigation": ("risks", "High", "Disputes and litigation", [
+        r"litigation", r"disputes?", r"lawsuits?", r"litiges?", r"contentieux",
+    ]),
+    "invalid_permit": ("risks", "High", "Unpermitted or illegal construction", [
+        r"illegal construction", r"unpermitted", r"demolition", r"construction illegale", r"permis .{0,30}invalide",
+    ]),
+    "termination": ("risks", "Medium", "Termination and eviction", [
+        r"terminat(?:e|ion)", r"evictions?", r"resiliation", r"expulsion",
+    ]),
+    "liens": ("risks", "Medium", "Liens and encumbrances", [
+        r"liens?", r"encumbrances?", r"hypotheques?", r"nantissement",
+    ]),
+    "indemnification": ("risks", "Medium", "Indemnification", [
+        r"indemnif(?:y|ication)", r"hold harmless", r"indemnisation",
+    ]),
+    # Obligations
+    "obligation": ("obligations", "Medium", "Obligations of the parties", [
+        r"\bshall\b", r"\bmust\b", r"required to", r"obligatoires?", r"obligations?", r"\bdoit\b", r"\bdoivent\b",
+    ]),
+}
+
+# Clause types a document of each type is expected to address
+REQUIRED_CLAUSES = {
+    "contract": ["parties", "property_description", "purchase_price", "payment_terms", "closing", "contingency", "title_transfer"],
+    "deed": ["parties", "property_description", "title_transfer", "easement", "registration"],
+    "lease": ["parties", "rent", "lease_term", "security_deposit", "maintenance"],
+    "permit": ["building_permit", "zoning", "fire_safety", "accessibility"],
+    "report": ["zoning", "building_permit", "taxes", "title_transfer", "registration"],
+}
+
+# Contribution of each detected risk type to the risk score
+RISK_WEIGHTS = {"High": 0.25, "Medium": 0.12}
+
+# Extensions analyzed in directory mode
+DOCUMENT_SUFFIXES = (".txt", ".md")
+
+# Occurrences kept per clause type
+MAX_EXAMPLES = 3
+SNIPPET_LENGTH = 240
+
+# One word-boundary check up front lets positions inside words fail before any alternative is tried
+_CLAUSE_PATTERN = re.compile(
+    r"\b(?:" + "|".join(f"(?P<{name}>{'|'.join(patterns)})" for name, (_, _, _, patterns) in CLAUSE_TYPES.items()) + ")"
+)
+_APOSTROPHES = str.maketrans({"’": "'", "‘": "'", "´": "'"})
+
+
+def fold(text: str) -> str:
+    """Lowercase, accent-free text with straight apostrophes (matching form)."""
+    if text.isascii():
+        return text.lower()
+    text = unicodedata.normalize("NFKD", text.translate(_APOSTROPHES))
+    return "".join(character for character in text if not unicodedata.combining(character)).lower()
+
+
+def detect_encoding(path: Union[str, Path], chunk_size: int = 1 << 20) -> str:
+    """``utf-8`` when the whole file decodes as UTF-8, ``cp1252`` otherwise."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        with open(path, "rb") as handle:
+            while chunk := handle.read(chunk_size):
+                decoder.decode(chunk)
+            decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        return "cp1252"
+    return "utf-8"
+
+
+def _is_heading(line: str) -> bool:
+    stripped = line.strip()
+    return stripped.startswith("#") or (
+        0 < len(stripped) <= 80 and (stripped.endswith(":") or (stripped.isupper() and any(c.isalpha() for c in stripped)))
+        and not stripped.startswith(("-", "*", "|"))
+    )
+
+
+def analyze_document(
+    path: Union[str, Path],
+    document_type: str = "contract",
+    encoding: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Stream one document and collect clause occurrences and scores.
+
+    Args:
+        path: Text or Markdown document
+        document_type: Type of document (contract, deed, lease, permit, report)
+        encoding: Text encoding (detected when None)
+
+    Returns:
+        Dictionary with per clause type occurrence counts and examples (line,
+        section, snippet), missing required clauses, and the risk and
+        compliance scores
+    """
+    path = Path(path)
+    encoding = encoding or detect_encoding(path)
+    occurrences: Dict[str, Dict[str, Any]] = {}
+    section = None
+    lines = 0
+    with open(path, encoding=encoding, errors="replace") as handle:
+        for lines, line in enumerate(handle, start=1):
+            if _is_heading(line):
+                section = line.strip().lstrip("#").strip().rstrip(":")
+            folded = fold(line)
+            for match in _CLAUSE_PATTERN.finditer(folded):
+                entry = occurrences.setdefault(match.lastgroup, {"count": 0, "examples": []})
+                entry["count"] += 1
+                if len(entry["examples"]) < MAX_EXAMPLES and (
+                    not entry["examples"] or entry["examples"][-1]["line"] != lines
+                ):
+                    entry["examples"].append({
+                        "line": lines,
+                        "section": section,
+                        "text": " ".join(line.split())[:SNIPPET_LENGTH]
+                    })
+
+    required = REQUIRED_CLAUSES.get(document_type, REQUIRED_CLAUSES["contract"])
+    missing = [name for name in required if name not in occurrences]
+    risks = [name for name in occurrences if CLAUSE_TYPES[name][0] == "risks"]
+
+    no_risk = 1.0
+    for name in risks:
+        no_risk *= 1 - RISK_WEIGHTS[CLAUSE_TYPES[name][1]]
+    # Each missing required clause is an additional gap in the document
+    risk_score = min(1 - no_risk + 0.05 * len(missing), 1.0)
+    compliance_score = 1 - len(missing) / len(required)
+
+    return {
+        "document_path": str(path),
+        "encoding": encoding,
+        "lines": lines,
+        "occurrences": occurrences,
+        "required_clauses": required,
+        "missing_clauses": missing,
+        "risk_types": risks,
+        "risk_score": risk_score,
+        "compliance_score": compliance_score
+    }
+
+
+def _analyze_safely(path: str, document_type: str) -> Dict[str, Any]:
+    try:
+        return analyze_document(path, document_type)
+    except (OSError, ValueError) as error:
+        return {"document_path": path, "error": str(error)}
+
+
+def analyze_documents(
+    paths: Sequence[Union[str, Path]],
+    document_type: str = "contract",
+    max_workers: Optional[int] = None,
+    parallel_threshold: int = 8,
+) -> List[Dict[str, Any]]:
+    """
+    Analyze many documents, across a process pool when there are enough of them.
+
+    Args:
+        paths: Documents to analyze
+        document_type: Type of the documents
+        max_workers: Worker processes (defaults to the CPU count)
+        parallel_threshold: Below this many documents the pool start-up costs
+            more than it saves and documents are analyzed in this process
+
+    Returns:
+        One analyze_document result per path, in order (``error`` set when a
+        document could not be read)
+    """
+    paths = [str(path) for path in paths]
+    workers = min(max_workers or os.cpu_count() or 1, len(paths))
+    if workers <= 1 or len(paths) < parallel_threshold:
+        return [_analyze_safely(path, document_type) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunk = max(1, len(paths) // (workers * 4))
+        return list(executor.map(_analyze_safely, paths, [document_type] * len(paths), chunksize=chunk))
+
+
+def list_documents(directory: Union[str, Path], suffixes: Sequence[str] = DOCUMENT_SUFFIXES) -> List[Path]:
+    """Documents under a directory (recursive), sorted by path."""
+    return sorted(
+        path for path in Path(directory).rglob("*") if path.is_file() and path.suffix.lower() in suffixes
+    )
@@ -1,170 +1,425 @@
-from agno.knowledge.markdown import MarkdownKnowledgeBase
-from agno.agent import Agent
-from agno.team.team import Team
-from agno.models.mistral import MistralChat
-from agno.tools.file import FileTools
-from agno.tools.googlesearch import GoogleSearchTools
-from agno.tools.calculator import CalculatorTools
-from agno.tools.python import PythonTools
-from agno.storage.sqlite import SqliteStorage
-from agno.memory.v2.db.sqlite import SqliteMemoryDb
-from agno.memory.v2.memory import Memory
-from dotenv import load_dotenv
+"""
+Property Valuation module: agents and team built lazily as process-wide singletons.
+
+Importing this module only loads the environment. The knowledge base, the
+shared storage and memory, each agent and the team are built on first use
+(get_agent / get_team, or attribute access such as
+``module1.PropertyValuationTeam``) and then reused for the life of the
+process, across Streamlit reruns and sessions. agno, the model clients and
+the tool modules (numpy and friends) are imported inside the factories, so
+the import itself stays cheap.
+"""
+import functools
 import os
+import threading
+import time
 from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
 
-# -------------------------------
-# Import custom tools (au même niveau que module1.py)
-# -------------------------------
-from tools import (
-    legal_document_analyzer,
-    financial_calculator,
-)
-from additional_tools import (
-    risk_assessment_engine,
-    demographic_analyzer,
-    regulatory_compliance_checker,
-    investment_analyzer,
-    neighborhood_profiler,
-    economic_indicator_tracker
-)
+from dotenv import load_dotenv
 
 load_dotenv()
 
+DOCUMENTS_DIR = Path(os.path.join(os.path.dirname(__file__), "documents"))
+KNOWLEDGE_DIR = Path(os.path.join(os.path.dirname(__file__), "knowledge"))
+DB_FILE = "tmp/property_valuation.db"
+
+# Factories call each other (the team builds its agents), hence re-entrant
+_build_lock = threading.RLock()
+
+
+def _singleton(factory: Callable[[], Any]) -> Callable[[], Any]:
+    """Build on the first call, then return the same object for the life of the process."""
+    cached = functools.lru_cache(maxsize=None)(factory)
+
+    @functools.wraps(factory)
+    def get() -> Any:
+        with _build_lock:
+            return cached()
+
+    get.cache_clear = cached.cache_clear
+    return get
+
+
+def _model(model_id: str = "mistral-medium-latest"):
+    from agno.models.mistral import MistralChat
+    return MistralChat(id=model_id, api_key=os.getenv("MISTRAL_API_KEY"))
+
+
+def _document_tools():
+    from tools import DedupFileTools
+    return DedupFileTools(base_dir=DOCUMENTS_DIR, save_files=True, read_files=True, search_files=True)
+
+
 # -------------------------------
 # Knowledge Base (SQLite only)
 # -------------------------------
-knowledge_base = None
-try:
-    knowledge_base = MarkdownKnowledgeBase(
-        path=os.path.join(
-            os.path.dirname(__file__),
-            "knowledge",
-            "Property_Valuation_Knowledge.md",
-        ),
-    )
-    knowledge_base.load(recreate=False)
-    print("✅ Knowledge base loaded with SQLite")
-except Exception as e:
-    print(f"⚠️ Warning: Could not load knowledge base: {e}")
-    knowledge_base = None
+@_singleton
+def get_knowledge_index():
+    """Persisted section index of every knowledge file, synced once per process, with the sync report."""
+    from knowledge_index import load_knowledge_index
+    index = load_knowledge_index()
+    return index, index.sync(sorted(KNOWLEDGE_DIR.glob("*.md")))
+
+
+@_singleton
+def get_section_search():
+    """Local BM25 section search shared by every agent and the team."""
+    from knowledge_search import load_section_search
+    return load_section_search(get_knowledge_index()[0])
+
+
+def retrieve_knowledge(query: str, num_documents: Optional[int] = None, **kwargs: Any) -> List[Dict[str, Any]]:
+    """agno retriever for agents and team: top knowledge sections from the shared local index."""
+    return get_section_search().retrieve(query, num_documents)
+
+
+@_singleton
+def get_knowledge_base():
+    """
+    Markdown knowledge base over the knowledge files, set up once; None when it cannot be.
+
+    Sections live in the persisted hash-keyed index (knowledge_index): an
+    unchanged file is only stat'ed. The index records which chunks the vector
+    database holds, so only chunks it is missing are sent to it (and its
+    embedder), whichever process indexed them, and chunks of removed
+    sections are deleted from it.
+    """
+    from agno.knowledge.markdown import MarkdownKnowledgeBase
+    try:
+        index, changes = get_knowledge_index()
+        knowledge_base = MarkdownKnowledgeBase(path=KNOWLEDGE_DIR)
+        vector_db = knowledge_base.vector_db
+        if vector_db is not None:
+            target = str(getattr(vector_db, "table_name", None) or getattr(vector_db, "collection", None) or "default")
+            if not vector_db.exists():
+                index.mark_loaded(target, reset=True)
+            pending = index.vector_changes(target)
+            removed = pending["remove"]
+            if removed:
+                delete_by_id = getattr(vector_db, "delete_by_id", None)
+                if delete_by_id is not None:
+                    for section, position in removed:
+                        delete_by_id(f"{section}:{position}")
+                else:
+                    # No per-document delete: rebuild the collection from the index
+                    vector_db.delete()
+                    index.mark_loaded(target, reset=True)
+                    pending, removed = index.vector_changes(target), []
+            if pending["load"]:
+                from agno.document import Document
+                knowledge_base.load_documents([
+                    Document(
+                        id=f"{chunk['section']}:{chunk['position']}",
+                        name=Path(chunk["source"]).stem,
+                        content=chunk["text"],
+                        meta_data={"heading": chunk["heading"], "source": chunk["source"]},
+                    )
+                    for chunk in pending["load"]
+                ], upsert=True)
+            index.mark_loaded(
+                target, [(chunk["section"], chunk["position"]) for chunk in pending["load"]], removed
+            )
+        print(f"✅ Knowledge base ready ({changes['files_read']} file(s) re-read, {changes['sections_added']} section(s) indexed)")
+        return knowledge_base
+    except Exception as e:
+        print(f"⚠️ Warning: Could not load knowledge base: {e}")
+        return None
+
 
 # -------------------------------
 # Shared storage and memory
 # -------------------------------
-storage = SqliteStorage(
-    table_name="property_valuation_sessions",
-    db_file="tmp/property_valuation.db"
-)
-memory = Memory(
-    model=MistralChat(id="mistral-large-latest"),
-    db=SqliteMemoryDb(
-        table_name="property_valuation_records",
-        db_file="tmp/property_valuation.db"
-    ),
-    delete_memories=False,
-    clear_memories=False,
-)
+@_singleton
+def get_storage():
+    from agno.storage.sqlite import SqliteStorage
+    return SqliteStorage(table_name="property_valuation_sessions", db_file=DB_FILE)
+
+
+@_singleton
+def get_memory():
+    from agno.memory.v2.db.sqlite import SqliteMemoryDb
+    from agno.memory.v2.memory import Memory
+    from agno.models.mistral import MistralChat
+    return Memory(
+        model=MistralChat(id="mistral-large-latest"),
+        db=SqliteMemoryDb(table_name="property_valuation_records", db_file=DB_FILE),
+        delete_memories=False,
+        clear_memories=False,
+    )
+
 
 # -------------------------------
 # Agents definitions
 # -------------------------------
-FinancialAnalystAgent = Agent(
-    name="Financial Analyst",
-    agent_id="FinancialAnalystAgent",
-    model=MistralChat(id="mistral-medium-latest", api_key=os.getenv("MISTRAL_API_KEY")),
-    tools=[
-        FileTools(base_dir=Path(os.path.join(os.path.dirname(__file__), "documents")),
-                  save_files=True, read_files=True, search_files=True),
+def _financial_analyst_tools() -> List[Any]:
+    from agno.tools.calculator import CalculatorTools
+    from agno.tools.googlesearch import GoogleSearchTools
+    from agno.tools.python import PythonTools
+    from additional_tools import economic_indicator_tracker, investment_analyzer
+    from tools import financial_calculator
+    return [
+        _document_tools(),
         GoogleSearchTools(),
         CalculatorTools(),
         PythonTools(),
         financial_calculator,
         investment_analyzer,
         economic_indicator_tracker
-    ],
-    description="An AI agent specialized in financial analysis and investment evaluation for real estate properties.",
-    instructions="You are FinancialAnalystAgent. Provide ROI, NPV, IRR, cash flow projections, and investment recommendations.",
-    markdown=True,
-    memory=memory,
-    show_tool_calls=True,
-    knowledge=knowledge_base
-)
-
-LegalComplianceAgent = Agent(
-    name="Legal Compliance Specialist",
-    agent_id="LegalComplianceAgent",
-    model=MistralChat(id="mistral-medium-latest", api_key=os.getenv("MISTRAL_API_KEY")),
-    tools=[
-        FileTools(base_dir=Path(os.path.join(os.path.dirname(__file__), "documents")),
-                  save_files=True, read_files=True, search_files=True),
+    ]
+
+
+def _legal_compliance_tools() -> List[Any]:
+    from agno.tools.googlesearch import GoogleSearchTools
+    from additional_tools import regulatory_compliance_checker
+    from tools import legal_document_analyzer
+    return [
+        _document_tools(),
         GoogleSearchTools(),
         legal_document_analyzer,
         regulatory_compliance_checker
-    ],
-    description="An AI agent specialized in legal compliance, zoning laws, building codes, and risk assessment.",
-    instructions="You are LegalComplianceAgent. Review legal docs, identify risks, and ensure regulatory compliance.",
-    markdown=True,
-    memory=memory,
-    show_tool_calls=True,
-    knowledge=knowledge_base
-)
-
-RiskAssessmentAgent = Agent(
-    name="Risk Assessment Specialist",
-    agent_id="RiskAssessmentAgent",
-    model=MistralChat(id="mistral-medium-latest", api_key=os.getenv("MISTRAL_API_KEY")),
-    tools=[
-        FileTools(base_dir=Path(os.path.join(os.path.dirname(__file__), "documents")),
-                  save_files=True, read_files=True, search_files=True),
+    ]
+
+
+def _risk_assessment_tools() -> List[Any]:
+    from agno.tools.calculator import CalculatorTools
+    from agno.tools.googlesearch import GoogleSearchTools
+    from agno.tools.python import PythonTools
+    from additional_tools import economic_indicator_tracker, risk_assessment_engine
+    from tools import portfolio_risk_aggregator
+    return [
+        _document_tools(),
         GoogleSearchTools(),
         CalculatorTools(),
         PythonTools(),
         risk_assessment_engine,
+        portfolio_risk_aggregator,
         economic_indicator_tracker
-    ],
-    description="An AI agent specialized in market, environmental, and financial risk analysis.",
-    instructions="You are RiskAssessmentAgent. Evaluate risks, probabilities, and propose mitigation strategies.",
-    markdown=True,
-    memory=memory,
-    show_tool_calls=True,
-    knowledge=knowledge_base
-)
-
-NeighborhoodSpecialistAgent = Agent(
-    name="Neighborhood Specialist",
-    agent_id="NeighborhoodSpecialistAgent",
-    model=MistralChat(id="mistral-medium-latest", api_key=os.getenv("MISTRAL_API_KEY")),
-    tools=[
-        FileTools(base_dir=Path(os.path.join(os.path.dirname(__file__), "documents")),
-                  save_files=True, read_files=True, search_files=True),
+    ]
+
+
+def _neighborhood_specialist_tools() -> List[Any]:
+    from agno.tools.googlesearch import GoogleSearchTools
+    from additional_tools import demographic_analyzer, economic_indicator_tracker, neighborhood_profiler
+    return [
+        _document_tools(),
         GoogleSearchTools(),
         demographic_analyzer,
         neighborhood_profiler,
         economic_indicator_tracker
-    ],
-    description="An AI agent specialized in demographic analysis, community profiling, and amenities evaluation.",
-    instructions="You are NeighborhoodSpecialistAgent. Analyze demographics, infrastructure, and location-based value drivers.",
-    markdown=True,
-    memory=memory,
-    show_tool_calls=True,
-    knowledge=knowledge_base
-)
+    ]
+
+
+# agent_id -> name, tool list factory, description, instructions, and the
+# member's part of a full valuation in parallel mode (run_parallel_valuation)
+AGENT_SPECS: Dict[str, Dict[str, Any]] = {
+    "FinancialAnalystAgent": {
+        "name": "Financial Analyst",
+        "tools": _financial_analyst_tools,
+        "description": "An AI agent specialized in financial analysis and investment evaluation for real estate properties.",
+        "instructions": "You are FinancialAnalystAgent. Provide ROI, NPV, IRR, cash flow projections, and investment recommendations.",
+        "task": "Perform the financial analysis: ROI, NPV, IRR, cash flow projections and financing.",
+    },
+    "LegalComplianceAgent": {
+        "name": "Legal Compliance Specialist",
+        "tools": _legal_compliance_tools,
+        "description": "An AI agent specialized in legal compliance, zoning laws, building codes, and risk assessment.",
+        "instructions": "You are LegalComplianceAgent. Review legal docs, identify risks, and ensure regulatory compliance.",
+        "task": "Review legal compliance: zoning, building codes, permits and legal risks.",
+    },
+    "RiskAssessmentAgent": {
+        "name": "Risk Assessment Specialist",
+        "tools": _risk_assessment_tools,
+        "description": "An AI agent specialized in market, environmental, and financial risk analysis.",
+        "instructions": "You are RiskAssessmentAgent. Evaluate risks, probabilities, and propose mitigation strategies.",
+        "task": "Assess market, environmental and financial risks and propose mitigation strategies.",
+    },
+    "NeighborhoodSpecialistAgent": {
+        "name": "Neighborhood Specialist",
+        "tools": _neighborhood_specialist_tools,
+        "description": "An AI agent specialized in demographic analysis, community profiling, and amenities evaluation.",
+        "instructions": "You are NeighborhoodSpecialistAgent. Analyze demographics, infrastructure, and location-based value drivers.",
+        "task": "Analyze the neighborhood: demographics, amenities, infrastructure and development projects.",
+    },
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _build_agent(agent_id: str):
+    from agno.agent import Agent
+    spec = AGENT_SPECS[agent_id]
+    return Agent(
+        name=spec["name"],
+        agent_id=agent_id,
+        model=_model(),
+        tools=spec["tools"](),
+        description=spec["description"],
+        instructions=spec["instructions"],
+        markdown=True,
+        memory=get_memory(),
+        show_tool_calls=True,
+        knowledge=get_knowledge_base(),
+        retriever=retrieve_knowledge
+    )
+
+
+def get_agent(agent_id: str):
+    """Shared agent for ``agent_id`` (a key of AGENT_SPECS), built on first use."""
+    if agent_id not in AGENT_SPECS:
+        raise KeyError(f"Unknown agent: {agent_id}")
+    with _build_lock:
+        return _build_agent(agent_id)
+
 
 # -------------------------------
 # Property Valuation Team
 # -------------------------------
-PropertyValuationTeam = Team(
-    name="Property Valuation Team",
-    model=MistralChat(id="mistral-medium-latest", api_key=os.getenv("MISTRAL_API_KEY")),
-    members=[FinancialAnalystAgent, LegalComplianceAgent, RiskAssessmentAgent, NeighborhoodSpecialistAgent],
-    description="A comprehensive team of AI agents specialized in advanced property valuation.",
-    instructions="The Property Valuation Team collaborates across financial, legal, risk, and neighborhood expertise.",
-    markdown=True,
-    storage=storage,
-    show_tool_calls=True,
-    knowledge=knowledge_base
-)
+@_singleton
+def get_team():
+    from agno.team.team import Team
+    return Team(
+        name="Property Valuation Team",
+        model=_model(),
+        members=[get_agent(agent_id) for agent_id in AGENT_SPECS],
+        description="A comprehensive team of AI agents specialized in advanced property valuation.",
+        instructions="The Property Valuation Team collaborates across financial, legal, risk, and neighborhood expertise.",
+        markdown=True,
+        storage=get_storage(),
+        show_tool_calls=True,
+        knowledge=get_knowledge_base(),
+        retriever=retrieve_knowledge
+    )
+
+
+# -------------------------------
+# Parallel valuation (fan-out / merge)
+# -------------------------------
+MEMBER_TIMEOUT = 180.0
+
+# A member whose timed-out run is still going is not started again meanwhile
+_member_locks = {agent_id: threading.Lock() for agent_id in AGENT_SPECS}
+
+
+@_singleton
+def get_valuation_leader():
+    """Team leader for parallel mode: merges the members' reports, no tools."""
+    from agno.agent import Agent
+    return Agent(
+        name="Property Valuation Team Leader",
+        agent_id="PropertyValuationTeamLeader",
+        model=_model(),
+        description="The leader of the Property Valuation Team, merging the specialists' reports.",
+        instructions=(
+            "Merge the specialists' reports into one risk-adjusted final valuation report. "
+            "Reconcile conflicting figures, and state clearly which analyses are missing."
+        ),
+        markdown=True,
+    )
+
+
+def _run_member(agent_id: str, message: str, deadline: float) -> str:
+    lock = _member_locks[agent_id]
+    if not lock.acquire(timeout=max(deadline - time.monotonic(), 0)):
+        raise TimeoutError("still busy with a previous run")
+    try:
+        prompt = f"{AGENT_SPECS[agent_id]['task']}\n\nRequest:\n{message}"
+        return get_agent(agent_id).run(prompt).content
+    finally:
+        lock.release()
+
+
+def run_parallel_valuation(
+    message: str,
+    member_timeout: float = MEMBER_TIMEOUT,
+    members: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Run the team's members concurrently on their part of ``message`` and merge their reports.
+
+    Every member gets the same deadline, so the wall-clock time approaches
+    the slowest member instead of the sum; members that fail or miss the
+    deadline are reported and the leader merges the reports that arrived.
+
+    Args:
+        message: The valuation request
+        member_timeout: Seconds each member may take
+        members: Agent ids to dispatch (all of AGENT_SPECS by default)
+
+    Returns:
+        Dictionary with the merged report, per member status (ok, timeout,
+        error), seconds and report or error, and the total seconds
+    """
+    from concurrent.futures import ThreadPoolExecutor, wait
+
+    members = list(members or AGENT_SPECS)
+    for agent_id in members:
+        get_agent(agent_id)  # build outside the pool, under the build lock
+    started = time.monotonic()
+    deadline = started + member_timeout
+    executor = ThreadPoolExecutor(max_workers=len(members), thread_name_prefix="valuation")
+    futures = {executor.submit(_run_member, agent_id, message, deadline): agent_id for agent_id in members}
+    finished_at = {}
+    for future in futures:
+        future.add_done_callback(lambda future: finished_at.setdefault(future, time.monotonic()))
+    wait(futures, timeout=member_timeout)
+    # Late members keep their thread until they return; nobody waits for them
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    results = {}
+    for future, agent_id in futures.items():
+        if not future.done():
+            results[agent_id] = {"status": "timeout", "seconds": round(member_timeout, 2)}
+            continue
+        seconds = round(finished_at.get(future, time.monotonic()) - started, 2)
+        error = future.exception()
+        if error is not None:
+            status = "timeout" if isinstance(error, TimeoutError) else "error"
+            results[agent_id] = {"status": status, "seconds": seconds, "error": str(error)}
+        else:
+            results[agent_id] = {"status": "ok", "seconds": seconds, "report": future.result()}
+
+    sections = []
+    for agent_id, result in results.items():
+        name = AGENT_SPECS[agent_id]["name"]
+        if result["status"] == "ok":
+            sections.append(f"## {name}\n\n{result['report']}")
+        else:
+            sections.append(f"## {name}\n\n(Missing: {result['status']} - {result.get('error', 'no report in time')})")
+    reports = "\n\n".join(sections)
+    try:
+        report = get_valuation_leader().run(
+            f"Request:\n{message}\n\nSpecialists' reports:\n\n{reports}"
+        ).content
+    except Exception as e:
+        # Without the leader, the reports themselves are the answer
+        report = f"⚠️ Merge failed ({e}); specialists' reports follow.\n\n{reports}"
+    return {
+        "report": report,
+        "members": results,
+        "seconds": round(time.monotonic() - started, 2),
+    }
+
+
+# Former module-level objects, now built on first access (PEP 562)
+_LAZY_ATTRIBUTES: Dict[str, Callable[[], Any]] = {
+    "knowledge_base": get_knowledge_base,
+    "storage": get_storage,
+    "memory": get_memory,
+    "PropertyValuationTeam": get_team,
+    **{agent_id: functools.partial(get_agent, agent_id) for agent_id in AGENT_SPECS},
+}
+
+
+def __getattr__(name: str) -> Any:
+    factory = _LAZY_ATTRIBUTES.get(name)
+    if factory is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return factory()
+
+
+def __dir__() -> List[str]:
+    return sorted(list(globals()) + list(_LAZY_ATTRIBUTES))
+
 
 # -------------------------------
 # Helper: filter only user-friendly report
@@ -185,7 +440,7 @@ def test_financial_analysis():
     I can finance it with a 20% down payment. 
     Please calculate ROI, NPV, IRR, and cash flow projections."""
     print(f"\n--- Question ---\n{question}\n")
-    response = FinancialAnalystAgent.run(question)
+    response = get_agent("FinancialAnalystAgent").run(question)
     print("--- Agent Report ---")
     print(pretty_output(response))
 
@@ -196,7 +451,7 @@ def test_legal_compliance():
     Check zoning laws, building codes, environmental rules, 
     and permits required. Identify risks."""
     print(f"\n--- Question ---\n{question}\n")
-    response = LegalComplianceAgent.run(question)
+    response = get_agent("LegalComplianceAgent").run(question)
     print("--- Agent Report ---")
     print(pretty_output(response))
 
@@ -206,7 +461,7 @@ def test_risk_assessment():
     Consider market risks, flooding/climate risks, financing risks, 
     and insurance needs. Provide mitigation strategies."""
     print(f"\n--- Question ---\n{question}\n")
-    response = RiskAssessmentAgent.run(question)
+    response = get_agent("RiskAssessmentAgent").run(question)
     print("--- Agent Report ---")
     print(pretty_output(response))
 
@@ -216,13 +471,13 @@ def test_neighborhood_analysis():
     Provide demographics, community profile, amenities, 
     infrastructure, and upcoming development projects."""
     print(f"\n--- Question ---\n{question}\n")
-    response = NeighborhoodSpecialistAgent.run(question)
+    response = get_agent("NeighborhoodSpecialistAgent").run(question)
     print("--- Agent Report ---")
     print(pretty_output(response))
 
 def test_comprehensive_valuation():
     print("\n🧪 Testing PropertyValuationTeam...")
-    response = PropertyValuationTeam.run(
+    response = get_team().run(
         message="""Conduct a comprehensive property valuation:
         1. Perform financial analysis
         2. Review legal compliance
@@ -233,6 +488,18 @@ def test_comprehensive_valuation():
     print("--- Final Valuation Report ---")
     print(pretty_output(response))
 
+def test_parallel_valuation():
+    print("\n🧪 Testing PropertyValuationTeam (parallel members)...")
+    result = run_parallel_valuation(
+        """Conduct a comprehensive property valuation of a property worth $500,000
+        with expected monthly rental income of $3,000, and provide a
+        risk-adjusted final valuation report."""
+    )
+    for agent_id, member in result["members"].items():
+        print(f"{agent_id}: {member['status']} in {member['seconds']}s")
+    print(f"--- Final Valuation Report ({result['seconds']}s) ---")
+    print(result["report"])
+
 # -------------------------------
 # Main runner (si lancé en console)
 # -------------------------------
@@ -254,6 +521,7 @@ if __name__ == "__main__":
             # test_risk_assessment()
             # test_neighborhood_analysis()
             # test_comprehensive_valuation()
+            # test_parallel_valuation()
 
             print("\n✅ Module test completed successfully!")
         except Exception as e:
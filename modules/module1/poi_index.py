@@ -0,0 +1,246 @@
+"""
+Grid-bucket spatial index of points of interest for neighborhood_profiler.
+
+Points are projected to miles around the dataset's reference point
+(equirectangular projection, accurate at city scale), bucketed into square
+grid cells and stored sorted by cell with CSR-style offsets. The index is
+built once from a POI file and persisted as .npy arrays that are memory
+mapped on load. Each build is written to a temporary directory and renamed
+to a new version directory, and builds are never modified afterwards, so
+readers still mapping an older version keep consistent arrays while the
+index is rebuilt. A radius query only reads the few contiguous slices of
+points in the grid columns overlapping the circle, so it costs microseconds
+instead of a scan over every point.
+"""
+import json
+import math
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+DEFAULT_POI_INDEX = Path("tmp") / "poi_index"
+
+# Point-of-interest types counted by neighborhood_profiler
+POI_TYPES = [
+    "grocery_store", "shopping_center", "restaurant", "pharmacy", "bank",
+    "park", "playground", "sports_facility", "fitness_center", "library",
+    "hospital", "urgent_care", "medical_office",
+    "bus_stop", "subway_station",
+    "elementary_school", "middle_school", "high_school",
+    "nightlife", "cultural_venue", "movie_theater",
+]
+
+EARTH_RADIUS_MILES = 3958.8
+
+# Cell coordinates are packed into one int64 key
+_KEY_OFFSET = 1 << 20
+_KEY_STRIDE = 1 << 21
+
+_ARRAYS = ("x", "y", "poi_type", "cell_keys", "cell_starts")
+_cache: Dict[str, Tuple[Path, "PoiIndex"]] = {}
+_cache_lock = threading.Lock()
+
+
+def _cell_keys(cell_x: np.ndarray, cell_y: np.ndarray) -> np.ndarray:
+    return (cell_x.astype(np.int64) + _KEY_OFFSET) * _KEY_STRIDE + (cell_y.astype(np.int64) + _KEY_OFFSET)
+
+
+class PoiIndex:
+    """Memory-mapped grid index of one build; see build_poi_index."""
+
+    def __init__(self, index_dir: Union[str, Path]):
+        index_dir = Path(index_dir)
+        meta = json.loads((index_dir / "meta.json").read_text())
+        self.index_dir = index_dir
+        self.poi_types: List[str] = meta["poi_types"]
+        self.cell_miles: float = meta["cell_miles"]
+        self.reference_lat: float = meta["reference_lat"]
+        self.reference_lon: float = meta["reference_lon"]
+        self.points: int = meta["points"]
+        arrays = {name: np.load(index_dir / f"{name}.npy", mmap_mode="r") for name in _ARRAYS}
+        self.x, self.y, self.poi_type = arrays["x"], arrays["y"], arrays["poi_type"]
+        self.cell_keys, self.cell_starts = arrays["cell_keys"], arrays["cell_starts"]
+        self._cos_lat = math.cos(math.radians(self.reference_lat))
+
+    def project(self, lat: Any, lon: Any) -> Tuple[np.ndarray, np.ndarray]:
+        """Latitude/longitude to miles east and north of the reference point."""
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        x = np.radians(lon - self.reference_lon) * self._cos_lat * EARTH_RADIUS_MILES
+        y = np.radians(lat - self.reference_lat) * EARTH_RADIUS_MILES
+        return x, y
+
+    def _column_ranges(self, qx: np.ndarray, qy: np.ndarray, radius_miles: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Point ranges covering the circles' bounding boxes, one per grid column.
+
+        Cells of one column are adjacent in key order, so each column of the
+        box is a single contiguous slice of the sorted points.
+
+        Returns:
+            Start and end point offsets, each of shape (locations, columns)
+        """
+        reach = int(math.ceil(radius_miles / self.cell_miles))
+        base_x = np.floor(qx / self.cell_miles).astype(np.int64)[:, None] + np.arange(-reach, reach + 1)
+        base_y = np.floor(qy / self.cell_miles).astype(np.int64)[:, None]
+        low = np.searchsorted(self.cell_keys, _cell_keys(base_x, base_y - reach))
+        high = np.searchsorted(self.cell_keys, _cell_keys(base_x, base_y + reach), side="right")
+        return self.cell_starts[low], self.cell_starts[high]
+
+    def count_within_batch(
+        self,
+        lats: Any,
+        lons: Any,
+        radius_miles: float = 1.0,
+        chunk_size: int = 1_000,
+    ) -> np.ndarray:
+        """
+        Count points of each type within ``radius_miles`` of every location.
+
+        Vectorized over locations: candidate points come from the grid columns
+        overlapping each circle, then are filtered by exact distance.
+
+        Args:
+            lats: Latitudes of the locations
+            lons: Longitudes of the locations
+            radius_miles: Query radius in miles
+            chunk_size: Locations processed together (bounds the candidate arrays)
+
+        Returns:
+            Integer matrix (locations x len(poi_types))
+        """
+        qx, qy = self.project(np.atleast_1d(lats), np.atleast_1d(lons))
+        types = len(self.poi_types)
+        counts = np.zeros((len(qx), types), dtype=np.int64)
+        if self.points == 0:
+            return counts
+
+        for first in range(0, len(qx), chunk_size):
+            cx, cy = qx[first:first + chunk_size], qy[first:first + chunk_size]
+            starts, ends = self._column_ranges(cx, cy, radius_miles)
+            lengths = (ends - starts).ravel()
+
+            # Expand every (location, column) range into its point indices
+            owner = np.repeat(np.arange(len(cx)).repeat(starts.shape[1]), lengths)
+            points = np.repeat(starts.ravel() - (np.cumsum(lengths) - lengths), lengths) + np.arange(lengths.sum())
+            inside = (self.x[points] - cx[owner]) ** 2 + (self.y[points] - cy[owner]) ** 2 <= radius_miles ** 2
+            counts[first:first + len(cx)] = np.bincount(
+                owner[inside] * types + self.poi_type[points[inside]], minlength=len(cx) * types
+            ).reshape(len(cx), types)
+        return counts
+
+    def count_within(self, lat: float, lon: float, radius_miles: float = 1.0) -> Dict[str, int]:
+        """Count points of each type within ``radius_miles`` of one location."""
+        qx, qy = self.project(lat, lon)
+        counts = np.zeros(len(self.poi_types), dtype=np.int64)
+        if self.points:
+            starts, ends = self._column_ranges(qx.reshape(1), qy.reshape(1), radius_miles)
+            for start, end in zip(starts[0].tolist(), ends[0].tolist()):
+                if end > start:
+                    inside = (self.x[start:end] - qx) ** 2 + (self.y[start:end] - qy) ** 2 <= radius_miles ** 2
+                    counts += np.bincount(self.poi_type[start:end][inside], minlength=counts.size)
+        return dict(zip(self.poi_types, counts.tolist()))
+
+
+def build_poi_index(
+    source: Union[str, Path],
+    index_dir: Union[str, Path] = DEFAULT_POI_INDEX,
+    cell_miles: float = 0.5,
+) -> Dict[str, Any]:
+    """
+    Build and persist the grid index from a POI file.
+
+    The arrays and meta.json are written to a temporary directory renamed to
+    a new version directory of ``index_dir`` once complete; older versions
+    are then removed (files still mapped by readers stay readable until
+    those unmap them; where the OS refuses, they are removed by a later build).
+
+    Args:
+        source: CSV with ``lat``, ``lon`` and ``poi_type`` columns (types outside
+            POI_TYPES are skipped)
+        index_dir: Directory receiving one version directory per build
+        cell_miles: Grid cell size in miles (about the typical query radius)
+
+    Returns:
+        Index metadata
+    """
+    import pandas as pd
+
+    frame = pd.read_csv(source, usecols=["lat", "lon", "poi_type"])
+    frame = frame[frame["poi_type"].isin(POI_TYPES)].dropna()
+    lat = frame["lat"].to_numpy(dtype=float)
+    lon = frame["lon"].to_numpy(dtype=float)
+    poi_type = frame["poi_type"].map({name: code for code, name in enumerate(POI_TYPES)}).to_numpy(np.int16)
+
+    reference_lat = float(lat.mean()) if len(lat) else 0.0
+    reference_lon = float(lon.mean()) if len(lon) else 0.0
+    cos_lat = math.cos(math.radians(reference_lat))
+    x = np.radians(lon - reference_lon) * cos_lat * EARTH_RADIUS_MILES
+    y = np.radians(lat - reference_lat) * EARTH_RADIUS_MILES
+
+    keys = _cell_keys(np.floor(x / cell_miles), np.floor(y / cell_miles))
+    order = np.argsort(keys, kind="stable")
+    cell_keys, cell_starts = np.unique(keys[order], return_index=True)
+    arrays = {
+        "x": x[order],
+        "y": y[order],
+        "poi_type": poi_type[order],
+        "cell_keys": cell_keys,
+        "cell_starts": np.append(cell_starts, len(order)).astype(np.int64),
+    }
+
+    index_dir = Path(index_dir)
+    index_dir.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=".build.", dir=index_dir))
+    for name, values in arrays.items():
+        np.save(staging / f"{name}.npy", values)
+    meta = {
+        "source": str(source),
+        "poi_types": POI_TYPES,
+        "cell_miles": cell_miles,
+        "reference_lat": reference_lat,
+        "reference_lon": reference_lon,
+        "points": int(len(order)),
+        "cells": int(len(cell_keys))
+    }
+    (staging / "meta.json").write_text(json.dumps(meta, indent=2))
+
+    # Versions sort by publication time; readers load the newest
+    version = index_dir / f"{time.time_ns():020d}"
+    os.replace(staging, version)
+    for stale in _versions(index_dir):
+        if stale.name < version.name:
+            shutil.rmtree(stale, ignore_errors=True)
+    return meta
+
+
+def _versions(index_dir: Path) -> List[Path]:
+    """Published builds of an index directory, oldest first."""
+    try:
+        entries = list(index_dir.iterdir())
+    except FileNotFoundError:
+        return []
+    return sorted(
+        (entry for entry in entries if entry.name.isdigit() and (entry / "meta.json").exists()),
+        key=lambda entry: entry.name,
+    )
+
+
+def load_poi_index(index_dir: Union[str, Path] = DEFAULT_POI_INDEX) -> Optional[PoiIndex]:
+    """Shared index for ``index_dir`` (its newest build), reloaded when it is rebuilt; None when no index exists."""
+    versions = _versions(Path(index_dir))
+    if not versions:
+        return None
+    key = str(Path(index_dir).resolve())
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is None or cached[0] != versions[-1]:
+            cached = (versions[-1], PoiIndex(versions[-1]))
+            _cache[key] = cached
+        return cached[1]
@@ -0,0 +1,232 @@
+"""
+Streaming portfolio risk aggregation over large property files.
+
+Property records are read from a CSV or Parquet file in chunks. Each chunk
+goes through the vectorized risk_assessment_engine and investment_analyzer
+kernels and is folded into fixed-size running aggregates, so memory stays
+constant whatever the number of rows.
+"""
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from additional_tools import (
+    DEFAULT_FINANCING_DETAILS,
+    DEFAULT_LOSS_SIMULATION,
+    DEFAULT_MARKET_ASSUMPTIONS,
+    RISK_CATALOG,
+    RISK_CATEGORIES,
+    analyze_investment_portfolio,
+    risk_scores,
+)
+from risk_simulation import systematic_loss_distribution
+
+# Probability bins of the streamed exposure table (risks x bins)
+PROBABILITY_BINS = 100
+
+# Groups listed in the concentration report
+TOP_GROUPS = 10
+
+# Columns used from the property file besides the optional group column
+PROPERTY_COLUMNS = (
+    ["property_address", "property_value", "analysis_period"]
+    + list(DEFAULT_FINANCING_DETAILS)
+    + list(DEFAULT_MARKET_ASSUMPTIONS)
+)
+
+
+def iter_property_chunks(
+    path: Union[str, Path],
+    chunk_size: int = 50_000,
+    columns: Optional[Sequence[str]] = None,
+) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Read a CSV or Parquet property file ``chunk_size`` rows at a time.
+
+    Args:
+        path: CSV file, or Parquet file (``.parquet``/``.pq``, requires pyarrow)
+        chunk_size: Rows per chunk
+        columns: Columns to read when present in the file (None reads all)
+
+    Yields:
+        Dictionary of column name to array for each chunk
+    """
+    path = Path(path)
+    if path.suffix.lower() in (".parquet", ".pq"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as error:
+            raise ImportError("Reading Parquet files requires pyarrow (pip install pyarrow)") from error
+        parquet_file = pq.ParquetFile(path)
+        available = parquet_file.schema_arrow.names
+        selected = [name for name in available if columns is None or name in columns]
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=selected):
+            yield {
+                name: batch.column(index).to_numpy(zero_copy_only=False)
+                for index, name in enumerate(batch.schema.names)
+            }
+    else:
+        import pandas as pd
+        available = pd.read_csv(path, nrows=0).columns
+        selected = [name for name in available if columns is None or name in columns]
+        for frame in pd.read_csv(path, chunksize=chunk_size, usecols=selected):
+            yield {name: frame[name].to_numpy() for name in frame.columns}
+
+
+def aggregate_portfolio_risk(
+    path: Union[str, Path],
+    chunk_size: int = 50_000,
+    risk_categories: List[str] = RISK_CATEGORIES,
+    group_by: Optional[str] = None,
+    include_investment: bool = True,
+    seed: Optional[int] = None,
+    confidence_levels: Sequence[float] = (0.95, 0.99),
+    n_scenarios: int = 20_000,
+) -> Dict[str, Any]:
+    """
+    Stream a property file through the risk and investment kernels.
+
+    Args:
+        path: CSV or Parquet file with at least a ``property_value`` column;
+            financing/market columns (see analyze_investment_portfolio) are used
+            when present
+        chunk_size: Rows processed per chunk
+        risk_categories: Categories to assess (market, environmental, financial, legal)
+        group_by: Optional column (e.g. city or zip code) for the concentration report
+        include_investment: Also aggregate investment_analyzer metrics
+        seed: Seed for reproducible risk draws (None draws fresh entropy)
+        confidence_levels: Confidence levels of the portfolio VaR/CVaR
+        n_scenarios: Driver scenarios of the portfolio loss distribution
+
+    Returns:
+        Dictionary with portfolio totals, exposure by category, concentration,
+        portfolio value at risk and, optionally, investment aggregates
+    """
+    rng = np.random.default_rng(seed)
+    rows = [index for index, entry in enumerate(RISK_CATALOG) if entry[0] in risk_categories]
+    categories = [category for category in RISK_CATEGORIES if category in risk_categories]
+    bin_edges = np.linspace(0, 1, PROBABILITY_BINS + 1)
+
+    # Running aggregates (fixed size, or one entry per distinct group)
+    count = 0
+    total_value = 0.0
+    squared_value = 0.0
+    largest_value = 0.0
+    expected_loss = 0.0
+    exposure = np.zeros((len(rows), PROBABILITY_BINS))
+    category_loss = dict.fromkeys(categories, 0.0)
+    category_weighted_score = dict.fromkeys(categories, 0.0)
+    group_values: Dict[Any, float] = {}
+    investment_totals = dict.fromkeys(
+        ["initial_investment", "annual_cash_flow", "npv", "weighted_return", "negative_npv"], 0.0
+    )
+
+    columns = PROPERTY_COLUMNS + ([group_by] if group_by else [])
+    for chunk in iter_property_chunks(path, chunk_size, columns):
+        if "property_value" not in chunk:
+            raise ValueError("Property file requires a property_value column")
+        values = chunk["property_value"].astype(float)
+        scores = risk_scores(values, risk_categories, rng)
+
+        count += len(values)
+        total_value += float(values.sum())
+        squared_value += float(np.square(values).sum())
+        largest_value = max(largest_value, float(values.max(initial=0.0)))
+        expected_loss += float(scores["expected_loss"].sum())
+
+        # Value x severity per risk, bucketed by each property's probability
+        weighted_severity = scores["severity"] * values[:, None]
+        bins = np.minimum(np.searchsorted(bin_edges, scores["probability"], side="right") - 1, PROBABILITY_BINS - 1)
+        for column in range(len(rows)):
+            exposure[column] += np.bincount(bins[:, column], weighted_severity[:, column], PROBABILITY_BINS)
+            category_loss[RISK_CATALOG[rows[column]][0]] += float(
+                weighted_severity[:, column] @ scores["probability"][:, column]
+            )
+        for category in categories:
+            category_weighted_score[category] += float(scores["category_scores"][category] @ values)
+
+        if group_by:
+            groups, inverse = np.unique(chunk[group_by].astype(str), return_inverse=True)
+            for group, value in zip(groups, np.bincount(inverse, values)):
+                group_values[group] = group_values.get(group, 0.0) + float(value)
+
+        if include_investment:
+            metrics = analyze_investment_portfolio(chunk, decimals=None)
+            investment_totals["initial_investment"] += np.nansum(metrics["initial_investment"])
+            investment_totals["annual_cash_flow"] += np.nansum(metrics["annual_cash_flow"])
+            investment_totals["npv"] += np.nansum(metrics["npv"])
+            investment_totals["weighted_return"] += np.nansum(metrics["annualized_return"] * values)
+            investment_totals["negative_npv"] += np.sum(metrics["npv"] < 0)
+
+    if count == 0:
+        raise ValueError(f"No property records in {path}")
+
+    # Portfolio loss distribution from the streamed exposure table
+    drivers = [RISK_CATEGORIES.index(category) for category in categories]
+    correlation = np.asarray(DEFAULT_LOSS_SIMULATION["correlation"], dtype=float)[np.ix_(drivers, drivers)]
+    losses = systematic_loss_distribution(
+        exposure,
+        (bin_edges[:-1] + bin_edges[1:]) / 2,
+        [categories.index(RISK_CATALOG[row][0]) for row in rows],
+        correlation=correlation,
+        within_category_correlation=DEFAULT_LOSS_SIMULATION["within_category_correlation"],
+        n_scenarios=n_scenarios,
+        confidence_levels=confidence_levels,
+        rng=rng,
+    )
+
+    results = {
+        "portfolio": {
+            "properties": count,
+            "total_value": round(total_value, 2),
+            "expected_loss": round(expected_loss, 2),
+            "risk_adjusted_value": round(total_value - expected_loss, 2)
+        },
+        "exposure_by_category": {
+            category: {
+                "expected_loss": round(category_loss[category], 2),
+                "share_of_expected_loss": round(category_loss[category] / sum(category_loss.values()), 4)
+                if sum(category_loss.values()) else 0.0,
+                "value_weighted_score": round(category_weighted_score[category] / total_value, 4)
+                if total_value else 0.0
+            }
+            for category in categories
+        },
+        "concentration": {
+            "largest_property_share": round(largest_value / total_value, 6) if total_value else 0.0,
+            "property_herfindahl_index": round(squared_value / total_value ** 2, 6) if total_value else 0.0
+        },
+        "value_at_risk": {
+            "n_scenarios": losses["n_scenarios"],
+            "systematic_expected_loss": round(losses["expected_loss"], 2),
+            "value_at_risk": {level: round(value, 2) for level, value in losses["value_at_risk"].items()},
+            "conditional_value_at_risk": {
+                level: round(value, 2) for level, value in losses["conditional_value_at_risk"].items()
+            }
+        }
+    }
+
+    if group_by:
+        shares = {group: value / total_value for group, value in group_values.items()} if total_value else {}
+        top = sorted(shares.items(), key=lambda item: item[1], reverse=True)[:TOP_GROUPS]
+        results["concentration"].update({
+            "group_by": group_by,
+            "groups": len(group_values),
+            "group_herfindahl_index": round(sum(share ** 2 for share in shares.values()), 6),
+            "top_groups": [{"group": group, "share": round(share, 4)} for group, share in top]
+        })
+
+    if include_investment:
+        results["investment"] = {
+            "total_initial_investment": round(float(investment_totals["initial_investment"]), 2),
+            "total_annual_cash_flow": round(float(investment_totals["annual_cash_flow"]), 2),
+            "total_npv": round(float(investment_totals["npv"]), 2),
+            # annualized_return is already a percentage in the portfolio output
+            "value_weighted_annualized_return": round(
+                float(investment_totals["weighted_return"]) / total_value, 2
+            ) if total_value else 0.0,
+            "negative_npv_share": round(float(investment_totals["negative_npv"]) / count, 4)
+        }
+
+    return results
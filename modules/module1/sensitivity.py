@@ -0,0 +1,202 @@
+"""
+Sensitivity and tornado analysis for financial_calculator.
+
+Assumptions are perturbed on a full multi-dimensional grid that is evaluated
+with the vectorized calculator kernels from financial_math; very large grids
+are split into chunks and spread across a process pool.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from financial_math import CALCULATOR_PARAMETERS, calculator_defaults, calculator_metrics
+
+# Result reported by default for each calculation type
+DEFAULT_OUTPUTS = {
+    "mortgage": "monthly_payment",
+    "roi": "annualized_roi",
+    "cash_flow": "monthly_cash_flow",
+    "npv": "npv",
+    "irr": "irr",
+}
+
+# Assumptions varied when the caller does not name any
+DEFAULT_ASSUMPTIONS = {
+    "mortgage": ["principal", "interest_rate", "term_years"],
+    "roi": ["initial_investment", "annual_rental_income", "annual_expenses", "appreciation_rate", "term_years"],
+    "cash_flow": ["monthly_rental_income", "monthly_property_taxes", "monthly_maintenance", "vacancy_rate"],
+    "npv": ["principal", "interest_rate", "annual_cash_flow", "terminal_value"],
+    "irr": ["principal", "annual_cash_flow", "terminal_value"],
+}
+
+# Relative step used for point elasticities
+ELASTICITY_STEP = 0.01
+
+
+def _evaluate(
+    calculation_type: str,
+    output: str,
+    base_inputs: Dict[str, Any],
+    columns: Dict[str, np.ndarray],
+) -> np.ndarray:
+    """
+    Evaluate one output of the calculator kernel with some inputs replaced by columns.
+    
+    The result always has one value per column row, even for inputs the output ignores.
+    """
+    inputs = {**base_inputs, **columns}
+    values = np.asarray(calculator_metrics(calculation_type, **inputs)[output], dtype=float)
+    size = max((len(column) for column in columns.values()), default=None)
+    return values if size is None else np.broadcast_to(values, (size,))
+
+
+def _evaluate_grid_chunk(
+    calculation_type: str,
+    output: str,
+    base_inputs: Dict[str, Any],
+    axes: Dict[str, np.ndarray],
+    start: int,
+    stop: int,
+) -> np.ndarray:
+    """Evaluate grid cells ``start:stop`` (flat C-order index); runs in worker processes."""
+    shape = tuple(len(values) for values in axes.values())
+    indices = np.unravel_index(np.arange(start, stop), shape)
+    columns = {name: values[index] for (name, values), index in zip(axes.items(), indices)}
+    return _evaluate(calculation_type, output, base_inputs, columns)
+
+
+def sensitivity_analysis(
+    calculation_type: str,
+    base_inputs: Dict[str, Any],
+    assumptions: Optional[Union[List[str], Dict[str, List[float]]]] = None,
+    variation: float = 0.10,
+    steps: int = 5,
+    output: Optional[str] = None,
+    chunk_size: int = 50_000,
+    max_workers: Optional[int] = None,
+    parallel_threshold: int = 500_000,
+    return_grid: bool = False,
+) -> Dict[str, Any]:
+    """
+    Perturb calculator assumptions and measure the effect on one result.
+
+    Args:
+        calculation_type: financial_calculator calculation type
+        base_inputs: ``principal``, ``interest_rate``, ``term_years`` and any
+            ``additional_params`` of the base case
+        assumptions: Names to vary by ±``variation`` in ``steps`` steps, or a
+            mapping of name to the explicit values to test (defaults to
+            DEFAULT_ASSUMPTIONS)
+        variation: Relative half-width of the default ranges (0.10 = ±10%)
+        steps: Number of values per assumption for the default ranges
+        output: Result to analyse (defaults to DEFAULT_OUTPUTS)
+        chunk_size: Grid cells evaluated per vectorized batch
+        max_workers: Process pool size for large grids (1 disables the pool)
+        parallel_threshold: Grid size from which chunks go to a process pool
+        return_grid: Also return the axes and the full grid of results
+
+    Returns:
+        Dictionary with the base value, grid summary, tornado bars sorted by
+        swing and point elasticities of the output to each assumption
+
+    Raises:
+        ValueError: Unsupported calculation type, assumption or output
+    """
+    if calculation_type not in DEFAULT_OUTPUTS:
+        raise ValueError(f"Unsupported calculation type: {calculation_type}")
+    output = output or DEFAULT_OUTPUTS[calculation_type]
+
+    # Resolve defaults so every perturbed assumption has a base value
+    allowed = ["principal", "interest_rate", "term_years"] + CALCULATOR_PARAMETERS[calculation_type]
+    base_inputs = {"interest_rate": 0.05, "term_years": 30, **base_inputs}
+    params = {key: base_inputs[key] for key in CALCULATOR_PARAMETERS[calculation_type] if key in base_inputs}
+    base_inputs = {
+        "principal": base_inputs["principal"],
+        "interest_rate": base_inputs["interest_rate"],
+        "term_years": base_inputs["term_years"],
+        **calculator_defaults(calculation_type, base_inputs["principal"], base_inputs["term_years"], **params),
+    }
+
+    assumptions = assumptions or DEFAULT_ASSUMPTIONS[calculation_type]
+    if not isinstance(assumptions, dict):
+        assumptions = {
+            name: np.linspace(1 - variation, 1 + variation, steps) * base_inputs.get(name, np.nan)
+            for name in assumptions
+        }
+    unknown = [name for name in assumptions if name not in allowed or name == "cash_flows"]
+    if unknown:
+        raise ValueError(f"Cannot perturb {unknown} for calculation type {calculation_type}")
+    axes = {name: np.asarray(values, dtype=float) for name, values in assumptions.items()}
+
+    try:
+        base_value = float(_evaluate(calculation_type, output, base_inputs, {}))
+    except KeyError:
+        raise ValueError(f"Unknown output {output!r} for calculation type {calculation_type}") from None
+
+    # Full grid, chunked and optionally spread across processes
+    grid_size = int(np.prod([len(values) for values in axes.values()]))
+    bounds = [(start, min(start + chunk_size, grid_size)) for start in range(0, grid_size, chunk_size)]
+    if grid_size >= parallel_threshold and max_workers != 1 and len(bounds) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [
+                pool.submit(_evaluate_grid_chunk, calculation_type, output, base_inputs, axes, start, stop)
+                for start, stop in bounds
+            ]
+            grid = np.concatenate([future.result() for future in futures])
+    else:
+        grid = np.concatenate([
+            _evaluate_grid_chunk(calculation_type, output, base_inputs, axes, start, stop)
+            for start, stop in bounds
+        ])
+
+    # Tornado: one assumption at a time at the ends of its range
+    tornado = []
+    for name, values in axes.items():
+        low_value, high_value = _evaluate(
+            calculation_type, output, base_inputs, {name: np.array([values.min(), values.max()])}
+        ).tolist()
+        tornado.append({
+            "assumption": name,
+            "base_input": float(base_inputs[name]),
+            "input_range": [float(values.min()), float(values.max())],
+            "output_low": round(low_value, 4),
+            "output_high": round(high_value, 4),
+            "swing": round(abs(high_value - low_value), 4)
+        })
+    tornado.sort(key=lambda bar: bar["swing"], reverse=True)
+
+    # Elasticities: % change in the output per % change in each input
+    elasticities = {}
+    for name in axes:
+        base_input = float(base_inputs[name])
+        down, up = _evaluate(
+            calculation_type, output, base_inputs,
+            {name: base_input * np.array([1 - ELASTICITY_STEP, 1 + ELASTICITY_STEP])},
+        ).tolist()
+        if base_value == 0 or base_input == 0:
+            elasticities[name] = None
+        else:
+            elasticities[name] = round((up - down) / (2 * ELASTICITY_STEP * base_value), 4)
+
+    results = {
+        "calculation_type": calculation_type,
+        "output": output,
+        "base_value": round(base_value, 4),
+        "grid_summary": {
+            "cells": grid_size,
+            "min": round(float(np.nanmin(grid)), 4),
+            "max": round(float(np.nanmax(grid)), 4),
+            "mean": round(float(np.nanmean(grid)), 4),
+            "percentiles": {
+                f"p{percentile}": round(float(value), 4)
+                for percentile, value in zip((5, 25, 50, 75, 95), np.nanpercentile(grid, (5, 25, 50, 75, 95)))
+            }
+        },
+        "tornado": tornado,
+        "elasticities": elasticities
+    }
+    if return_grid:
+        results["axes"] = axes
+        results["grid"] = grid.reshape(tuple(len(values) for values in axes.values()))
+    return results
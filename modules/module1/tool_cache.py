@@ -0,0 +1,180 @@
+"""
+Memoizing result cache for deterministic agent tools.
+
+``cached_tool`` goes between ``@tool`` and the function, so agno still sees
+the original signature and docstring:
+
+    @tool(name="financial_calculator", ...)
+    @cached_tool(maxsize=256)
+    def financial_calculator(...): ...
+
+Calls are keyed on their bound arguments in canonical form (defaults
+applied, dict keys sorted, floats normalized), entries are evicted least
+recently used first and may expire after a TTL.
+"""
+import copy
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Significant digits kept when normalizing floats in cache keys
+KEY_FLOAT_DIGITS = 12
+
+# Caches created by cached_tool, by function name
+TOOL_CACHES: Dict[str, "ToolCache"] = {}
+
+
+def _canonical(value: Any) -> Any:
+    """Convert a tool argument into a JSON-serializable canonical form."""
+    if isinstance(value, (bool, np.bool_)) or value is None or isinstance(value, str):
+        return bool(value) if isinstance(value, np.bool_) else value
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        value = float(value)
+        if not np.isfinite(value):
+            return repr(value)
+        # 0.1 + 0.2 and 0.3 share a key; integral floats match ints
+        value = float(f"{value:.{KEY_FLOAT_DIGITS}g}")
+        return int(value) if value.is_integer() else value
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items()}
+    if isinstance(value, (set, frozenset)):
+        return sorted((_canonical(item) for item in value), key=repr)
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_canonical(item) for item in value]
+    return repr(value)
+
+
+def make_key(arguments: Dict[str, Any]) -> str:
+    """Canonical JSON key for a mapping of bound arguments."""
+    return json.dumps(_canonical(arguments), sort_keys=True, separators=(",", ":"))
+
+
+class ToolCache:
+    """Thread-safe LRU cache with an optional TTL and hit/miss counters."""
+
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> tuple:
+        """Return (found, value), counting the hit or miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (self.ttl is None or time.monotonic() - entry[0] < self.ttl):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "skipped": self.skipped,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.skipped = 0
+
+
+def cached_tool(
+    maxsize: int = 256,
+    ttl: Optional[float] = None,
+    skip: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    timestamps: Sequence[Tuple[str, ...]] = (),
+) -> Callable:
+    """
+    Memoize a deterministic tool function.
+
+    Args:
+        maxsize: Maximum number of cached results (least recently used evicted first)
+        ttl: Seconds after which a result expires (None keeps it until evicted)
+        skip: Predicate on the bound arguments; calls for which it returns True
+            bypass the cache (e.g. stochastic runs without a seed)
+        timestamps: Paths of date fields in the result (e.g. ("calculation_info",
+            "calculation_date")) set to the current time on every call, so a
+            cache hit does not replay the date of the first call
+
+    Returns:
+        Decorator adding ``cache_info()`` and ``cache_clear()`` to the function
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        cache = ToolCache(maxsize=maxsize, ttl=ttl)
+        TOOL_CACHES[func.__name__] = cache
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            if skip is not None and skip(bound.arguments):
+                with cache._lock:
+                    cache.skipped += 1
+                return func(*args, **kwargs)
+
+            key = make_key(bound.arguments)
+            found, value = cache.get(key)
+            if not found:
+                value = func(*args, **kwargs)
+                cache.put(key, value)
+            # Callers get their own copy so cached results cannot be mutated
+            value = copy.deepcopy(value)
+            if timestamps and isinstance(value, dict):
+                now = datetime.now().isoformat()
+                for path in timestamps:
+                    target = value
+                    for part in path[:-1]:
+                        target = target.get(part) if isinstance(target, dict) else None
+                    if isinstance(target, dict) and path[-1] in target:
+                        target[path[-1]] = now
+            return value
+
+        wrapper.cache_info = cache.info
+        wrapper.cache_clear = cache.clear
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit/miss statistics of every cached tool."""
+    return {name: cache.info() for name, cache in TOOL_CACHES.items()}
+
+
+def clear_tool_caches() -> None:
+    """Empty every cached tool's cache."""
+    for cache in TOOL_CACHES.values():
+        cache.clear()
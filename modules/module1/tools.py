@@ -1,12 +1,157 @@
 from agno.tools import tool
 from typing import Dict, Any, List, Optional, Union
-import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
 import json
-import sqlite3
-import requests
-from pathlib import Path
+from pathlib import Path, PurePosixPath
+
+from agno.tools.file import FileTools
+
+from content_store import INDEX_FILE, load_content_store
+from document_index import load_document_index
+import legal_parser
+from financial_math import (
+    CALCULATOR_PARAMETERS,
+    amortization_schedule,
+    calculator_cash_flows,
+    calculator_metrics,
+    cash_flow_sign_changes,
+    irr,
+    npv,
+)
+from portfolio_stream import aggregate_portfolio_risk
+from sensitivity import sensitivity_analysis
+from tool_cache import cached_tool
+
+
+class DedupFileTools(FileTools):
+    """FileTools whose documents are stored once per distinct content (see content_store.ContentStore)."""
+
+    def __init__(self, base_dir: Optional[Path] = None, **kwargs):
+        super().__init__(base_dir=base_dir, **kwargs)
+        self.index = load_document_index(self.base_dir)
+        self.store = self.index.store
+        if kwargs.get("search_files", False):
+            self.register(self.search_documents)
+
+    def save_file(self, contents: str, file_name: str, overwrite: bool = True) -> str:
+        """Saves the contents to a file called `file_name` and returns the file name if successful.
+
+        :param contents: The contents to save.
+        :param file_name: The name of the file to save to.
+        :param overwrite: Overwrite the file if it already exists.
+        :return: The file name if successful, otherwise returns an error message.
+        """
+        try:
+            data = contents.encode("utf-8")
+            digest = self.store.put(file_name, data, overwrite=overwrite)
+            if digest is None:
+                return f"File {file_name} already exists"
+            self.index.add(file_name, data, digest)
+            return str(file_name)
+        except Exception as e:
+            return f"Error saving to file: {e}"
+
+    def read_file(self, file_name: str) -> str:
+        """Reads the contents of the file `file_name` and returns the contents if successful.
+
+        :param file_name: The name of the file to read.
+        :return: The contents of the file if successful, otherwise returns an error message.
+        """
+        try:
+            data = self.store.get(file_name)
+            if data is None:
+                return f"Error reading file: {file_name} not found"
+            return data.decode("utf-8", errors="replace")
+        except Exception as e:
+            return f"Error reading file: {e}"
+
+    def list_files(self) -> str:
+        """Returns a list of files in the base directory, one name per distinct content
+
+        :return: JSON formatted list of file names and the names sharing the same content.
+        """
+        try:
+            return json.dumps(self.store.unique(), indent=2)
+        except Exception as e:
+            return f"Error listing files: {e}"
+
+    def search_files(self, pattern: str) -> str:
+        """Searches for files in the base directory that match the pattern
+
+        :param pattern: The pattern to search for, e.g. "*.txt", "file*.csv", "**/*.py".
+        :return: JSON formatted list of matching files (one per distinct content), or an error message.
+        """
+        try:
+            if not pattern or not pattern.strip():
+                return "Error: Pattern cannot be empty"
+            names = [name for name in self.store.catalog() if PurePosixPath(name).match(pattern)]
+            unique = self.store.unique(names)
+            return json.dumps({
+                "pattern": pattern,
+                "base_directory": str(self.base_dir),
+                "matches_found": len(names),
+                "unique_contents": len(unique),
+                "files": [entry["name"] for entry in unique],
+                "duplicates": {entry["name"]: entry["duplicates"] for entry in unique if entry["duplicates"]}
+            }, indent=2)
+        except Exception as e:
+            return f"Error searching files with pattern {pattern}: {e}"
+
+    def search_documents(self, query: str, limit: int = 10) -> str:
+        """Searches the text of the documents in the base directory (French or English) and returns the best matches
+
+        :param query: Words to look for, e.g. "clause de résiliation" or "zoning permit".
+        :param limit: Maximum number of documents to return.
+        :return: JSON formatted list of matching documents ranked by relevance, with a snippet of each, or an error message.
+        """
+        try:
+            if not query or not query.strip():
+                return "Error: Query cannot be empty"
+            results = self.index.search(query, limit=limit)
+            return json.dumps({
+                "query": query,
+                "base_directory": str(self.base_dir),
+                "results_found": len(results),
+                "results": results
+            }, indent=2, ensure_ascii=False)
+        except Exception as e:
+            return f"Error searching documents for {query}: {e}"
+
+
+def _resolve_document(document_path: str) -> Optional[Path]:
+    """
+    File holding a document given by path or by name.
+
+    Tried in order: the path itself, the content store it was saved in, the
+    name under module1.DOCUMENTS_DIR (plain file or store entry), and the
+    newest saved document whose name ends with it (reports are saved with a
+    timestamp prefix, e.g. 20250917_172212_property_valuation_test.txt).
+    """
+    path = Path(document_path)
+    if path.is_file():
+        return path
+    # Saved through DedupFileTools: the content lives in the nearest store's blobs
+    root = next((parent for parent in path.parents if (parent / INDEX_FILE).exists()), None)
+    if root is not None and root != Path("."):
+        found = load_content_store(root).path(path.relative_to(root).as_posix())
+        if found is not None:
+            return found
+    if path.is_absolute():
+        return None
+    from module1 import DOCUMENTS_DIR
+    if not DOCUMENTS_DIR.is_dir():
+        return None
+    store = load_content_store(DOCUMENTS_DIR)
+    for name in dict.fromkeys([path.as_posix(), path.name]):
+        found = store.path(name)
+        if found is not None:
+            return found
+    saved = [
+        (saved_at, name) for name, (_, saved_at) in store.catalog().items()
+        if PurePosixPath(name).name.endswith(f"_{path.name}")
+    ]
+    return store.path(max(saved)[1]) if saved else None
 
 
 @tool(
@@ -24,111 +169,149 @@ def legal_document_analyzer(
     Analyze legal documents for compliance, risks, and key terms.
     
     Args:
-        document_path: Path to the legal document
-        document_type: Type of document (contract, deed, lease, permit, etc.)
+        document_path: Path to the legal document (.txt/.md) or its name in the
+            documents directory, or a directory of documents analyzed in parallel
+        document_type: Type of document (contract, deed, lease, permit, report)
         analysis_focus: Areas to focus on (compliance, risks, terms, obligations)
         jurisdiction: Legal jurisdiction for analysis
         
     Returns:
-        Dictionary containing legal document analysis
+        Dictionary containing legal document analysis, or the document path and
+        an ``error`` when the document cannot be found or read
     """
     current_date = datetime.now()
     
-    # Simulated legal document analysis
-    # In production, this would use NLP and legal databases
+    if not document_path.strip():
+        return {"document_path": document_path, "error": "No document path given"}
     
-    legal_findings = {
-        "contract": {
-            "key_terms": [
-                "Purchase price and payment terms",
-                "Closing date and conditions",
-                "Contingencies and inspection periods",
-                "Title and ownership transfer",
-                "Default and remedies clauses"
-            ],
-            "compliance_issues": [
-                "Disclosure requirements verification needed",
-                "Local ordinance compliance check required"
-            ],
-            "risk_factors": [
-                "Liquidated damages clause may be enforceable",
-                "Inspection contingency period is limited"
-            ]
-        },
-        "deed": {
-            "key_terms": [
-                "Property description and boundaries",
-                "Ownership type and rights",
-                "Easements and restrictions",
-                "Warranty and title guarantees"
-            ],
-            "compliance_issues": [
-                "Recording requirements met",
-                "Tax assessment updates needed"
-            ],
-            "risk_factors": [
-                "Potential boundary disputes",
-                "Undisclosed easements possible"
-            ]
-        },
-        "lease": {
-            "key_terms": [
-                "Rent amount and payment schedule",
-                "Lease term and renewal options",
-                "Maintenance responsibilities",
-                "Use restrictions and permissions"
-            ],
-            "compliance_issues": [
-                "Fair housing compliance verified",
-                "Local rent control laws applicable"
-            ],
-            "risk_factors": [
-                "Security deposit regulations",
-                "Eviction process requirements"
+    # Directory mode: analyze every document of a due-diligence packet in parallel
+    if Path(document_path).is_dir():
+        if (Path(document_path) / INDEX_FILE).exists():
+            # Documents saved by the agents: analyze each distinct content once
+            store = load_content_store(document_path)
+            entries = [
+                entry for entry in store.unique()
+                if Path(entry["name"]).suffix.lower() in legal_parser.DOCUMENT_SUFFIXES
             ]
+            results = legal_parser.analyze_documents([store.path(entry["name"]) for entry in entries], document_type)
+            for entry, result in zip(entries, results):
+                result["document_path"] = str(Path(document_path) / entry["name"])
+                result["duplicates"] = entry["duplicates"]
+        else:
+            results = legal_parser.analyze_documents(legal_parser.list_documents(document_path), document_type)
+        analyzed = [result for result in results if "error" not in result]
+        summaries = [
+            {
+                "document_path": result["document_path"],
+                "risk_score": round(result["risk_score"], 2),
+                "risk_level": _legal_risk_level(result["risk_score"]),
+                "compliance_score": round(result["compliance_score"], 2),
+                "compliance_status": _legal_compliance_status(result["compliance_score"]),
+                "missing_clauses": [legal_parser.CLAUSE_TYPES[name][2] for name in result["missing_clauses"]],
+                "risk_factors": [legal_parser.CLAUSE_TYPES[name][2] for name in result["risk_types"]],
+                "duplicates": result.get("duplicates", [])
+            }
+            for result in analyzed
+        ]
+        coverage = {}
+        for result in analyzed:
+            for name in result["occurrences"]:
+                coverage[name] = coverage.get(name, 0) + 1
+        return {
+            "document_info": {
+                "document_path": document_path,
+                "document_type": document_type,
+                "jurisdiction": jurisdiction,
+                "analysis_date": current_date.isoformat(),
+                "analysis_focus": analysis_focus,
+                "documents_analyzed": len(analyzed),
+                "documents_failed": len(results) - len(analyzed)
+            },
+            "documents": summaries,
+            "portfolio_summary": {
+                "average_risk_score": round(float(np.mean([r["risk_score"] for r in analyzed])), 2) if analyzed else None,
+                "average_compliance_score": round(float(np.mean([r["compliance_score"] for r in analyzed])), 2) if analyzed else None,
+                "non_compliant_documents": sum(summary["compliance_status"] == "Non-Compliant" for summary in summaries),
+                "highest_risk_documents": [
+                    summary["document_path"]
+                    for summary in sorted(summaries, key=lambda summary: summary["risk_score"], reverse=True)[:5]
+                ],
+                "clause_coverage": {
+                    legal_parser.CLAUSE_TYPES[name][2]: count
+                    for name, count in sorted(coverage.items(), key=lambda item: item[1], reverse=True)
+                }
+            },
+            "errors": [result for result in results if "error" in result]
         }
-    }
     
-    # Get analysis based on document type
-    analysis_data = legal_findings.get(document_type, legal_findings["contract"])
+    # Stream the document through the clause matcher
+    path = _resolve_document(document_path)
+    if path is None:
+        return {"document_path": document_path, "error": f"Document not found: {document_path}"}
+    try:
+        result = legal_parser.analyze_document(path, document_type)
+    except (OSError, ValueError) as error:
+        return {"document_path": document_path, "error": str(error)}
+    occurrences = result["occurrences"]
     
-    # Simulate document parsing results
+    def labels(category: str) -> List[str]:
+        return [legal_parser.CLAUSE_TYPES[name][2] for name in occurrences if legal_parser.CLAUSE_TYPES[name][0] == category]
+    
+    # First occurrence of each clause type in the focus areas, in document order
     extracted_clauses = []
-    for i, term in enumerate(analysis_data["key_terms"][:3]):
+    first_occurrences = sorted(
+        (entry["examples"][0]["line"], name, entry) for name, entry in occurrences.items()
+        if legal_parser.CLAUSE_TYPES[name][0] in analysis_focus
+    )
+    for number, (line, name, entry) in enumerate(first_occurrences, start=1):
+        category, importance, label, _ = legal_parser.CLAUSE_TYPES[name]
         extracted_clauses.append({
-            "clause_number": i + 1,
-            "clause_type": term.split()[0].lower(),
-            "content": f"Sample clause content for {term}",
-            "importance": "High" if i < 2 else "Medium",
-            "compliance_status": "Compliant" if i % 2 == 0 else "Needs Review"
+            "clause_number": number,
+            "clause_type": name,
+            "label": label,
+            "category": category,
+            "content": entry["examples"][0]["text"],
+            "section": entry["examples"][0]["section"],
+            "line": line,
+            "occurrences": entry["count"],
+            "importance": importance
         })
     
     # Risk assessment
-    risk_score = np.random.uniform(0.2, 0.8)
-    risk_level = "Low" if risk_score < 0.3 else "Medium" if risk_score < 0.6 else "High"
+    risk_score = result["risk_score"]
+    risk_level = _legal_risk_level(risk_score)
     
-    # Compliance assessment
-    compliance_score = np.random.uniform(0.6, 0.95)
-    compliance_status = "Compliant" if compliance_score > 0.8 else "Partially Compliant" if compliance_score > 0.6 else "Non-Compliant"
+    # Compliance assessment (share of the clauses expected for this document type)
+    compliance_score = result["compliance_score"]
+    compliance_status = _legal_compliance_status(compliance_score)
+    missing = [legal_parser.CLAUSE_TYPES[name][2] for name in result["missing_clauses"]]
     
     return {
         "document_info": {
             "document_path": document_path,
             "document_type": document_type,
             "jurisdiction": jurisdiction,
-        "analysis_date": current_date.isoformat(),
-            "analysis_focus": analysis_focus
+            "analysis_date": current_date.isoformat(),
+            "analysis_focus": analysis_focus,
+            "encoding": result["encoding"],
+            "lines": result["lines"]
         },
         "extracted_clauses": extracted_clauses,
         "legal_analysis": {
-            "key_terms_identified": analysis_data["key_terms"],
-            "compliance_issues": analysis_data["compliance_issues"],
-            "risk_factors": analysis_data["risk_factors"]
+            "key_terms_identified": labels("terms"),
+            "compliance_issues": [f"{label} not addressed" for label in missing],
+            "risk_factors": [
+                f"{legal_parser.CLAUSE_TYPES[name][2]}: {occurrences[name]['examples'][0]['text']}"
+                for name in result["risk_types"]
+            ],
+            "obligations": [example["text"] for example in occurrences.get("obligation", {}).get("examples", [])]
         },
         "risk_assessment": {
             "overall_risk_score": round(risk_score, 2),
             "risk_level": risk_level,
-            "critical_risks": [risk for risk in analysis_data["risk_factors"] if "enforceable" in risk or "limited" in risk],
+            "critical_risks": [
+                legal_parser.CLAUSE_TYPES[name][2] for name in result["risk_types"] if legal_parser.CLAUSE_TYPES[name][1] == "High"
+            ],
             "mitigation_recommendations": [
                 "Consult with qualified attorney",
                 "Review local regulations",
@@ -138,27 +321,31 @@ def legal_document_analyzer(
         "compliance_assessment": {
             "compliance_score": round(compliance_score, 2),
             "compliance_status": compliance_status,
-            "required_actions": analysis_data["compliance_issues"],
-            "regulatory_requirements": [
-                "Property disclosure laws",
-                "Fair housing regulations",
-                "Environmental compliance",
-                "Zoning compliance"
-            ]
+            "required_actions": [f"Add or verify: {label}" for label in missing],
+            "regulatory_requirements": labels("compliance")
         },
         "recommendations": {
-            "immediate_actions": ["Legal review recommended", "Compliance verification needed"],
+            "immediate_actions": ["Legal review recommended", "Compliance verification needed"] if missing or risk_level == "High" else ["Standard legal review"],
             "due_diligence_items": ["Title search", "Lien verification", "Permit history review"],
             "professional_consultation": ["Real estate attorney", "Title company", "Compliance specialist"]
         }
     }
 
 
+def _legal_risk_level(risk_score: float) -> str:
+    return "Low" if risk_score < 0.3 else "Medium" if risk_score < 0.6 else "High"
+
+
+def _legal_compliance_status(compliance_score: float) -> str:
+    return "Compliant" if compliance_score > 0.8 else "Partially Compliant" if compliance_score > 0.6 else "Non-Compliant"
+
+
 @tool(
     name="financial_calculator",
     description="Perform advanced financial calculations for real estate investments",
     show_result=True,
 )
+@cached_tool(maxsize=256, timestamps=[("calculation_info", "calculation_date")])
 def financial_calculator(
     calculation_type: str,
     principal: float,
@@ -174,7 +361,9 @@ def financial_calculator(
         principal: Principal amount or property value
         interest_rate: Annual interest rate (decimal)
         term_years: Term in years
-        additional_params: Additional parameters specific to calculation type
+        additional_params: Additional parameters specific to calculation type; a
+            "sensitivity" entry ({"assumptions", "variation", "steps", "output"}) adds
+            a tornado/elasticity analysis of the result
         
     Returns:
         Dictionary containing financial calculation results
@@ -184,104 +373,95 @@ def financial_calculator(
     
     current_date = datetime.now()
     results = {}
+    calculator_params = {
+        key: additional_params[key]
+        for key in CALCULATOR_PARAMETERS.get(calculation_type, [])
+        if key in additional_params
+    }
     
     if calculation_type == "mortgage":
-        # Mortgage payment calculation
-        monthly_rate = interest_rate / 12
-        num_payments = term_years * 12
+        # Mortgage payment calculation (full-term schedule from the vectorized engine)
+        schedule = amortization_schedule(principal, interest_rate, term_years)
+        monthly_payment = float(schedule["monthly_payment"][0])
         
-        if monthly_rate > 0:
-            monthly_payment = principal * (monthly_rate * (1 + monthly_rate)**num_payments) / ((1 + monthly_rate)**num_payments - 1)
-        else:
-            monthly_payment = principal / num_payments
-        
-        total_payments = monthly_payment * num_payments
-        total_interest = total_payments - principal
-        
-        # Generate amortization schedule (first 12 months)
-        amortization = []
-        remaining_balance = principal
-        
-        for month in range(min(12, num_payments)):
-            interest_payment = remaining_balance * monthly_rate
-            principal_payment = monthly_payment - interest_payment
-            remaining_balance -= principal_payment
-            
-            amortization.append({
-                "month": month + 1,
-                "payment": round(monthly_payment, 2),
-                "principal": round(principal_payment, 2),
-                "interest": round(interest_payment, 2),
-                "balance": round(remaining_balance, 2)
-            })
+        amortization = [
+            {
+                "month": month,
+                "payment": payment,
+                "principal": principal_payment,
+                "interest": interest_payment,
+                "balance": balance
+            }
+            for month, payment, principal_payment, interest_payment, balance in zip(
+                schedule["month"].tolist(),
+                np.round(schedule["payment"][0], 2).tolist(),
+                np.round(schedule["principal"][0], 2).tolist(),
+                np.round(schedule["interest"][0], 2).tolist(),
+                (np.round(schedule["balance"][0], 2) + 0.0).tolist(),
+            )
+        ]
         
         results = {
             "monthly_payment": round(monthly_payment, 2),
-            "total_payments": round(total_payments, 2),
-            "total_interest": round(total_interest, 2),
+            "total_payments": round(float(schedule["total_payments"][0]), 2),
+            "total_interest": round(float(schedule["total_interest"][0]), 2),
             "amortization_schedule": amortization
         }
     
     elif calculation_type == "roi":
         # Return on Investment calculation
-        initial_investment = additional_params.get("initial_investment", principal * 0.2)
-        annual_rental_income = additional_params.get("annual_rental_income", principal * 0.08)
-        annual_expenses = additional_params.get("annual_expenses", annual_rental_income * 0.3)
-        appreciation_rate = additional_params.get("appreciation_rate", 0.03)
+        roi = calculator_metrics(calculation_type, principal, interest_rate, term_years, **calculator_params)
         
-        # Calculate various ROI metrics
-        net_annual_income = annual_rental_income - annual_expenses
-        cash_on_cash_return = net_annual_income / initial_investment
-        
-        # Calculate appreciation over term
-        future_value = principal * (1 + appreciation_rate) ** term_years
-        total_appreciation = future_value - principal
-        
-        # Total return calculation
-        total_rental_income = net_annual_income * term_years
-        total_return = total_rental_income + total_appreciation
-        total_roi = total_return / initial_investment
-        annualized_roi = (1 + total_roi) ** (1/term_years) - 1
+        results = {name: round(float(value), 2) for name, value in roi.items()}
+    
+    elif calculation_type in ("npv", "irr"):
+        # Discounted cash flow analysis on an explicit or default annual series
+        cash_flows = calculator_cash_flows(principal, term_years, **calculator_params)[0]
         
-        results = {
-            "cash_on_cash_return": round(cash_on_cash_return * 100, 2),
-            "annual_net_income": round(net_annual_income, 2),
-            "total_appreciation": round(total_appreciation, 2),
-            "total_return": round(total_return, 2),
-            "total_roi_percentage": round(total_roi * 100, 2),
-            "annualized_roi": round(annualized_roi * 100, 2),
-            "future_property_value": round(future_value, 2)
-        }
+        if calculation_type == "npv":
+            discount_rates = additional_params.get("discount_rates", [interest_rate])
+            npv_value = float(npv(interest_rate, cash_flows))
+            npv_profile = npv(discount_rates, cash_flows)
+            
+            results = {
+                "npv": round(npv_value, 2),
+                "discount_rate": round(interest_rate * 100, 2),
+                "npv_profile": {
+                    f"{round(rate * 100, 2)}%": round(float(value), 2)
+                    for rate, value in zip(discount_rates, npv_profile)
+                },
+                "investment_status": "Profitable" if npv_value > 0 else "Unprofitable"
+            }
+        else:
+            irr_value = irr(cash_flows, guess=additional_params.get("irr_guess", 0.1))
+            sign_changes = int(cash_flow_sign_changes(cash_flows))
+            
+            results = {
+                "irr": round(float(irr_value) * 100, 2) if np.isfinite(irr_value) else None,
+                "converged": bool(np.isfinite(irr_value)),
+                "cash_flow_sign_changes": sign_changes,
+                "multiple_irr_possible": sign_changes > 1,
+                "exceeds_hurdle_rate": bool(irr_value > interest_rate) if np.isfinite(irr_value) else False
+            }
+        results["cash_flows"] = np.round(cash_flows, 2).tolist()
     
     elif calculation_type == "cash_flow":
         # Cash flow analysis
-        rental_income = additional_params.get("monthly_rental_income", principal * 0.008)
-        mortgage_payment = additional_params.get("mortgage_payment", 0)
-        property_taxes = additional_params.get("monthly_property_taxes", principal * 0.01 / 12)
-        insurance = additional_params.get("monthly_insurance", principal * 0.003 / 12)
-        maintenance = additional_params.get("monthly_maintenance", rental_income * 0.1)
-        vacancy_rate = additional_params.get("vacancy_rate", 0.05)
-        
-        # Calculate monthly cash flow
-        effective_rental_income = rental_income * (1 - vacancy_rate)
-        total_expenses = mortgage_payment + property_taxes + insurance + maintenance
-        monthly_cash_flow = effective_rental_income - total_expenses
-        annual_cash_flow = monthly_cash_flow * 12
+        cash_flow = calculator_metrics(calculation_type, principal, interest_rate, term_years, **calculator_params)
+        monthly_cash_flow = float(cash_flow["monthly_cash_flow"])
         
         results = {
             "monthly_cash_flow": round(monthly_cash_flow, 2),
-            "annual_cash_flow": round(annual_cash_flow, 2),
+            "annual_cash_flow": round(float(cash_flow["annual_cash_flow"]), 2),
             "cash_flow_status": "Positive" if monthly_cash_flow > 0 else "Negative",
-            "break_even_rent": round(total_expenses / (1 - vacancy_rate), 2),
+            "break_even_rent": round(float(cash_flow["break_even_rent"]), 2),
             "expense_breakdown": {
-                "mortgage_payment": round(mortgage_payment, 2),
-                "property_taxes": round(property_taxes, 2),
-                "insurance": round(insurance, 2),
-                "maintenance": round(maintenance, 2)
+                name: round(float(cash_flow[name]), 2)
+                for name in ("mortgage_payment", "property_taxes", "insurance", "maintenance")
             }
         }
     
-    return {
+    response = {
         "calculation_info": {
             "calculation_type": calculation_type,
             "principal": principal,
@@ -297,6 +477,73 @@ def financial_calculator(
             "professional_advice": "Consult with financial advisor for complex scenarios"
         }
     }
+    
+    sensitivity = additional_params.get("sensitivity")
+    if sensitivity is not None:
+        # Vary the requested assumptions by ±variation over the full grid
+        try:
+            response["sensitivity_analysis"] = sensitivity_analysis(
+                calculation_type,
+                {"principal": principal, "interest_rate": interest_rate, "term_years": term_years, **calculator_params},
+                sensitivity.get("assumptions"),
+                variation=sensitivity.get("variation", 0.10),
+                steps=sensitivity.get("steps", 5),
+                output=sensitivity.get("output"),
+            )
+        except ValueError as error:
+            # Calculation type, assumptions and output come from the model: report, don't raise
+            response["sensitivity_analysis"] = {"error": str(error)}
+        else:
+            response["recommendations"]["sensitivity_analysis"] = (
+                f"Most sensitive assumption: {response['sensitivity_analysis']['tornado'][0]['assumption']}"
+            )
+    
+    return response
+
+
+@tool(
+    name="portfolio_risk_aggregator",
+    description="Aggregate risk and returns over a large CSV/Parquet file of properties",
+    show_result=True,
+)
+def portfolio_risk_aggregator(
+    file_path: str,
+    group_by: Optional[str] = None,
+    risk_categories: List[str] = ["market", "environmental", "financial", "legal"],
+    include_investment: bool = True,
+    confidence_levels: List[float] = [0.95, 0.99],
+    seed: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Aggregate risk and returns over a large CSV/Parquet file of properties.
+    
+    Args:
+        file_path: CSV or Parquet file with a property_value column (plus optional
+            property_address and financing/market assumption columns)
+        group_by: Column used for the concentration report (e.g. city, zip code)
+        risk_categories: Categories to assess (market, environmental, financial, legal)
+        include_investment: Also aggregate investment returns
+        confidence_levels: Confidence levels of the portfolio value at risk
+        seed: Seed for reproducible risk draws
+        
+    Returns:
+        Dictionary containing portfolio exposure, concentration and value at risk
+    """
+    current_date = datetime.now()
+    
+    results = aggregate_portfolio_risk(
+        file_path,
+        risk_categories=risk_categories,
+        group_by=group_by,
+        include_investment=include_investment,
+        seed=seed,
+        confidence_levels=confidence_levels,
+    )
+    results["analysis_info"] = {
+        "file_path": file_path,
+        "analysis_date": current_date.isoformat()
+    }
+    return results
 
 
 # Import additional tools from separate file
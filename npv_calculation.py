@@ -1,14 +1,17 @@
 # npv_calculation.py
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent / "modules" / "module1"))
+from financial_math import npv as solve_npv
 
 # Given data
 initial_investment = 110000
 cash_flows = [3200, 3200, 3200, 3200, 3200, 3200, 3200, 3200, 3200, 3200, 3200, 3200]
 discount_rate = 0.08
 
-# Calculate NPV manually
-npv = -initial_investment
-for t, cf in enumerate(cash_flows, 1):
-    npv += cf / ((1 + discount_rate) ** t)
+# Calculate NPV (time 0 holds the initial investment)
+npv = float(solve_npv(discount_rate, [-initial_investment] + cash_flows))
 
 # Output the result
 npv_result = npv
\ No newline at end of file
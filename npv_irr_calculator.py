@@ -1,5 +1,10 @@
 # npv_irr_calculator.py
-import numpy_financial as npf
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent / "modules" / "module1"))
+from cash_flow_projection import NET_CASH_FLOW, project_monthly_cash_flows
+from financial_math import irr as solve_irr, npv as solve_npv
 
 # Cash flow data
 initial_investment = -2250000  # Down payment
@@ -8,21 +13,23 @@ monthly_expenses = 12000
 monthly_loan_payment = 35230.34
 analysis_period_years = 10
 
-# Calculate monthly net cash flow
-monthly_net_cash_flow = monthly_rental_income - monthly_expenses - monthly_loan_payment
-
-# Create an array of cash flows (monthly)
-cash_flows = [monthly_net_cash_flow] * (analysis_period_years * 12)
-
-# Add the initial investment at the beginning (time 0)
-cash_flows.insert(0, initial_investment)
+# Monthly cash flows from the projection engine (time 0 holds the down payment).
+# The loan payment is quoted without its terms, so it is carried as a fixed monthly cost.
+projection = project_monthly_cash_flows(
+    0,
+    monthly_rental_income,
+    analysis_period_years * 12,
+    monthly_expenses=monthly_expenses + monthly_loan_payment,
+    initial_investment=-initial_investment,
+)
+cash_flows = projection[NET_CASH_FLOW, 0]
 
 # Calculate NPV
 discount_rate_annual = 0.1  # 10% annual discount rate
 discount_rate_monthly = (1 + discount_rate_annual) ** (1/12) - 1
-npv = npf.npv(discount_rate_monthly, cash_flows)
+npv = float(solve_npv(discount_rate_monthly, cash_flows))
 
 # Calculate IRR
-irr = npf.irr(cash_flows) * 12  # Convert monthly IRR to annual IRR
+irr = float(solve_irr(cash_flows)) * 12  # Convert monthly IRR to annual IRR
 
 result = {"npv": npv, "irr": irr}
\ No newline at end of file
@@ -0,0 +1,158 @@
+"""
+Persistent response cache in front of the teams' runs in main.py.
+
+Responses are stored in a SQLite database keyed on a digest of the module,
+the normalized prompt (Unicode NFKC, case-folded, whitespace collapsed,
+surrounding punctuation stripped, so "Valuation of 12 Rue X?" and
+"valuation of 12 rue x" share an entry) and the session context that
+changes the answer (e.g. the parallel mode). Entries expire after a TTL and
+the least recently used are evicted beyond ``maxsize``. The database runs in
+WAL mode and every access holds a lock, so one instance can be shared by
+all Streamlit sessions and several processes can share the file.
+"""
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+DEFAULT_CACHE_PATH = Path("tmp") / "response_cache.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    module TEXT NOT NULL,
+    prompt TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+CREATE INDEX IF NOT EXISTS responses_module ON responses (module);
+"""
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Prompt text as used in cache keys."""
+    text = unicodedata.normalize("NFKC", prompt).casefold()
+    text = re.sub(r"\s+", " ", text)
+    return text.strip(" .!?;:,")
+
+
+def make_key(module: str, prompt: str, context: Optional[Dict[str, Any]] = None) -> str:
+    """Digest identifying a (module, normalized prompt, context) triple."""
+    payload = json.dumps([module, normalize_prompt(prompt), context or {}], sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed response cache with TTL and LRU size eviction; see module docstring."""
+
+    def __init__(
+        self,
+        path: Union[str, Path] = DEFAULT_CACHE_PATH,
+        maxsize: int = 1_000,
+        ttl: Optional[float] = 24 * 3600,
+    ):
+        self.path = Path(path)
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(_SCHEMA)
+        self.connection.commit()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl is not None and now - created_at >= self.ttl
+
+    def get(self, module: str, prompt: str, context: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Cached response, None on a miss (expired entries are dropped)."""
+        key = make_key(module, prompt, context)
+        now = time.time()
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or self._expired(row[1], now):
+                if row is not None:
+                    self.connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self.connection.commit()
+                self.misses += 1
+                return None
+            self.connection.execute(
+                "UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key)
+            )
+            self.connection.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, module: str, prompt: str, response: str, context: Optional[Dict[str, Any]] = None) -> None:
+        """Store a response, then drop expired entries and the least recently used beyond maxsize."""
+        now = time.time()
+        with self._lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses (key, module, prompt, response, created_at, last_used, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, 0)",
+                (make_key(module, prompt, context), module, normalize_prompt(prompt), response, now, now),
+            )
+            if self.ttl is not None:
+                self.connection.execute("DELETE FROM responses WHERE created_at <= ?", (now - self.ttl,))
+            self.connection.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.maxsize,),
+            )
+            self.connection.commit()
+
+    def invalidate(
+        self,
+        module: Optional[str] = None,
+        prompt: Optional[str] = None,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        """
+        Remove cached responses.
+
+        Args:
+            module: Only this module's responses (all modules when None)
+            prompt: Only the entry for this prompt (requires ``module``)
+            context: Session context of that entry
+
+        Returns:
+            Number of responses removed
+        """
+        with self._lock:
+            if prompt is not None:
+                if module is None:
+                    raise ValueError("module is required to invalidate a single prompt")
+                cursor = self.connection.execute(
+                    "DELETE FROM responses WHERE key = ?", (make_key(module, prompt, context),)
+                )
+            elif module is not None:
+                cursor = self.connection.execute("DELETE FROM responses WHERE module = ?", (module,))
+            else:
+                cursor = self.connection.execute("DELETE FROM responses")
+            self.connection.commit()
+            return cursor.rowcount
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            size = self.connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "size": size,
+                "maxsize": self.maxsize,
+                "ttl": self.ttl
+            }
@@ -0,0 +1,49 @@
+"""
+Cold import budget of module1.
+
+main.py imports module1 at every Streamlit process start; the agents, agno
+and the tool modules must only load on first use. Each measurement runs in
+a fresh interpreter so nothing is already imported.
+"""
+import importlib.util
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+MODULE_DIR = ROOT / "modules" / "module1"
+
+RUNS = 5
+# Modules that only the agent, team and tool factories may import
+DEFERRED_MODULES = ["agno", "tools", "additional_tools", "numpy", "pandas"]
+
+
+def _budget_ms() -> float:
+    spec = importlib.util.spec_from_file_location("run_benchmarks", ROOT / "benchmarks" / "run_benchmarks.py")
+    benchmarks = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(benchmarks)
+    return benchmarks.IMPORT_BUDGETS_MS["import.module1"]
+
+
+def _cold_import() -> dict:
+    code = (
+        "import json, sys, time; start = time.perf_counter(); import module1; "
+        "elapsed = (time.perf_counter() - start) * 1000; "
+        f"print(json.dumps({{'ms': elapsed, 'loaded': [m for m in {DEFERRED_MODULES!r} if m in sys.modules]}}))"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", code], cwd=MODULE_DIR, capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def test_module1_import_stays_lazy():
+    assert _cold_import()["loaded"] == []
+
+
+def test_module1_import_within_budget():
+    budget = _budget_ms()
+    median = statistics.median(_cold_import()["ms"] for _ in range(RUNS))
+    assert median <= budget, f"import module1 took {median:.1f} ms (p50 of {RUNS}), budget {budget:.0f} ms"